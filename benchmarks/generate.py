@@ -0,0 +1,151 @@
+"""
+Fills the database with synthetic data for benchmarks.
+
+The five tables of `awesome_inc.api.models` are truncated and refilled with
+COPY, scaled from the number of installations, with valid foreign keys. The
+same seed always produces the same data.
+
+Usage:
+    python benchmarks/generate.py --installations 1000000 [--seed 42]
+"""
+
+from datetime import date, timedelta
+from typing import Callable, Iterator
+import argparse
+import io
+import logging
+import random
+import time
+
+from awesome_inc.api.core.database import new_engine
+
+logger = logging.getLogger(__name__)
+
+REGIONS = ("Africa", "America", "Asia", "Europe", "Oceania")
+FIRST_ID = 1000
+START_DATE = date(2015, 1, 1)
+DAYS = 365 * 8
+
+
+def _copy(cursor, table: str, rows: Iterator[tuple], chunk_size: int) -> int:
+    count = 0
+    while True:
+        buffer = io.StringIO()
+        written = 0
+        for row in rows:
+            buffer.write("\t".join(str(value) for value in row) + "\n")
+            written += 1
+            if written == chunk_size:
+                break
+        if not written:
+            return count
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} FROM STDIN", buffer)
+        count += written
+
+
+def _ids(count: int) -> range:
+    return range(FIRST_ID, FIRST_ID + count)
+
+
+def generate(
+    installations: int, seed: int = 42
+) -> dict[str, Callable[[], Iterator[tuple]]]:
+    """
+    Describes the rows of each table, scaled from the number of
+    installations.
+
+    Args:
+        installations (int): The number of installations.
+        seed (int, optional): The seed of the random generator.
+
+    Returns:
+        dict: A function generating the rows of each table, in an order that
+        satisfies the foreign keys.
+    """
+    random_ = random.Random(seed)
+    countries = 50
+    categories = 20
+    customers = max(installations // 20, 1)
+    products = max(installations // 200, 1)
+
+    def country():
+        for i, id_ in enumerate(_ids(countries)):
+            yield id_, f"Country {i}", REGIONS[i % len(REGIONS)]
+
+    def customer():
+        for id_ in _ids(customers):
+            yield (
+                id_,
+                f"Customer {id_}",
+                f"customer{id_}@example.com",
+                FIRST_ID + random_.randrange(countries),
+                random_.choice(("yes", "no")),
+            )
+
+    def product_category():
+        for id_ in _ids(categories):
+            yield id_, f"Category {id_}"
+
+    def product():
+        for id_ in _ids(products):
+            yield (
+                id_,
+                f"Prd-{random_.randrange(100000):05d}",
+                f"Product {id_}",
+                FIRST_ID + random_.randrange(categories),
+                str(random_.randrange(1, 20000)),
+            )
+
+    def installation():
+        for id_ in _ids(installations):
+            yield (
+                id_,
+                f"Inst-{id_}",
+                f"Installation {id_}",
+                FIRST_ID + random_.randrange(products),
+                FIRST_ID + random_.randrange(customers),
+                START_DATE + timedelta(days=random_.randrange(DAYS)),
+            )
+
+    return {
+        "country": country,
+        "customer": customer,
+        "product_category": product_category,
+        "product": product,
+        "installation": installation,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--installations", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    arguments = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    tables = generate(arguments.installations, arguments.seed)
+    engine = new_engine()
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"TRUNCATE {', '.join(tables)}")
+        for table, rows in tables.items():
+            started = time.perf_counter()
+            count = _copy(cursor, table, rows(), arguments.chunk_size)
+            logger.info(
+                "Loaded %s rows into %s in %.1fs.",
+                count,
+                table,
+                time.perf_counter() - started,
+            )
+        cursor.execute(f"ANALYZE {', '.join(tables)}")
+        connection.commit()
+    finally:
+        connection.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Measures the throughput and latency of the API.
+
+Each scenario sends requests from `--concurrency` concurrent clients for
+`--duration` seconds. The results are written as JSON, and can be compared
+with the results of a previous run to catch regressions.
+
+The table scenarios page through each table with the cursors returned by
+the API, so that the clients do not all request the same page. Pass
+`--primary` to read from the primary, bypassing the response cache.
+
+Usage:
+    python benchmarks/load.py run --base-url http://localhost:80 \\
+        --output results.json
+    python benchmarks/load.py compare baseline.json results.json
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+TABLES = ("country", "customer", "installation", "product", "product_category")
+
+Send = Callable[[httpx.Response | None], Awaitable[httpx.Response]]
+
+
+def summarize(latencies: list[float], errors: int, duration: float) -> dict:
+    """
+    Summarizes the latencies of a scenario.
+
+    Args:
+        latencies (list[float]): The latencies of the successful requests,
+        in seconds.
+        errors (int): The number of failed requests.
+        duration (float): The duration of the scenario, in seconds.
+
+    Returns:
+        dict: The number of requests and errors, the throughput in requests
+        per second and the p50, p95, p99 and maximum latencies in
+        milliseconds.
+    """
+    summary = {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / duration if duration else 0.0,
+    }
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(
+            latencies, n=100, method="inclusive"
+        )
+        summary.update(
+            p50_ms=percentiles[49] * 1000,
+            p95_ms=percentiles[94] * 1000,
+            p99_ms=percentiles[98] * 1000,
+            max_ms=max(latencies) * 1000,
+        )
+    return summary
+
+
+def pages(
+    http: httpx.AsyncClient, table: str, params: dict, headers: dict
+) -> Send:
+    """
+    Builds the scenario reading a table page by page.
+
+    Args:
+        http (httpx.AsyncClient): The client.
+        table (str): The name of the table.
+        params (dict): The query parameters of every page, e.g. the limit.
+        headers (dict): The headers of every request.
+
+    Returns:
+        Send: The coroutine function requesting the page following the
+        previous response of a client, or the first page once the previous
+        response was the last page or failed.
+    """
+
+    async def send(previous: httpx.Response | None) -> httpx.Response:
+        cursor = None
+        if previous is not None:
+            cursor = previous.headers.get("X-Next-Cursor")
+        return await http.get(
+            f"/{table}",
+            params={**params, "after": cursor} if cursor else params,
+            headers=headers,
+        )
+
+    return send
+
+
+async def run_scenario(send: Send, concurrency: int, duration: float) -> dict:
+    """
+    Sends requests from concurrent clients for a given duration.
+
+    Args:
+        send (Send): The coroutine function sending one request, given the
+        previous response of the client.
+        concurrency (int): The number of concurrent clients.
+        duration (float): The duration of the scenario, in seconds.
+
+    Returns:
+        dict: The summary returned by `summarize`.
+    """
+    latencies: list[float] = []
+    errors = 0
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def client() -> None:
+        nonlocal errors
+        previous = None
+        while time.perf_counter() < deadline:
+            sent = time.perf_counter()
+            try:
+                response = await send(previous)
+                await response.aread()
+                response.raise_for_status()
+            except httpx.HTTPError:
+                errors += 1
+                previous = None
+            else:
+                latencies.append(time.perf_counter() - sent)
+                previous = response
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run(arguments: argparse.Namespace) -> dict:
+    credentials = {
+        "username": os.environ["ADF__USERNAME"],
+        "password": os.environ["ADF__PASSWORD"],
+    }
+    async with httpx.AsyncClient(
+        base_url=arguments.base_url, timeout=arguments.timeout
+    ) as http:
+        response = await http.post("/token", data=credentials)
+        response.raise_for_status()
+        headers = {
+            "Authorization": f"Bearer {response.json()['access_token']}"
+        }
+        scenarios: dict[str, Send] = {
+            "token": lambda _: http.post("/token", data=credentials),
+            "all-tables": lambda _: http.get("/all-tables", headers=headers),
+        }
+        params: dict = {"limit": arguments.limit}
+        if arguments.primary:
+            params["primary"] = "true"
+        for table in arguments.tables:
+            scenarios[table] = pages(http, table, params, headers)
+        results = {}
+        for name, send in scenarios.items():
+            results[name] = await run_scenario(
+                send, arguments.concurrency, arguments.duration
+            )
+            print(name, json.dumps(results[name]), file=sys.stderr)
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "base_url": arguments.base_url,
+        "concurrency": arguments.concurrency,
+        "duration": arguments.duration,
+        "limit": arguments.limit,
+        "primary": arguments.primary,
+        "scenarios": results,
+    }
+
+
+def compare(baseline: dict, results: dict, threshold: float) -> list[str]:
+    """
+    Lists the scenarios whose p95 latency or throughput got worse by more
+    than a threshold.
+
+    Args:
+        baseline (dict): The results of the reference run.
+        results (dict): The results of the new run.
+        threshold (float): The tolerated relative change, e.g. 0.1 for 10%.
+
+    Returns:
+        list[str]: A description of each regression.
+    """
+    regressions = []
+    for name, new in results["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None or "p95_ms" not in old or "p95_ms" not in new:
+            continue
+        if new["p95_ms"] > old["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {old['p95_ms']:.1f}ms -> {new['p95_ms']:.1f}ms"
+            )
+        if new["throughput"] < old["throughput"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {old['throughput']:.1f}/s"
+                f" -> {new['throughput']:.1f}/s"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--base-url", default="http://localhost:80")
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--duration", type=float, default=30.0)
+    run_parser.add_argument("--limit", type=int, default=1000)
+    run_parser.add_argument("--timeout", type=float, default=60.0)
+    run_parser.add_argument("--primary", action="store_true")
+    run_parser.add_argument(
+        "--tables", nargs="+", choices=TABLES, default=list(TABLES)
+    )
+    run_parser.add_argument("--output", type=Path, required=True)
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("results", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    arguments = parser.parse_args(argv)
+
+    if arguments.command == "run":
+        results = asyncio.run(run(arguments))
+        arguments.output.write_text(json.dumps(results, indent=2))
+        return 0
+    regressions = compare(
+        json.loads(arguments.baseline.read_text()),
+        json.loads(arguments.results.read_text()),
+        arguments.threshold,
+    )
+    for regression in regressions:
+        print(regression)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+from collections import Counter, defaultdict
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Sequence
+from .facts import installation_facts_query
+from .models import Country, Installation, Product, ProductCategory
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class InstallationRollups:
+    """
+    In-memory aggregates of the installations, refreshed incrementally.
+
+    Each refresh reads only the installations whose id is greater than the
+    last one aggregated, so the fact data is scanned once. Prices, stored as
+    strings, are parsed once per product.
+
+    Installations that are updated or deleted after being aggregated are
+    not reflected until `reset` is called.
+
+    Attributes:
+        last_installation_id: The id of the last installation aggregated.
+        installations_by_month: The number of installations per month, keyed
+        by `YYYY-MM`.
+        revenue_by_category: The sum of the prices of the installed products
+        per product category.
+        revenue_by_region: The sum of the prices of the installed products
+        per region of the customer.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forgets every aggregate, so that the next refresh reads all the
+        installations again.
+        """
+        with self._lock:
+            self.last_installation_id: int | None = None
+            self.installations_by_month: Counter[str] = Counter()
+            self.revenue_by_category: defaultdict[str, Decimal] = defaultdict(
+                Decimal
+            )
+            self.revenue_by_region: defaultdict[str, Decimal] = defaultdict(
+                Decimal
+            )
+            self._prices: dict[int, Decimal] = {}
+
+    def query(self) -> Select:
+        """
+        Builds the query reading the installations not aggregated yet.
+
+        :return: The query.
+        """
+        return installation_facts_query(
+            after=self.last_installation_id
+        ).with_only_columns(
+            Installation.id,
+            Installation.installation_date,
+            Product.id,
+            Product.price,
+            ProductCategory.name,
+            Country.region,
+        )
+
+    def _price(self, product_id: int, price: str) -> Decimal:
+        parsed = self._prices.get(product_id)
+        if parsed is None:
+            try:
+                parsed = Decimal(price)
+            except InvalidOperation:
+                logger.warning(
+                    "Invalid price %r for product %s.", price, product_id
+                )
+                parsed = Decimal(0)
+            self._prices[product_id] = parsed
+        return parsed
+
+    def add(self, rows: Sequence) -> int:
+        """
+        Aggregates new installations.
+
+        Rows that have already been aggregated, e.g. by a concurrent refresh,
+        are skipped.
+
+        Args:
+            rows (Sequence): The rows returned by `query`, in installation id
+            order.
+
+        Returns:
+            int: The number of installations aggregated.
+        """
+        added = 0
+        with self._lock:
+            for row in rows:
+                installation_id, day, product_id, price, category, region = row
+                last = self.last_installation_id
+                if last is not None and installation_id <= last:
+                    continue
+                revenue = self._price(product_id, price)
+                self.installations_by_month[day.strftime("%Y-%m")] += 1
+                self.revenue_by_category[category] += revenue
+                self.revenue_by_region[region] += revenue
+                self.last_installation_id = installation_id
+                added += 1
+        return added
+
+    def refresh(self, db: Session) -> int:
+        """
+        Aggregates the installations added since the last refresh.
+
+        Args:
+            db (Session): The database session object.
+
+        Returns:
+            int: The number of installations aggregated.
+        """
+        return self.add(db.execute(self.query()).all())
+
+    async def refresh_async(self, db: AsyncSession) -> int:
+        """
+        Aggregates the installations added since the last refresh, with an
+        async session.
+
+        See `refresh` for the arguments.
+
+        Returns:
+            int: The number of installations aggregated.
+        """
+        return self.add((await db.execute(self.query())).all())
+
+    def monthly_installations(self) -> list[dict]:
+        """
+        Reports the number of installations per month.
+
+        :return: The months in chronological order, with their count.
+        """
+        with self._lock:
+            return [
+                {"month": month, "installations": count}
+                for month, count in sorted(self.installations_by_month.items())
+            ]
+
+    def revenue(self, dimension: str) -> list[dict]:
+        """
+        Reports the revenue per product category or per region.
+
+        Args:
+            dimension (str): Either `category` or `region`.
+
+        Returns:
+            list[dict]: The categories or regions, from the highest revenue to
+            the lowest.
+        """
+        with self._lock:
+            totals = (
+                self.revenue_by_category
+                if dimension == "category"
+                else self.revenue_by_region
+            )
+            return [
+                {dimension: name, "revenue": revenue}
+                for name, revenue in sorted(
+                    totals.items(), key=lambda item: item[1], reverse=True
+                )
+            ]
+
+
+rollups = InstallationRollups()
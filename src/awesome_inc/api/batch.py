@@ -0,0 +1,83 @@
+from pydantic_core import to_json
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Sequence
+from .core.config import _STREAM_BATCH_SIZE
+from .encoders import row_encoder
+from .enums import ORMTables, SchemaTables
+from .requests import table_query
+
+ISOLATION_LEVEL = "REPEATABLE READ"
+
+
+def _section(table_name: str):
+    model = ORMTables[table_name].value
+    columns = tuple(SchemaTables[table_name].value.model_fields)
+    return table_query(model, columns=columns), row_encoder(columns)
+
+
+def _header(index: int, table_name: str) -> bytes:
+    return (b"," if index else b"{") + to_json(table_name) + b":["
+
+
+def batch_chunks(
+    db: Session,
+    table_names: Sequence[str],
+    batch_size: int = _STREAM_BATCH_SIZE,
+):
+    """
+    Serializes several tables as one JSON object mapping each table name to
+    its rows, one table after the other.
+
+    Every table is read within a single `REPEATABLE READ` transaction of the
+    session, so the tables are consistent with each other. Rows are read
+    from a server-side cursor `batch_size` rows at a time.
+
+    Args:
+        db (Session): The database session object.
+        table_names (Sequence[str]): The names of the tables, members of
+        `ORMTables`, in output order.
+        batch_size (int, optional): The number of rows fetched from the
+        cursor and encoded at a time.
+
+    Yields:
+        bytes: The chunks of the JSON object.
+    """
+    db.connection(execution_options={"isolation_level": ISOLATION_LEVEL})
+    for index, table_name in enumerate(table_names):
+        query, encoder = _section(table_name)
+        yield _header(index, table_name)
+        result = db.execute(query.execution_options(yield_per=batch_size))
+        separator = b""
+        for rows in result.partitions():
+            # Strip the brackets, the array spans every partition.
+            yield separator + encoder.encode(rows)[1:-1]
+            separator = b","
+        yield b"]"
+    yield b"}" if table_names else b"{}"
+
+
+async def batch_chunks_async(
+    db: AsyncSession,
+    table_names: Sequence[str],
+    batch_size: int = _STREAM_BATCH_SIZE,
+):
+    """
+    Serializes several tables as one JSON object with an async session.
+
+    See `batch_chunks` for the arguments.
+
+    Yields:
+        bytes: The chunks of the JSON object.
+    """
+    await db.connection(execution_options={"isolation_level": ISOLATION_LEVEL})
+    for index, table_name in enumerate(table_names):
+        query, encoder = _section(table_name)
+        yield _header(index, table_name)
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        separator = b""
+        async for rows in result.partitions():
+            yield separator + encoder.encode(rows)[1:-1]
+            separator = b","
+        yield b"]"
+    yield b"}" if table_names else b"{}"
@@ -0,0 +1,175 @@
+from collections import OrderedDict
+from .core.config import (
+    _RESPONSE_CACHE_MAX_BYTES,
+    _RESPONSE_CACHE_TTL_SECONDS,
+    _RESPONSE_CACHE_TABLE_TTLS,
+)
+from typing import Hashable, NamedTuple
+import threading
+import time
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    media_type: str
+    headers: dict[str, str]
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    A least-recently-used cache of serialized responses with a total memory
+    budget.
+
+    Entries are grouped by table, so that each table can have its own
+    time-to-live and be invalidated on its own.
+
+    Attributes:
+        max_bytes: The total size of the bodies kept in the cache.
+        default_ttl: The time-to-live of the entries, in seconds.
+        table_ttls: Time-to-live overrides per table. A time-to-live of zero
+        disables caching for the table.
+        hits: The number of lookups answered from the cache.
+        misses: The number of lookups not answered from the cache.
+        evictions: The number of entries evicted to stay within the budget.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        default_ttl: float,
+        table_ttls: dict[str, float] | None = None,
+    ):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.table_ttls = table_ttls or {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = 0
+        self._entries: OrderedDict[tuple[str, Hashable], CachedResponse] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def ttl(self, table_name: str) -> float:
+        """
+        Returns the time-to-live of the responses of a table.
+
+        :param table_name: The name of the table.
+        :return: The time-to-live, in seconds.
+        """
+        return self.table_ttls.get(table_name, self.default_ttl)
+
+    def _remove(self, entry_key: tuple[str, Hashable]) -> None:
+        self._size -= len(self._entries.pop(entry_key).body)
+
+    def get(self, table_name: str, key: Hashable) -> CachedResponse | None:
+        """
+        Looks up a response.
+
+        Args:
+            table_name (str): The name of the table.
+            key (Hashable): What identifies the response within the table,
+            e.g. its query parameters and output format.
+
+        Returns:
+            CachedResponse | None: The response, or None if it is not cached
+            or has expired.
+        """
+        entry_key = (table_name, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(entry_key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry_key)
+            self.hits += 1
+            return entry
+
+    def put(
+        self,
+        table_name: str,
+        key: Hashable,
+        body: bytes,
+        media_type: str,
+        headers: dict[str, str],
+    ) -> None:
+        """
+        Stores a response, evicting the least recently used responses if the
+        memory budget is exceeded.
+
+        Responses of tables with a time-to-live of zero, and responses
+        larger than the whole budget, are not stored.
+
+        Args:
+            table_name (str): The name of the table.
+            key (Hashable): What identifies the response within the table.
+            body (bytes): The serialized body.
+            media_type (str): The media type of the body.
+            headers (dict[str, str]): The headers sent with the body.
+        """
+        ttl = self.ttl(table_name)
+        if ttl <= 0 or len(body) > self.max_bytes:
+            return
+        entry_key = (table_name, key)
+        entry = CachedResponse(
+            body, media_type, dict(headers), time.monotonic() + ttl
+        )
+        with self._lock:
+            if entry_key in self._entries:
+                self._remove(entry_key)
+            self._entries[entry_key] = entry
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, table_name: str | None = None) -> int:
+        """
+        Drops the cached responses of a table, or of all tables.
+
+        Args:
+            table_name (str, optional): The name of the table. Defaults to
+            None, which drops every response.
+
+        Returns:
+            int: The number of responses dropped.
+        """
+        with self._lock:
+            entry_keys = [
+                entry_key
+                for entry_key in self._entries
+                if table_name is None or entry_key[0] == table_name
+            ]
+            for entry_key in entry_keys:
+                self._remove(entry_key)
+        return len(entry_keys)
+
+    def stats(self) -> dict:
+        """
+        Reports the counters of the cache.
+
+        Returns:
+            dict: The hits, misses and evictions so far, and the number of
+            entries and bytes currently cached.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+response_cache = ResponseCache(
+    max_bytes=_RESPONSE_CACHE_MAX_BYTES,
+    default_ttl=_RESPONSE_CACHE_TTL_SECONDS,
+    table_ttls=_RESPONSE_CACHE_TABLE_TTLS,
+)
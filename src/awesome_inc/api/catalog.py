@@ -0,0 +1,145 @@
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.concurrency import run_in_threadpool
+from .core.config import _CATALOG_TTL_SECONDS
+from .core.database import get_engine, init_async_engine
+from .enums import ORMTables
+from .models import Base
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaCatalog:
+    """
+    An in-memory catalog of the tables served by the API.
+
+    The catalog is resolved from `ORMTables` without touching the database,
+    and looking a table up never does. When a time-to-live is configured,
+    the application reconciles it with the tables that actually exist in the
+    database in the background, every time the time-to-live expires.
+
+    Attributes:
+        ttl: The number of seconds after which the catalog is reconciled with
+        the database. `None` disables reconciliation.
+        tables: A dictionary mapping the table names to their ORM models.
+        refreshed_at: The monotonic time of the last reconciliation.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self.ttl = ttl
+        self.tables: dict[str, type[Base]] = self._declared_tables()
+        self.refreshed_at: float | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _declared_tables() -> dict[str, type[Base]]:
+        return {table.name: table.value for table in ORMTables}
+
+    def refresh(self, engine: Engine | None = None) -> list[str]:
+        """
+        Reconciles the catalog with the tables that exist in the database.
+
+        Args:
+            engine (Engine, optional): The engine used to inspect the
+            database. Defaults to the process-wide engine.
+
+        Returns:
+            list[str]: The names of the tables served after the refresh.
+        """
+        existing = set(inspect(engine or get_engine()).get_table_names())
+        return self._reconciled(existing)
+
+    def _reconciled(self, existing: set[str]) -> list[str]:
+        with self._lock:
+            self.tables = {
+                name: model
+                for name, model in self._declared_tables().items()
+                if model.__tablename__ in existing
+            }
+            self.refreshed_at = time.monotonic()
+        return list(self.tables)
+
+    async def refresh_async(self, engine: AsyncEngine) -> list[str]:
+        """
+        Reconciles the catalog with the tables that exist in the database,
+        through an async engine.
+
+        Args:
+            engine (AsyncEngine): The engine used to inspect the database.
+
+        Returns:
+            list[str]: The names of the tables served after the refresh.
+        """
+        async with engine.connect() as connection:
+            existing = await connection.run_sync(
+                lambda sync_connection: inspect(
+                    sync_connection
+                ).get_table_names()
+            )
+        return self._reconciled(set(existing))
+
+    async def reconcile(self, asynchronous: bool = False) -> list[str]:
+        """
+        Reconciles the catalog without blocking the event loop.
+
+        Args:
+            asynchronous (bool, optional): Whether to inspect the database
+            with the process-wide async engine rather than on the threadpool
+            with the sync engine.
+
+        Returns:
+            list[str]: The names of the tables served after the refresh.
+        """
+        if asynchronous:
+            return await self.refresh_async(init_async_engine())
+        return await run_in_threadpool(self.refresh)
+
+    async def monitor(self, asynchronous: bool = False) -> None:
+        """
+        Reconciles the catalog every time its time-to-live expires, until
+        cancelled.
+
+        A failed reconciliation is logged and the current catalog is kept
+        until the time-to-live expires again.
+
+        Args:
+            asynchronous (bool, optional): See `reconcile`.
+        """
+        if self.ttl is None:
+            return
+        while True:
+            await asyncio.sleep(self.ttl)
+            try:
+                await self.reconcile(asynchronous)
+            except SQLAlchemyError:
+                logger.warning("Could not reconcile the schema catalog.")
+
+    def table_names(self) -> list[str]:
+        """
+        Returns the names of the tables served by the API.
+
+        :return: A list of table names.
+        """
+        return list(self.tables)
+
+    def get(self, table_name: str) -> type[Base] | None:
+        """
+        Returns the ORM model of a table.
+
+        Args:
+            table_name (str): The name of the table.
+
+        Returns:
+            type[Base] | None: The ORM model of the table, or None if the
+            table is not served by the API.
+        """
+        return self.tables.get(table_name)
+
+
+catalog = SchemaCatalog(ttl=_CATALOG_TTL_SECONDS)
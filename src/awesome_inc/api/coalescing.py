@@ -0,0 +1,66 @@
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable
+import asyncio
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls.
+
+    While a call is in flight for a key, the callers asking for the same key
+    wait for its result instead of making their own call, so a burst of
+    identical requests costs a single call. Nothing is kept once the call
+    completes: callers arriving afterwards start a new call.
+
+    The call runs in its own task, so it completes for the other callers
+    even if the caller that started it is cancelled, e.g. because its client
+    disconnected.
+
+    Attributes:
+        calls: The number of calls made.
+        shared: The number of callers that waited for another caller's call.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.shared = 0
+        self._flights: dict[Hashable, asyncio.Future] = {}
+
+    def _land(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            # Retrieve the exception, so that it is not reported as never
+            # retrieved when every caller was cancelled.
+            flight.exception()
+
+    async def run(
+        self, key: Hashable, function: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        """
+        Calls a coroutine function, unless a call for the same key is already
+        in flight.
+
+        Args:
+            key (Hashable): What identifies the result.
+            function (Callable): The coroutine function computing the result.
+
+        Returns:
+            tuple: The result, and whether it was shared with another caller.
+
+        Raises:
+            Exception: The exception raised by the call, to every caller.
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = asyncio.ensure_future(function())
+            self._flights[key] = flight
+            flight.add_done_callback(partial(self._land, key))
+            self.calls += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(flight), shared
+
+
+table_reads = SingleFlight()
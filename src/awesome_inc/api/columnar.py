@@ -0,0 +1,277 @@
+from sqlalchemy import Select, types
+from typing import TYPE_CHECKING, AsyncIterable, Iterable, Sequence
+
+# pyarrow is imported by the functions using it rather than with this module,
+# so that importing the application stays fast.
+if TYPE_CHECKING:
+    import pyarrow as pa  # type: ignore
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+# Parquet readers scan and decompress whole row groups, so row groups much
+# smaller than this make the files slower to read and compress worse.
+ROW_GROUP_SIZE = 100_000
+
+
+class _ChunkSink:
+    """A write-only file object handing the bytes written so far back."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def arrow_type(column_type: types.TypeEngine) -> "pa.DataType":
+    """
+    Returns the Arrow type matching a SQLAlchemy column type.
+
+    Args:
+        column_type (TypeEngine): The SQLAlchemy type of the column.
+
+    Returns:
+        pa.DataType: The Arrow type. Types without a closer match are
+        encoded as strings.
+    """
+    import pyarrow as pa
+
+    if isinstance(column_type, types.BigInteger):
+        return pa.int64()
+    if isinstance(column_type, types.SmallInteger):
+        return pa.int16()
+    if isinstance(column_type, types.Integer):
+        return pa.int32()
+    if isinstance(column_type, types.Boolean):
+        return pa.bool_()
+    if isinstance(column_type, types.DateTime):
+        return pa.timestamp("us", tz="UTC" if column_type.timezone else None)
+    if isinstance(column_type, types.Date):
+        return pa.date32()
+    if isinstance(column_type, types.Float):
+        return pa.float64()
+    if isinstance(column_type, types.Numeric) and column_type.precision:
+        return pa.decimal128(column_type.precision, column_type.scale or 0)
+    if isinstance(column_type, types.Numeric):
+        return pa.float64()
+    return pa.string()
+
+
+def arrow_schema(model, columns: Sequence[str]) -> "pa.Schema":
+    """
+    Builds the Arrow schema of some columns of a table.
+
+    Args:
+        model (Model): The model representing the table.
+        columns (Sequence[str]): The names of the columns, in order.
+
+    Returns:
+        pa.Schema: The Arrow schema.
+    """
+    import pyarrow as pa
+
+    table_columns = model.__table__.columns
+    return pa.schema(
+        [
+            pa.field(
+                name,
+                arrow_type(table_columns[name].type),
+                nullable=table_columns[name].nullable,
+            )
+            for name in columns
+        ]
+    )
+
+
+def query_arrow_schema(query: Select) -> "pa.Schema":
+    """
+    Builds the Arrow schema of the columns selected by a query.
+
+    Args:
+        query (Select): The query, whose columns may be labelled expressions
+        spanning several tables.
+
+    Returns:
+        pa.Schema: The Arrow schema.
+    """
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            pa.field(column.key, arrow_type(column.type))
+            for column in query.selected_columns
+        ]
+    )
+
+
+class ColumnarEncoder:
+    """
+    Encodes rows into an Arrow IPC stream or a Parquet file, one batch at a
+    time.
+
+    Each call to `encode` returns the bytes produced for a batch of rows, so
+    that the output can be streamed while the rows are still being read.
+    Arrow IPC batches are written as they come. Parquet batches are held
+    until they add up to a row group of `row_group_size` rows, so `encode`
+    returns no bytes until then.
+
+    Attributes:
+        schema: The Arrow schema of the output.
+        media_type: The media type of the output.
+        row_group_size: The number of rows of the Parquet row groups.
+    """
+
+    def __init__(
+        self,
+        schema: "pa.Schema",
+        media_type: str,
+        row_group_size: int = ROW_GROUP_SIZE,
+    ):
+        import pyarrow as pa
+        import pyarrow.parquet as pq  # type: ignore
+
+        self.schema = schema
+        self.media_type = media_type
+        self.row_group_size = row_group_size
+        self._sink = _ChunkSink()
+        self._pending: list[pa.RecordBatch] = []
+        self._pending_rows = 0
+        if media_type == PARQUET_MEDIA_TYPE:
+            self._writer = pq.ParquetWriter(self._sink, schema)
+        else:
+            self._writer = pa.ipc.new_stream(self._sink, schema)
+
+    def _write_row_groups(self, final: bool) -> None:
+        import pyarrow as pa
+
+        if not self._pending:
+            return
+        table = pa.Table.from_batches(self._pending, schema=self.schema)
+        whole = len(table) - len(table) % self.row_group_size
+        written = len(table) if final else whole
+        if written:
+            self._writer.write_table(
+                table.slice(0, written), row_group_size=self.row_group_size
+            )
+        rest = table.slice(written)
+        self._pending = rest.to_batches()
+        self._pending_rows = len(rest)
+
+    def encode(self, rows: Sequence) -> bytes:
+        """
+        Encodes a batch of rows.
+
+        Args:
+            rows (Sequence): The rows, ORM instances or Core rows exposing the
+            columns of the schema as attributes.
+
+        Returns:
+            bytes: The encoded batch, or the row groups completed by the
+            batch for Parquet.
+        """
+        import pyarrow as pa
+
+        batch = pa.record_batch(
+            [
+                pa.array(
+                    [getattr(row, field.name) for row in rows], field.type
+                )
+                for field in self.schema
+            ],
+            schema=self.schema,
+        )
+        if self.media_type != PARQUET_MEDIA_TYPE:
+            self._writer.write_batch(batch)
+            return self._sink.drain()
+        self._pending.append(batch)
+        self._pending_rows += len(batch)
+        if self._pending_rows >= self.row_group_size:
+            self._write_row_groups(final=False)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """
+        Terminates the output.
+
+        Returns:
+            bytes: The end-of-stream marker, or the last row group and the
+            footer for Parquet.
+        """
+        self._write_row_groups(final=True)
+        self._writer.close()
+        return self._sink.drain()
+
+
+def _batches(rows: Iterable, batch_size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def columnar_chunks(encoder: ColumnarEncoder, rows: Iterable, batch_size: int):
+    """
+    Encodes rows in batches of `batch_size` rows.
+
+    Args:
+        encoder (ColumnarEncoder): The encoder of the output format.
+        rows (Iterable): The rows, as returned by `stream_table_data`.
+        batch_size (int): The number of rows per record batch.
+
+    Yields:
+        bytes: The encoded output.
+    """
+    for batch in _batches(rows, batch_size):
+        chunk = encoder.encode(batch)
+        if chunk:
+            yield chunk
+    yield encoder.close()
+
+
+async def columnar_chunks_async(
+    encoder: ColumnarEncoder, rows: AsyncIterable, batch_size: int
+):
+    """
+    Encodes rows read with an async session in batches of `batch_size` rows.
+
+    See `columnar_chunks` for the arguments.
+
+    Yields:
+        bytes: The encoded output.
+    """
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            chunk = encoder.encode(batch)
+            if chunk:
+                yield chunk
+            batch = []
+    if batch:
+        chunk = encoder.encode(batch)
+        if chunk:
+            yield chunk
+    yield encoder.close()
@@ -0,0 +1,175 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import zlib
+import zstandard
+
+ENCODINGS = ("zstd", "gzip")
+
+UNCOMPRESSED_MEDIA_TYPES = {"application/vnd.apache.parquet"}
+
+
+class _Encoder:
+    """
+    Compresses a body chunk by chunk, flushing the compressed output once
+    `flush_size` bytes have been fed since the last flush.
+
+    A flush ends a block, which costs some compression ratio, so small
+    chunks are only flushed once enough of them have accumulated.
+    """
+
+    def __init__(self, compressor, flush_mode: int, flush_size: int):
+        self._compressor = compressor
+        self._flush_mode = flush_mode
+        self._flush_size = flush_size
+        self._pending = 0
+
+    def compress(self, data: bytes) -> bytes:
+        output = self._compressor.compress(data)
+        self._pending += len(data)
+        if self._pending >= self._flush_size:
+            self._pending = 0
+            output += self._compressor.flush(self._flush_mode)
+        return output
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def _gzip_encoder(level: int, flush_size: int) -> _Encoder:
+    return _Encoder(
+        zlib.compressobj(level, zlib.DEFLATED, 31),
+        zlib.Z_SYNC_FLUSH,
+        flush_size,
+    )
+
+
+def _zstd_encoder(level: int, flush_size: int) -> _Encoder:
+    return _Encoder(
+        zstandard.ZstdCompressor(level=level).compressobj(),
+        zstandard.COMPRESSOBJ_FLUSH_BLOCK,
+        flush_size,
+    )
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    Chooses the content coding of a response from the `Accept-Encoding`
+    header of the request.
+
+    Args:
+        accept_encoding (str): The `Accept-Encoding` header, e.g.
+        `"gzip, zstd;q=0.9"`.
+
+    Returns:
+        str | None: `"zstd"` or `"gzip"`, whichever has the highest quality
+        (zstd on a tie), or None if neither is accepted.
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, parameters = item.partition(";")
+        quality = 1.0
+        name, _, value = parameters.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        weights[coding.strip().lower()] = quality
+    default = weights.get("*", 0.0)
+    encoding = max(ENCODINGS, key=lambda e: weights.get(e, default))
+    return encoding if weights.get(encoding, default) > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with zstd or gzip, as negotiated with the
+    `Accept-Encoding` header.
+
+    Each chunk of the body is compressed as soon as it is sent, so streamed
+    responses are compressed incrementally rather than buffered. The
+    compressed output is flushed every `flush_size` bytes of body, so that
+    a stream of small chunks is still compressed in large blocks.
+    Responses whose whole body is smaller than `minimum_size`, responses
+    that are already encoded and Parquet files, which are compressed
+    internally, are sent as they are.
+
+    Attributes:
+        app: The wrapped application.
+        minimum_size: The size under which a response is not compressed.
+        gzip_level: The gzip compression level, from 1 to 9.
+        zstd_level: The zstd compression level, from 1 to 22.
+        flush_size: The number of bytes of body after which the compressed
+        output is flushed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        zstd_level: int = 3,
+        flush_size: int = 64 * 1024,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+        self.flush_size = flush_size
+
+    def _encoder(self, encoding: str) -> _Encoder:
+        if encoding == "zstd":
+            return _zstd_encoder(self.zstd_level, self.flush_size)
+        return _gzip_encoder(self.gzip_level, self.flush_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", "")
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        encoder: _Encoder | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                media_type = headers.get("content-type", "").split(";")[0]
+                if (
+                    "content-encoding" not in headers
+                    and media_type not in UNCOMPRESSED_MEDIA_TYPES
+                    and (more_body or len(body) >= self.minimum_size)
+                ):
+                    encoder = self._encoder(encoding)
+                    headers["Content-Encoding"] = encoding
+                    if "content-length" in headers:
+                        del headers["content-length"]
+            if encoder is not None:
+                body = encoder.compress(body)
+                if not more_body:
+                    body += encoder.finish()
+                elif not body and start is None:
+                    return
+                message = {**message, "body": body}
+            if start is not None:
+                if encoder is not None and not more_body:
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                start = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
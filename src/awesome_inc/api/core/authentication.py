@@ -1,32 +1,115 @@
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext  # type: ignore
 from datetime import datetime, timedelta, timezone
-import jwt
-from jwt.exceptions import InvalidTokenError
 from fastapi import Depends, HTTPException, status
 from typing import Annotated
+from collections import OrderedDict
 from .config import TokenData
+from .metrics import password_verification_duration, token_cache_lookups
 from awesome_inc.api.core.config import Credentials
+import hashlib
+import threading
+import time
+
+
+class TokenCache:
+    """
+    A bounded cache of tokens that have already been verified.
+
+    Tokens are keyed by their SHA-256 hash, so the cache never holds the
+    tokens themselves. Each entry is forgotten once the token expires, and
+    the least recently used entry is evicted when the cache is full.
+
+    Attributes:
+        maxsize: The maximum number of tokens kept in the cache.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> bool:
+        """
+        Checks whether a token has been verified and has not expired yet.
+
+        Args:
+            token (str): The JWT token.
+
+        Returns:
+            bool: True if the token is in the cache and still valid.
+        """
+        key = self._key(token)
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.time():
+                del self._entries[key]
+                return False
+            self._entries.move_to_end(key)
+            return True
+
+    def add(self, token: str, expires_at: float) -> None:
+        """
+        Records a verified token until it expires.
+
+        Args:
+            token (str): The JWT token.
+            expires_at (float): The expiry of the token, as a UNIX timestamp.
+        """
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = expires_at
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
 
 
 class Authentication:
     """
     A class that provides methods for authentication and token management.
 
+    passlib and PyJWT are imported when first needed rather than with this
+    module, so that importing the application stays fast.
+
     Attributes:
         stored_credentials: A dictionary containing the username and hashed
         password of the stored credentials.
         secret_key: A secret key used for encoding and decoding tokens.
         algorithm: The algorithm used for encoding and decoding tokens.
+        token_cache: The cache of the tokens already verified.
     """
 
     def __init__(
-        self, stored_credentials: Credentials, secret_key: str, algorithm: str
+        self,
+        stored_credentials: Credentials,
+        secret_key: str,
+        algorithm: str,
+        token_cache_size: int = 1024,
     ):
         self.stored_credentials = stored_credentials
         self.secret_key = secret_key
         self.algorithm = algorithm
+        from passlib.context import CryptContext  # type: ignore
+
         self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.token_cache = TokenCache(maxsize=token_cache_size)
+
+    def prepare(self) -> None:
+        """
+        Loads PyJWT and the bcrypt backend, so that the first login and the
+        first authenticated request do not pay for it.
+        """
+        import jwt  # noqa: F401
+
+        self.pwd_context.handler().get_backend()
 
     def verify_password(self, plain_password: str, hashed_password: str):
         """
@@ -41,7 +124,13 @@ class Authentication:
             bool: True if the plain password matches the hashed password,
             False otherwise.
         """
-        return self.pwd_context.verify(plain_password, hashed_password)
+        started = time.perf_counter()
+        try:
+            return self.pwd_context.verify(plain_password, hashed_password)
+        finally:
+            password_verification_duration.observe(
+                time.perf_counter() - started
+            )
 
     def get_password_hash(self, password: str):
         """
@@ -70,6 +159,8 @@ class Authentication:
             str: The encoded access token.
         """
 
+        import jwt
+
         to_encode = data.copy()
         if expires_delta:
             expire = datetime.now(timezone.utc) + expires_delta
@@ -108,6 +199,9 @@ class Authentication:
         """
         Decodes a JWT token and validates the credentials.
 
+        Tokens that have already been verified are looked up in the token
+        cache instead of being decoded again, until they expire.
+
         Args:
             token (Annotated[str,
             Depends(OAuth2PasswordBearer(tokenUrl="token"))]): The JWT token to
@@ -122,19 +216,27 @@ class Authentication:
             in the token does not match the stored credentials.
         """
 
+        import jwt
+
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+        if self.token_cache.get(token):
+            token_cache_lookups.inc(result="hit")
+            return True
+        token_cache_lookups.inc(result="miss")
         try:
             payload = jwt.decode(
                 token, self.secret_key, algorithms=[self.algorithm]
             )
             username: str = payload.get("sub")
             token_data = TokenData(username=username)
-        except InvalidTokenError:
+        except jwt.InvalidTokenError:
             raise credentials_exception
         if token_data.username != self.stored_credentials.username:
             raise credentials_exception
+        if "exp" in payload:
+            self.token_cache.add(token, payload["exp"])
         return True
@@ -16,11 +16,105 @@ class TokenData(BaseModel):
     username: str | None = None
 
 
-_STORED_CREDENTIALS: Credentials = Credentials(
-    username=os.environ["ADF__USERNAME"],
-    hashed_password=os.environ["HASHED__PASSWORD"],
-)
-
-_SECRET_KEY: str = os.environ["SECRET__KEY"]
 _ALGORITHM: str = "HS256"
 _ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+_TOKEN_CACHE_SIZE: int = int(os.environ.get("AUTH__TOKEN_CACHE_SIZE", 1024))
+_LOGIN_WORKERS: int = int(os.environ.get("AUTH__LOGIN_WORKERS", 2))
+_LOGIN_QUEUE_SIZE: int = int(os.environ.get("AUTH__LOGIN_QUEUE_SIZE", 16))
+_CATALOG_TTL_SECONDS: float | None = (
+    float(os.environ["CATALOG__TTL_SECONDS"])
+    if "CATALOG__TTL_SECONDS" in os.environ
+    else None
+)
+_MAX_PAGE_SIZE: int = int(os.environ.get("API__MAX_PAGE_SIZE", 10000))
+_STREAM_BATCH_SIZE: int = int(os.environ.get("API__STREAM_BATCH_SIZE", 1000))
+_WATERMARK_COLUMNS: dict[str, str] = {
+    variable.removeprefix("WATERMARK__").lower(): column
+    for variable, column in os.environ.items()
+    if variable.startswith("WATERMARK__")
+}
+_ASYNC_DATABASE: bool = os.environ.get("DATABASE__ASYNC", "").lower() in {
+    "1",
+    "true",
+}
+_ETAG_TABLES: set[str] = set(
+    os.environ.get(
+        "API__ETAG_TABLES", "country,product,product_category"
+    ).split(",")
+)
+_RESPONSE_CACHE_MAX_BYTES: int = int(
+    os.environ.get("CACHE__MAX_BYTES", 64 * 1024 * 1024)
+)
+_RESPONSE_CACHE_TTL_SECONDS: float = float(
+    os.environ.get("CACHE__TTL_SECONDS", 30)
+)
+_RESPONSE_CACHE_TABLE_TTLS: dict[str, float] = {
+    variable.removeprefix("CACHE__TTL__").lower(): float(seconds)
+    for variable, seconds in os.environ.items()
+    if variable.startswith("CACHE__TTL__")
+}
+_COMPRESSION_MINIMUM_SIZE: int = int(
+    os.environ.get("API__COMPRESSION_MINIMUM_SIZE", 1024)
+)
+_COMPRESSION_FLUSH_SIZE: int = int(
+    os.environ.get("API__COMPRESSION_FLUSH_SIZE", 64 * 1024)
+)
+_GZIP_LEVEL: int = int(os.environ.get("API__GZIP_LEVEL", 6))
+_ZSTD_LEVEL: int = int(os.environ.get("API__ZSTD_LEVEL", 3))
+_N_PLUS_ONE_THRESHOLD: int = int(
+    os.environ.get("API__N_PLUS_ONE_THRESHOLD", 10)
+)
+_WARM_UP: bool = os.environ.get("API__WARM_UP", "true").lower() in {
+    "1",
+    "true",
+}
+
+
+class Settings(BaseModel):
+    """
+    The settings an application is created with.
+
+    Only the credentials and the secret key are required. The other settings
+    default to the values read from the environment when this module is
+    imported.
+
+    Attributes:
+        stored_credentials: The username and hashed password of the user.
+        secret_key: The key used to sign the access tokens.
+        algorithm: The algorithm used to sign the access tokens.
+        access_token_expire_minutes: The lifetime of the access tokens.
+        token_cache_size: The number of verified tokens kept in memory.
+        login_workers: The number of passwords verified at a time.
+        login_queue_size: The number of logins waiting for a worker.
+        warm_up: Whether the connection pool and the queries are prepared at
+        startup, before the health check reports the application ready.
+    """
+
+    stored_credentials: Credentials
+    secret_key: str
+    algorithm: str = _ALGORITHM
+    access_token_expire_minutes: int = _ACCESS_TOKEN_EXPIRE_MINUTES
+    token_cache_size: int = _TOKEN_CACHE_SIZE
+    login_workers: int = _LOGIN_WORKERS
+    login_queue_size: int = _LOGIN_QUEUE_SIZE
+    warm_up: bool = _WARM_UP
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """
+        Reads the credentials and the secret key from the environment.
+
+        Returns:
+            Settings: The settings.
+
+        Raises:
+            KeyError: If any of the required environment variables are
+            missing.
+        """
+        return cls(
+            stored_credentials=Credentials(
+                username=os.environ["ADF__USERNAME"],
+                hashed_password=os.environ["HASHED__PASSWORD"],
+            ),
+            secret_key=os.environ["SECRET__KEY"],
+        )
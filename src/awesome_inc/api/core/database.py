@@ -2,9 +2,22 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.engine import Engine
 from sqlalchemy.engine.url import URL
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from sqlalchemy.sql import Executable
+from typing import Any, Awaitable, Callable, Sequence
+from .instrumentation import instrument_engine
+from .metrics import pool_checkout_wait
 import os
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +28,24 @@ class Database(BaseModel):
     password: str
     dbname: str
     port: int
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    echo: bool = False
+    slow_query_seconds: float = 1.0
 
-    def sqlalchemy_url(self) -> URL:
+    def sqlalchemy_url(self, drivername: str = "postgresql+psycopg2") -> URL:
         """
         Returns a SQLAlchemy URL object representing the database connection
         details.
 
+        :param drivername: The SQLAlchemy dialect and driver to connect with.
         :return: A SQLAlchemy URL object.
         """
         return URL.create(
-            drivername="postgresql+psycopg2",
+            drivername=drivername,
             username=self.username,
             password=self.password,
             host=self.hostname,
@@ -32,44 +53,325 @@ class Database(BaseModel):
             database=self.dbname,
         )
 
+    def engine_options(self) -> dict:
+        """
+        Returns the keyword arguments used to configure the engine and its
+        connection pool.
+
+        :return: A dictionary of `create_engine` keyword arguments.
+        """
+        return {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+            "echo": self.echo,
+        }
+
 
-def new_engine() -> Engine:
+_POOL_SETTINGS: dict[str, str] = {
+    "pool_size": "DATABASE__POOL_SIZE",
+    "max_overflow": "DATABASE__MAX_OVERFLOW",
+    "pool_timeout": "DATABASE__POOL_TIMEOUT",
+    "pool_recycle": "DATABASE__POOL_RECYCLE",
+    "pool_pre_ping": "DATABASE__POOL_PRE_PING",
+    "echo": "DATABASE__ECHO",
+    "slow_query_seconds": "DATABASE__SLOW_QUERY_SECONDS",
+}
+
+_ASYNC_DRIVERNAME = "postgresql+asyncpg"
+
+
+class TimedQueuePool(QueuePool):
     """
-    Creates a new SQLAlchemy engine for connecting to the database.
+    A queue pool recording how long getting a connection takes, including
+    the time spent waiting for one to be returned when the pool is
+    exhausted.
+    """
+
+    engine_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.observe(
+                time.perf_counter() - started, engine=self.engine_label
+            )
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """The async counterpart of `TimedQueuePool`."""
+
+    engine_label = "async"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.observe(
+                time.perf_counter() - started, engine=self.engine_label
+            )
+
+
+_engine: Engine | None = None
+_sessionmaker: sessionmaker | None = None
+_async_engine: AsyncEngine | None = None
+_async_sessionmaker: async_sessionmaker | None = None
+
+
+def database_from_env() -> Database:
+    """
+    Builds the database settings from environment variables.
+
+    The connection details are mandatory. The pool settings are optional and
+    fall back to the defaults declared on the `Database` model.
 
     Returns:
-        Engine: A new SQLAlchemy engine object.
+        Database: The database settings.
 
     Raises:
         KeyError: If any of the required environment variables are missing.
     """
     try:
-        database = Database(
-            hostname=os.environ["DATABASE__HOSTNAME"],
-            username=os.environ["DATABASE__USERNAME"],
-            password=os.environ["DATABASE__PASSWORD"],
-            dbname=os.environ["DATABASE__DB"],
-            port=int(os.environ["DATABASE__PORT"]),
-        )
+        settings = {
+            "hostname": os.environ["DATABASE__HOSTNAME"],
+            "username": os.environ["DATABASE__USERNAME"],
+            "password": os.environ["DATABASE__PASSWORD"],
+            "dbname": os.environ["DATABASE__DB"],
+            "port": os.environ["DATABASE__PORT"],
+        }
     except KeyError:
         logger.error(
             "Database credentials not found. Were environment variables"
             " correctly set?"
         )
-    uri = database.sqlalchemy_url()
-    return create_engine(uri, echo=True)
+        raise
+    for field, variable in _POOL_SETTINGS.items():
+        if variable in os.environ:
+            settings[field] = os.environ[variable]
+    return Database.model_validate(settings)
+
+
+def new_engine(database: Database | None = None) -> Engine:
+    """
+    Creates a new SQLAlchemy engine for connecting to the database.
+
+    Args:
+        database (Database, optional): The database settings. Defaults to the
+        settings read from the environment.
+
+    Returns:
+        Engine: A new SQLAlchemy engine object.
+
+    Raises:
+        KeyError: If any of the required environment variables are missing.
+    """
+    if database is None:
+        database = database_from_env()
+    engine = create_engine(
+        database.sqlalchemy_url(),
+        poolclass=TimedQueuePool,
+        **database.engine_options(),
+    )
+    instrument_engine(engine, database.slow_query_seconds)
+    return engine
+
+
+def new_async_engine(database: Database | None = None) -> AsyncEngine:
+    """
+    Creates a new SQLAlchemy async engine for connecting to the database with
+    asyncpg.
+
+    Args:
+        database (Database, optional): The database settings. Defaults to the
+        settings read from the environment.
+
+    Returns:
+        AsyncEngine: A new SQLAlchemy async engine object.
+
+    Raises:
+        KeyError: If any of the required environment variables are missing.
+    """
+    if database is None:
+        database = database_from_env()
+    engine = create_async_engine(
+        database.sqlalchemy_url(_ASYNC_DRIVERNAME),
+        poolclass=TimedAsyncQueuePool,
+        **database.engine_options(),
+    )
+    instrument_engine(engine.sync_engine, database.slow_query_seconds)
+    return engine
+
+
+def init_engine(database: Database | None = None) -> Engine:
+    """
+    Creates the process-wide engine and session factory, if not done yet.
+
+    Called once at application startup so that every request shares the same
+    connection pool.
+
+    Args:
+        database (Database, optional): The database settings. Defaults to the
+        settings read from the environment.
+
+    Returns:
+        Engine: The process-wide SQLAlchemy engine.
+    """
+    global _engine, _sessionmaker
+    if _engine is None:
+        _engine = new_engine(database)
+        _sessionmaker = sessionmaker(
+            bind=_engine, autocommit=False, autoflush=False
+        )
+    return _engine
+
+
+def get_engine() -> Engine:
+    """
+    Returns the process-wide engine, creating it on first use.
+
+    :return: The process-wide SQLAlchemy engine.
+    """
+    return init_engine()
+
+
+def dispose_engine() -> None:
+    """
+    Closes all pooled connections and forgets the process-wide engine.
+
+    Called at application shutdown.
+    """
+    global _engine, _sessionmaker
+    if _engine is not None:
+        _engine.dispose()
+    _engine = None
+    _sessionmaker = None
+
+
+def init_async_engine(database: Database | None = None) -> AsyncEngine:
+    """
+    Creates the process-wide async engine and session factory, if not done
+    yet.
+
+    Args:
+        database (Database, optional): The database settings. Defaults to the
+        settings read from the environment.
+
+    Returns:
+        AsyncEngine: The process-wide SQLAlchemy async engine.
+    """
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        _async_engine = new_async_engine(database)
+        _async_sessionmaker = async_sessionmaker(
+            bind=_async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    """
+    Closes all pooled connections of the async engine and forgets it.
+    """
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_sessionmaker = None
+
+
+def warm_up_engine(engine: Engine, statements: Sequence[Executable]) -> None:
+    """
+    Prepares an engine before it serves its first requests.
+
+    As many connections as the pool keeps are opened and returned to the
+    pool, so that the first requests do not wait for connections to be
+    established. Each statement is then executed once, so that its compiled
+    form is in the compiled cache of the engine. The statements should read
+    no rows, e.g. with a limit of 0.
+
+    Args:
+        engine (Engine): The engine.
+        statements (Sequence[Executable]): The statements to compile.
+    """
+    size = engine.pool.size()  # type: ignore[attr-defined]
+    connections = [engine.connect() for _ in range(max(size, 1))]
+    try:
+        for statement in statements:
+            connections[0].execute(statement).close()
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+async def warm_up_async_engine(
+    engine: AsyncEngine, statements: Sequence[Executable]
+) -> None:
+    """
+    Prepares an async engine before it serves its first requests.
+
+    See `warm_up_engine` for the arguments.
+    """
+    size = engine.pool.size()  # type: ignore[attr-defined]
+    connections = [await engine.connect() for _ in range(max(size, 1))]
+    try:
+        for statement in statements:
+            (await connections[0].execute(statement)).close()
+    finally:
+        for connection in connections:
+            await connection.close()
+
+
+def _pool_stats(pool: Pool) -> dict:
+    return {
+        "size": pool.size(),  # type: ignore[attr-defined]
+        "checked_in": pool.checkedin(),  # type: ignore[attr-defined]
+        "checked_out": pool.checkedout(),  # type: ignore[attr-defined]
+        "overflow": pool.overflow(),  # type: ignore[attr-defined]
+    }
+
+
+def pool_status() -> dict:
+    """
+    Reports the state of the process-wide connection pools.
+
+    Returns:
+        dict: The pool size, the number of idle and checked-out connections
+        and the current overflow of the sync engine, and of the async engine
+        under the `async` key if it exists. Empty if no engine has been
+        created.
+    """
+    status = _pool_stats(_engine.pool) if _engine is not None else {}
+    if _async_engine is not None:
+        status["async"] = _pool_stats(_async_engine.pool)
+    return status
 
 
 def get_session() -> Session:
     """
-    Returns a new SQLAlchemy session object.
+    Returns a new SQLAlchemy session bound to the process-wide engine.
 
     :return: A SQLAlchemy session object.
     """
-    sessionlocal = sessionmaker(
-        bind=new_engine(), autocommit=False, autoflush=False
-    )
-    return sessionlocal()
+    init_engine()
+    assert _sessionmaker is not None
+    return _sessionmaker()
+
+
+def get_async_session() -> AsyncSession:
+    """
+    Returns a new SQLAlchemy async session bound to the process-wide async
+    engine.
+
+    :return: A SQLAlchemy async session object.
+    """
+    init_async_engine()
+    assert _async_sessionmaker is not None
+    return _async_sessionmaker()
 
 
 def get_db():
@@ -87,3 +389,47 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Returns a new SQLAlchemy async session object bound to the process-wide
+    async engine.
+
+    Yields:
+        AsyncSession: A new SQLAlchemy async session object.
+
+    Finally:
+        Closes the session.
+    """
+    async with get_async_session() as db:
+        yield db
+
+
+async def run_query(
+    db: Session | AsyncSession,
+    sync_function: Callable[..., Any],
+    async_function: Callable[..., Awaitable[Any]],
+    *args,
+    **kwargs,
+):
+    """
+    Runs a database function with the variant matching the session.
+
+    Async sessions are awaited on the event loop. Blocking sessions are run
+    on the threadpool so that they do not block the event loop.
+
+    Args:
+        db (Session | AsyncSession): The database session object.
+        sync_function (Callable): The function taking a `Session`.
+        async_function (Callable): The coroutine function taking an
+        `AsyncSession`.
+        *args: The other positional arguments of the function.
+        **kwargs: The keyword arguments of the function.
+
+    Returns:
+        The result of the function.
+    """
+    if isinstance(db, AsyncSession):
+        return await async_function(db, *args, **kwargs)
+    return await run_in_threadpool(sync_function, db, *args, **kwargs)
@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+import asyncio
+import threading
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when a bounded executor cannot accept more work."""
+
+
+class BoundedExecutor:
+    """
+    A dedicated thread pool that rejects work instead of queueing it
+    indefinitely.
+
+    At most `max_workers` tasks run at once and at most `max_queue` more wait
+    for a worker. Any task submitted beyond that is rejected immediately, so
+    that a burst of expensive work cannot build up an unbounded backlog.
+
+    Attributes:
+        max_workers: The number of worker threads.
+        max_queue: The number of tasks allowed to wait for a worker.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, name: str):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    async def run(self, function: Callable[..., Any], *args) -> Any:
+        """
+        Runs a blocking function on the executor without blocking the event
+        loop.
+
+        Args:
+            function (Callable): The blocking function.
+            *args: The arguments of the function.
+
+        Returns:
+            The result of the function.
+
+        Raises:
+            ExecutorSaturated: If all the workers are busy and the queue is
+            full.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorSaturated(function.__name__)
+        future = self._executor.submit(partial(function, *args))
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
@@ -0,0 +1,180 @@
+from collections import Counter as Tally
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+from .metrics import registry
+import logging
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+_TABLE = re.compile(r"\b(?:FROM|JOIN|INTO|UPDATE)\s+\"?(\w+)", re.IGNORECASE)
+
+query_duration = registry.histogram(
+    "db_query_duration_seconds",
+    "Time spent executing statements, by table.",
+    ("table",),
+)
+queries_per_request = registry.histogram(
+    "db_queries_per_request",
+    "Statements executed per request, by route.",
+    ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+)
+
+
+class RequestQueries:
+    """
+    The statements executed while handling a request.
+
+    Attributes:
+        scope: The ASGI scope of the request, to find its route.
+        count: The number of statements executed.
+        duration: The time spent executing them, in seconds.
+        statements: The number of executions of each statement.
+    """
+
+    def __init__(self, scope: Scope):
+        self.scope = scope
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Tally[str] = Tally()
+
+    @property
+    def route(self) -> str:
+        return getattr(self.scope.get("route"), "path", "unmatched")
+
+
+current_queries: ContextVar[RequestQueries | None] = ContextVar(
+    "current_queries", default=None
+)
+
+
+def tables(statement: str) -> list[str]:
+    """
+    Lists the tables a statement reads or writes.
+
+    Args:
+        statement (str): The SQL statement.
+
+    Returns:
+        list[str]: The names of the tables, without duplicates.
+    """
+    return list(dict.fromkeys(_TABLE.findall(statement)))
+
+
+def parameters_shape(parameters) -> str:
+    """
+    Describes the parameters of a statement without their values, which may
+    be sensitive.
+
+    Args:
+        parameters: The parameters passed to the DBAPI cursor.
+
+    Returns:
+        str: The names and types of the parameters, e.g.
+        `{id_1: int, param_1: int}`, prefixed with the number of parameter
+        sets of an `executemany`.
+    """
+    if isinstance(parameters, (list, tuple)) and parameters:
+        if isinstance(parameters[0], (dict, list, tuple)):
+            return f"{len(parameters)} x {parameters_shape(parameters[0])}"
+        return "(" + ", ".join(type(p).__name__ for p in parameters) + ")"
+    if isinstance(parameters, dict):
+        return (
+            "{"
+            + ", ".join(
+                f"{name}: {type(value).__name__}"
+                for name, value in parameters.items()
+            )
+            + "}"
+        )
+    return "{}"
+
+
+def instrument_engine(engine: Engine, slow_query_seconds: float) -> None:
+    """
+    Times every statement executed by an engine.
+
+    Each statement is recorded in the `db_query_duration_seconds` histogram
+    under the tables it reads, and counted against the request being
+    handled, if any. Statements slower than `slow_query_seconds` are logged
+    with their route, tables and parameter shape.
+
+    Args:
+        engine (Engine): The engine, or the `sync_engine` of an async engine.
+        slow_query_seconds (float): The duration above which a statement is
+        logged.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        context._started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        duration = time.perf_counter() - context._started_at
+        names = tables(statement)
+        for name in names or ("none",):
+            query_duration.observe(duration, table=name)
+        queries = current_queries.get()
+        if queries is not None:
+            queries.count += 1
+            queries.duration += duration
+            queries.statements[statement] += 1
+        if duration >= slow_query_seconds:
+            logger.warning(
+                "Slow query: %.3fs on %s, route %s, parameters %s: %s",
+                duration,
+                ",".join(names) or "no table",
+                queries.route if queries is not None else "none",
+                parameters_shape(parameters),
+                " ".join(statement.split())[:500],
+            )
+
+
+class QueryTrackingMiddleware:
+    """
+    Counts the statements executed while handling each request, and logs
+    the requests that execute the same statement many times, which is the
+    signature of relationships lazily loaded one row at a time (N+1).
+
+    Attributes:
+        app: The wrapped application.
+        repeated_statement_threshold: The number of executions of the same
+        statement from which a request is logged.
+    """
+
+    def __init__(self, app: ASGIApp, repeated_statement_threshold: int = 10):
+        self.app = app
+        self.repeated_statement_threshold = repeated_statement_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        queries = RequestQueries(scope)
+        token = current_queries.set(queries)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_queries.reset(token)
+            queries_per_request.observe(queries.count, route=queries.route)
+            if queries.statements:
+                statement, executions = queries.statements.most_common(1)[0]
+                if executions >= self.repeated_statement_threshold:
+                    logger.warning(
+                        "Possible N+1 queries: route %s executed %s"
+                        " statements in %.3fs, %s times: %s",
+                        queries.route,
+                        queries.count,
+                        queries.duration,
+                        executions,
+                        " ".join(statement.split())[:500],
+                    )
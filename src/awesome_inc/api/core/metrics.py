@@ -0,0 +1,380 @@
+from bisect import bisect_left
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Iterator, Sequence
+import math
+import threading
+import time
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    """
+    The base class of the metrics, holding one value per combination of
+    label values.
+
+    Attributes:
+        name: The name of the metric.
+        documentation: The help text of the metric.
+        labels: The names of the labels of the metric.
+    """
+
+    type_name = ""
+
+    def __init__(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, object]) -> tuple[str, ...]:
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def _format_labels(
+        self, key: tuple[str, ...], extra: tuple[tuple[str, str], ...] = ()
+    ) -> str:
+        pairs = [*zip(self.labels, key), *extra]
+        if not pairs:
+            return ""
+        return (
+            "{"
+            + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+            + "}"
+        )
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            labels = self._format_labels(key)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+    def render(self) -> Iterator[str]:
+        """
+        Renders the metric in the Prometheus text format.
+
+        Yields:
+            str: The lines of the metric.
+        """
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type_name}"
+        yield from self.samples()
+
+
+class Counter(_Metric):
+    """A value that only goes up, e.g. a number of requests."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        """
+        Increments the counter.
+
+        Args:
+            amount (float, optional): The increment. Defaults to 1.
+            **labels: The values of the labels of the metric.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """A value that goes up and down, e.g. a number of open connections."""
+
+    type_name = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        """
+        Increments the gauge.
+
+        Args:
+            amount (float, optional): The increment. Defaults to 1.
+            **labels: The values of the labels of the metric.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        """
+        Decrements the gauge.
+
+        See `inc` for the arguments.
+        """
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        """
+        Sets the gauge.
+
+        Args:
+            value (float): The new value.
+            **labels: The values of the labels of the metric.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """
+    The distribution of observed values, e.g. of request durations, counted
+    in cumulative buckets.
+
+    Attributes:
+        buckets: The upper bounds of the buckets, in increasing order.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._observations: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        """
+        Records an observation.
+
+        Args:
+            value (float): The observed value.
+            **labels: The values of the labels of the metric.
+        """
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            observations = self._observations.get(key)
+            if observations is None:
+                # One count per bucket, then +Inf, then the sum.
+                observations = [0.0] * (len(self.buckets) + 2)
+                self._observations[key] = observations
+            observations[index] += 1
+            observations[-1] += value
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = [
+                (key, list(obs)) for key, obs in self._observations.items()
+            ]
+        for key, observations in items:
+            cumulative = 0.0
+            for bound, count in zip(
+                (*self.buckets, math.inf), observations[:-1]
+            ):
+                cumulative += count
+                labels = self._format_labels(
+                    key, (("le", _format_value(bound)),)
+                )
+                yield f"{self.name}_bucket{labels} {_format_value(cumulative)}"
+            labels = self._format_labels(key)
+            yield f"{self.name}_sum{labels} {_format_value(observations[-1])}"
+            yield f"{self.name}_count{labels} {_format_value(cumulative)}"
+
+
+class Registry:
+    """
+    The metrics exposed by the API.
+
+    Attributes:
+        metrics: The registered metrics, in registration order.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: list[_Metric] = []
+
+    def counter(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> Counter:
+        """
+        Registers a counter.
+
+        Args:
+            name (str): The name of the metric.
+            documentation (str): The help text of the metric.
+            labels (Sequence[str], optional): The names of its labels.
+
+        Returns:
+            Counter: The counter.
+        """
+        metric = Counter(name, documentation, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> Gauge:
+        """
+        Registers a gauge.
+
+        See `counter` for the arguments.
+
+        Returns:
+            Gauge: The gauge.
+        """
+        metric = Gauge(name, documentation, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """
+        Registers a histogram.
+
+        See `counter` for the arguments.
+
+        Args:
+            buckets (Sequence[float], optional): The upper bounds of the
+            buckets.
+
+        Returns:
+            Histogram: The histogram.
+        """
+        metric = Histogram(name, documentation, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Renders every metric in the Prometheus text format.
+
+        Returns:
+            str: The exposition, to be served with `CONTENT_TYPE`.
+        """
+        return (
+            "\n".join(line for m in self.metrics for line in m.render()) + "\n"
+        )
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total",
+    "Requests handled, by route, method and status.",
+    ("route", "method", "status"),
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Time to send the whole response, by route and method.",
+    ("route", "method"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "Requests being handled."
+)
+rows_read = registry.counter(
+    "table_rows_read_total",
+    "Rows read from the database, by table.",
+    ("table",),
+)
+bytes_served = registry.counter(
+    "table_bytes_served_total",
+    "Bytes of row data sent before compression, by table.",
+    ("table",),
+)
+reads_coalesced = registry.counter(
+    "table_reads_coalesced_total",
+    "Requests served by the table read of an identical request in flight,"
+    " by table.",
+    ("table",),
+)
+token_cache_lookups = registry.counter(
+    "auth_token_cache_lookups_total",
+    "Lookups in the cache of verified tokens, by result.",
+    ("result",),
+)
+password_verification_duration = registry.histogram(
+    "auth_password_verification_seconds",
+    "Time spent verifying passwords with bcrypt.",
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0),
+)
+pool_connections = registry.gauge(
+    "db_pool_connections",
+    "Connections of the database pool, by engine and state.",
+    ("engine", "state"),
+)
+pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the database pool.",
+    ("engine",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+
+class MetricsMiddleware:
+    """
+    Counts the requests in flight, and records the status and the duration
+    of each request by route template, so that the number of series does
+    not grow with path parameters.
+
+    Attributes:
+        app: The wrapped application.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                route=route,
+                method=scope["method"],
+            )
+            http_requests.inc(
+                route=route, method=scope["method"], status=status
+            )
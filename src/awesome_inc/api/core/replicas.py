@@ -0,0 +1,425 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from .database import (
+    Database,
+    database_from_env,
+    get_async_session,
+    get_session,
+    new_async_engine,
+    new_engine,
+)
+from .metrics import registry
+import asyncio
+import itertools
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("round_robin", "least_connections")
+
+# Whether the server is a standby, and the seconds it is behind the primary.
+# A server that is not a standby, or that has replayed everything it
+# received, is not behind.
+_LAG_QUERY = text(
+    """
+    SELECT pg_is_in_recovery(), CASE
+        WHEN NOT pg_is_in_recovery()
+            OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+_STRATEGY: str = os.environ.get("DATABASE__REPLICA_STRATEGY", "round_robin")
+_MAX_LAG_SECONDS: float = float(
+    os.environ.get("DATABASE__REPLICA_MAX_LAG_SECONDS", 30)
+)
+_CHECK_INTERVAL_SECONDS: float = float(
+    os.environ.get("DATABASE__REPLICA_CHECK_INTERVAL_SECONDS", 10)
+)
+_ALLOW_PRIMARY: bool = os.environ.get(
+    "DATABASE__REPLICA_ALLOW_PRIMARY", ""
+).lower() in {"1", "true"}
+
+replica_healthy = registry.gauge(
+    "db_replica_healthy",
+    "Whether reads are routed to the replica, by replica.",
+    ("replica",),
+)
+replica_lag = registry.gauge(
+    "db_replica_lag_seconds",
+    "Replication lag measured by the last health check, by replica.",
+    ("replica",),
+)
+reads_routed = registry.counter(
+    "db_reads_routed_total",
+    "Read sessions opened, by target (a replica or the primary).",
+    ("target",),
+)
+
+
+def replicas_from_env() -> list[Database]:
+    """
+    Builds the settings of the replicas from environment variables.
+
+    `DATABASE__REPLICAS` holds the comma-separated `host[:port]` of each
+    replica. The replicas share the credentials, the database name and the
+    pool settings of the primary.
+
+    Returns:
+        list[Database]: The settings of the replicas, empty if none is
+        configured.
+
+    Raises:
+        KeyError: If replicas are configured but the environment variables of
+        the primary are missing.
+    """
+    addresses = [
+        address.strip()
+        for address in os.environ.get("DATABASE__REPLICAS", "").split(",")
+        if address.strip()
+    ]
+    if not addresses:
+        return []
+    primary = database_from_env()
+    databases = []
+    for address in addresses:
+        hostname, _, port = address.partition(":")
+        databases.append(
+            primary.model_copy(
+                update={
+                    "hostname": hostname,
+                    "port": int(port or primary.port),
+                }
+            )
+        )
+    return databases
+
+
+class Replica:
+    """
+    A read replica and the result of its last health check.
+
+    Attributes:
+        name: The `host:port` of the replica, used in logs and metrics.
+        engine: The engine connected to the replica.
+        healthy: Whether the last health check succeeded with a tolerable
+        lag. Replicas are unhealthy until they have been checked once.
+        lag: The lag measured by the last successful health check, in
+        seconds.
+    """
+
+    def __init__(self, name: str, engine: Engine | AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.healthy = False
+        self.lag: float | None = None
+        if isinstance(engine, AsyncEngine):
+            self._sessionmaker: sessionmaker | async_sessionmaker = (
+                async_sessionmaker(
+                    bind=engine, autoflush=False, expire_on_commit=False
+                )
+            )
+        else:
+            self._sessionmaker = sessionmaker(
+                bind=engine, autocommit=False, autoflush=False
+            )
+
+    def session(self) -> Session | AsyncSession:
+        """
+        Returns a new session bound to the replica.
+
+        :return: A SQLAlchemy session, async if the engine is async.
+        """
+        return self._sessionmaker()
+
+    def connections(self) -> int:
+        """
+        Returns the number of connections to the replica in use.
+
+        :return: The number of connections checked out of the pool.
+        """
+        return self.engine.pool.checkedout()  # type: ignore[attr-defined]
+
+
+class ReplicaSet:
+    """
+    The read replicas that table reads are routed to.
+
+    Reads are spread over the healthy replicas, either in turn or to the
+    replica with the fewest connections in use. A replica is taken out of
+    rotation when its health check fails or when it lags behind the primary
+    by more than `max_lag_seconds`, and put back once it recovers. Reads go
+    to the primary when no replica is healthy.
+
+    A server that is not in recovery is not a standby, so it does not
+    follow the primary and is never read from, unless `allow_primary` is
+    set, e.g. when a replica address actually points at the primary.
+
+    Attributes:
+        strategy: Either `round_robin` or `least_connections`.
+        max_lag_seconds: The lag above which a replica is not read from.
+        check_interval: The number of seconds between two health checks.
+        allow_primary: Whether servers that are not in recovery are read
+        from.
+        replicas: The configured replicas.
+    """
+
+    def __init__(
+        self,
+        strategy: str = "round_robin",
+        max_lag_seconds: float = 30.0,
+        check_interval: float = 10.0,
+        allow_primary: bool = False,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown replica strategy: {strategy}.")
+        self.strategy = strategy
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.allow_primary = allow_primary
+        self.replicas: list[Replica] = []
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def configure(
+        self,
+        databases: list[Database] | None = None,
+        asynchronous: bool = False,
+    ) -> None:
+        """
+        Creates the engines of the replicas, if not done yet.
+
+        Args:
+            databases (list[Database], optional): The settings of the
+            replicas. Defaults to the replicas read from the environment.
+            asynchronous (bool, optional): Whether to create async engines.
+        """
+        if self.replicas:
+            return
+        if databases is None:
+            databases = replicas_from_env()
+        for database in databases:
+            engine: Engine | AsyncEngine = (
+                new_async_engine(database)
+                if asynchronous
+                else new_engine(database)
+            )
+            self.replicas.append(
+                Replica(f"{database.hostname}:{database.port}", engine)
+            )
+
+    def choose(self) -> Replica | None:
+        """
+        Chooses the replica to read from.
+
+        Returns:
+            Replica | None: A healthy replica, or None if reads should go to
+            the primary.
+        """
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        if self.strategy == "least_connections":
+            return min(healthy, key=Replica.connections)
+        with self._lock:
+            turn = next(self._turn)
+        return healthy[turn % len(healthy)]
+
+    def _record(
+        self, replica: Replica, lag: float | None, in_recovery: bool = True
+    ) -> None:
+        healthy = (
+            lag is not None
+            and lag <= self.max_lag_seconds
+            and (in_recovery or self.allow_primary)
+        )
+        if healthy != replica.healthy:
+            if healthy:
+                logger.info("Routing reads to replica %s.", replica.name)
+            elif lag is not None and not in_recovery:
+                logger.warning(
+                    "Replica %s is out of rotation: it is not in recovery.",
+                    replica.name,
+                )
+            else:
+                logger.warning(
+                    "Replica %s is out of rotation (lag: %s).",
+                    replica.name,
+                    "unreachable" if lag is None else f"{lag:.1f}s",
+                )
+        replica.healthy = healthy
+        replica.lag = lag
+        replica_healthy.set(int(healthy), replica=replica.name)
+        if lag is not None:
+            replica_lag.set(lag, replica=replica.name)
+
+    @staticmethod
+    def _lag(engine: Engine) -> tuple[bool, float]:
+        with engine.connect() as connection:
+            in_recovery, lag = connection.execute(_LAG_QUERY).one()
+        return in_recovery, float(lag)
+
+    @staticmethod
+    async def _lag_async(engine: AsyncEngine) -> tuple[bool, float]:
+        async with engine.connect() as connection:
+            in_recovery, lag = (await connection.execute(_LAG_QUERY)).one()
+        return in_recovery, float(lag)
+
+    async def check(self) -> None:
+        """
+        Measures the lag of every replica and updates their health.
+
+        Each replica is given `check_interval` seconds to answer. A replica
+        that cannot be reached in time, or that is not in recovery while
+        `allow_primary` is not set, is unhealthy.
+        """
+
+        async def check_one(replica: Replica) -> None:
+            if isinstance(replica.engine, AsyncEngine):
+                measure = self._lag_async(replica.engine)
+            else:
+                measure = run_in_threadpool(self._lag, replica.engine)
+            lag: float | None
+            try:
+                in_recovery, lag = await asyncio.wait_for(
+                    measure, self.check_interval
+                )
+            except Exception:
+                logger.debug(
+                    "Health check of replica %s failed.",
+                    replica.name,
+                    exc_info=True,
+                )
+                in_recovery, lag = True, None
+            self._record(replica, lag, in_recovery)
+
+        await asyncio.gather(*(check_one(r) for r in self.replicas))
+
+    async def monitor(self) -> None:
+        """
+        Checks the replicas every `check_interval` seconds, until cancelled.
+        """
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval)
+
+    async def dispose(self) -> None:
+        """
+        Closes the connections to the replicas and forgets them.
+        """
+        for replica in self.replicas:
+            if isinstance(replica.engine, AsyncEngine):
+                await replica.engine.dispose()
+            else:
+                replica.engine.dispose()
+        self.replicas = []
+
+    def status(self) -> list[dict]:
+        """
+        Reports the health of the replicas.
+
+        Returns:
+            list[dict]: The name, health, lag and connections in use of each
+            replica.
+        """
+        return [
+            {
+                "name": replica.name,
+                "healthy": replica.healthy,
+                "lag": replica.lag,
+                "connections": replica.connections(),
+            }
+            for replica in self.replicas
+        ]
+
+
+replicas = ReplicaSet(
+    strategy=_STRATEGY,
+    max_lag_seconds=_MAX_LAG_SECONDS,
+    check_interval=_CHECK_INTERVAL_SECONDS,
+    allow_primary=_ALLOW_PRIMARY,
+)
+
+
+def read_session(
+    request: Request, primary: bool = False, asynchronous: bool = False
+):
+    """
+    Opens a new session for reading tables on behalf of a request.
+
+    The session is bound to a healthy replica, or to the primary if none is
+    healthy, if `primary` is set or if the request is an incremental
+    extraction, i.e. has a `since` query parameter. The caller closes it.
+
+    Args:
+        request (Request): The request the tables are read for.
+        primary (bool, optional): Whether to read from the primary.
+        asynchronous (bool, optional): Whether to open an async session.
+
+    Returns:
+        Session | AsyncSession: A new SQLAlchemy session object.
+    """
+    # The pages of an incremental extraction must all see the rows up to the
+    # watermark of its first page, which replicas lagging by different
+    # amounts may not have replayed yet.
+    primary = primary or "since" in request.query_params
+    replica = None if primary else replicas.choose()
+    reads_routed.inc(target=replica.name if replica else "primary")
+    if replica is not None:
+        return replica.session()
+    return get_async_session() if asynchronous else get_session()
+
+
+def get_read_db(request: Request, primary: bool = False):
+    """
+    Returns a new SQLAlchemy session object for reading tables, bound as
+    described in `read_session`.
+
+    Args:
+        request (Request): The incoming request.
+        primary (bool, optional): Whether to read from the primary, e.g.
+        when the latest writes must be seen. Defaults to False.
+
+    Yields:
+        Session: A new SQLAlchemy session object.
+
+    Finally:
+        Closes the session.
+    """
+    db = read_session(request, primary, asynchronous=False)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request, primary: bool = False):
+    """
+    Returns a new SQLAlchemy async session object for reading tables.
+
+    See `get_read_db` for the arguments.
+
+    Yields:
+        AsyncSession: A new SQLAlchemy async session object.
+
+    Finally:
+        Closes the session.
+    """
+    db = read_session(request, primary, asynchronous=True)
+    try:
+        yield db
+    finally:
+        await db.close()
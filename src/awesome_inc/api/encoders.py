@@ -0,0 +1,49 @@
+from functools import lru_cache
+from pydantic_core import to_json
+from typing import Iterable, Sequence
+
+
+class RowEncoder:
+    """
+    Encodes Core rows straight to a JSON array of objects.
+
+    Rows are not validated against the pydantic schemas: the columns are
+    typed by the database, and the schemas only document the response in
+    the OpenAPI specification.
+
+    Attributes:
+        columns: The names of the leading columns of each row, in order.
+        Trailing columns, such as a primary key only selected for
+        pagination, are left out.
+    """
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = tuple(columns)
+
+    def encode(self, rows: Iterable[Sequence]) -> bytes:
+        """
+        Encodes rows.
+
+        Args:
+            rows (Iterable[Sequence]): The rows, as tuples of column values.
+
+        Returns:
+            bytes: The JSON array.
+        """
+        columns = self.columns
+        return to_json([dict(zip(columns, row)) for row in rows])
+
+
+@lru_cache
+def row_encoder(columns: tuple[str, ...]) -> RowEncoder:
+    """
+    Returns the encoder of rows with some columns, built once per set of
+    columns.
+
+    Args:
+        columns (tuple[str, ...]): The names of the columns, in order.
+
+    Returns:
+        RowEncoder: The encoder.
+    """
+    return RowEncoder(columns)
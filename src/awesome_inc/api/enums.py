@@ -1,4 +1,5 @@
 from enum import Enum
+from . import schemas
 from .models import Country, Customer, Installation, Product, ProductCategory
 
 
@@ -8,3 +9,11 @@ class ORMTables(Enum):
     installation = Installation
     product = Product
     product_category = ProductCategory
+
+
+class SchemaTables(Enum):
+    country = schemas.Country
+    customer = schemas.Customer
+    installation = schemas.Installation
+    product = schemas.Product
+    product_category = schemas.ProductCategory
@@ -0,0 +1,270 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection, Engine
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator
+from .columnar import PARQUET_MEDIA_TYPE, ColumnarEncoder, arrow_schema
+from .core.database import Database, database_from_env, new_engine
+from .models import Base
+import argparse
+import csv
+import hashlib
+import io
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+ISOLATION_LEVEL = "REPEATABLE READ"
+
+FORMATS = ("csv", "parquet")
+
+_SNAPSHOT_ID = re.compile(r"[0-9A-F]+(-[0-9A-F]+)+")
+
+
+@contextmanager
+def snapshot_transaction(engine: Engine) -> Iterator[Connection]:
+    """
+    Opens a connection with a `REPEATABLE READ` transaction, the isolation
+    level snapshots can be exported from and imported into.
+
+    Args:
+        engine (Engine): The engine to take the connection from.
+
+    Yields:
+        Connection: The connection, in the transaction.
+    """
+    connect = engine.connect().execution_options(
+        isolation_level=ISOLATION_LEVEL
+    )
+    with connect as connection, connection.begin():
+        yield connection
+
+
+def export_snapshot(connection: Connection) -> str:
+    """
+    Exports the snapshot of the transaction open on a connection, so that
+    other connections can read the same state of the database.
+
+    The snapshot remains importable until the transaction ends.
+
+    Args:
+        connection (Connection): A connection in a `REPEATABLE READ`
+        transaction.
+
+    Returns:
+        str: The identifier of the snapshot.
+    """
+    return connection.execute(text("SELECT pg_export_snapshot()")).scalar_one()
+
+
+def import_snapshot(connection: Connection, snapshot: str) -> None:
+    """
+    Makes the transaction open on a connection read an exported snapshot.
+
+    Must be the first statement of the transaction.
+
+    Args:
+        connection (Connection): A connection in a new `REPEATABLE READ`
+        transaction.
+        snapshot (str): The identifier returned by `export_snapshot`.
+
+    Raises:
+        ValueError: If the identifier is not a snapshot identifier.
+    """
+    if not _SNAPSHOT_ID.fullmatch(snapshot):
+        raise ValueError(f"Invalid snapshot identifier: {snapshot!r}.")
+    connection.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot}'"))
+
+
+class _HashingWriter:
+    """Writes bytes to a file while computing their SHA-256 digest."""
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.digest = hashlib.sha256()
+
+    def write(self, data: bytes) -> None:
+        self.file.write(data)
+        self.digest.update(data)
+
+
+def _csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def export_table(
+    engine: Engine,
+    snapshot: str,
+    model,
+    directory: Path,
+    file_format: str = "parquet",
+    batch_size: int = 10000,
+) -> dict:
+    """
+    Writes every row of a table, as of an exported snapshot, to a file.
+
+    Args:
+        engine (Engine): The engine to take a connection from.
+        snapshot (str): The identifier of the snapshot to read.
+        model (Model): The model representing the table.
+        directory (Path): The directory of the file.
+        file_format (str, optional): Either `csv` or `parquet`.
+        batch_size (int, optional): The number of rows fetched from the
+        server-side cursor and written at a time. Parquet rows are written
+        in row groups of `columnar.ROW_GROUP_SIZE` rows regardless.
+
+    Returns:
+        dict: The name of the file, its number of rows and the SHA-256 digest
+        of its content.
+    """
+    table = model.__table__
+    columns = [column.name for column in table.columns]
+    path = directory / f"{table.name}.{file_format}"
+    query = (
+        select(*table.columns)
+        .order_by(*table.primary_key.columns)
+        .execution_options(yield_per=batch_size)
+    )
+    rows = 0
+    with snapshot_transaction(engine) as connection, path.open("wb") as file:
+        import_snapshot(connection, snapshot)
+        writer = _HashingWriter(file)
+        if file_format == "parquet":
+            encoder = ColumnarEncoder(
+                arrow_schema(model, columns), PARQUET_MEDIA_TYPE
+            )
+        else:
+            writer.write(_csv_chunk([columns]))
+        for partition in connection.execute(query).partitions():
+            rows += len(partition)
+            if file_format == "parquet":
+                writer.write(encoder.encode(partition))
+            else:
+                writer.write(_csv_chunk(partition))
+        if file_format == "parquet":
+            writer.write(encoder.close())
+    logger.info("Exported %s rows of %s.", rows, table.name)
+    return {
+        "file": path.name,
+        "rows": rows,
+        "sha256": writer.digest.hexdigest(),
+    }
+
+
+def export_database(
+    engine: Engine,
+    directory: Path,
+    file_format: str = "parquet",
+    workers: int = 4,
+    batch_size: int = 10000,
+) -> dict:
+    """
+    Exports every table of the database concurrently, all from the same
+    snapshot, and writes a manifest describing the files.
+
+    A coordinating transaction exports its snapshot and stays open while
+    each table is read on its own connection, which imports the snapshot.
+    The tables are therefore consistent with each other, and the export
+    takes about as long as its largest table.
+
+    Args:
+        engine (Engine): The engine to take connections from. Its pool must
+        allow `workers + 1` connections.
+        directory (Path): The directory of the files, created if needed.
+        file_format (str, optional): Either `csv` or `parquet`.
+        workers (int, optional): The number of tables exported at a time.
+        batch_size (int, optional): The number of rows fetched and written
+        at a time.
+
+    Returns:
+        dict: The manifest, also written to `manifest.json`.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format: {file_format}.")
+    directory.mkdir(parents=True, exist_ok=True)
+    models = {
+        mapper.class_.__tablename__: mapper.class_
+        for mapper in Base.registry.mappers
+    }
+    started_at = datetime.now(timezone.utc)
+    with snapshot_transaction(engine) as connection:
+        snapshot = export_snapshot(connection)
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="export"
+        ) as executor:
+            futures = {
+                table.name: executor.submit(
+                    export_table,
+                    engine,
+                    snapshot,
+                    models[table.name],
+                    directory,
+                    file_format,
+                    batch_size,
+                )
+                for table in Base.metadata.sorted_tables
+            }
+            tables = {
+                name: future.result() for name, future in futures.items()
+            }
+    manifest = {
+        "snapshot": snapshot,
+        "started_at": started_at.isoformat(),
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "format": file_format,
+        "tables": tables,
+    }
+    (directory / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Exports the database configured with the `DATABASE__*` environment
+    variables.
+
+    Usage: `python -m awesome_inc.api.export <directory> [--format csv]
+    [--workers 4] [--batch-size 10000]`.
+
+    Args:
+        argv (list[str], optional): The command line arguments. Defaults to
+        `sys.argv`.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    arguments = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    database: Database = database_from_env()
+    database = database.model_copy(
+        update={"pool_size": arguments.workers + 1, "max_overflow": 0}
+    )
+    engine = new_engine(database)
+    try:
+        manifest = export_database(
+            engine,
+            arguments.directory,
+            arguments.format,
+            arguments.workers,
+            arguments.batch_size,
+        )
+    finally:
+        engine.dispose()
+    logger.info(
+        "Exported %s tables from snapshot %s.",
+        len(manifest["tables"]),
+        manifest["snapshot"],
+    )
+
+
+if __name__ == "__main__":
+    main()
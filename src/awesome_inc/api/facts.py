@@ -0,0 +1,133 @@
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .core.config import _STREAM_BATCH_SIZE
+from .models import Country, Customer, Installation, Product, ProductCategory
+
+
+def installation_facts_query(limit: int | None = None, after=None) -> Select:
+    """
+    Builds the query reading installations joined with their customer,
+    country, product and product category, in installation id order.
+
+    The joins are done by Postgres in a single query, and one flat row is
+    returned per installation.
+
+    Args:
+        limit (int, optional): The maximum number of rows to return. Defaults
+        to None, which returns every row.
+        after (optional): Only installations whose id is greater than this
+        value are returned. Defaults to None.
+
+    Returns:
+        Select: The query. Its columns are named after the fields of the
+        `InstallationFact` schema.
+    """
+    query = (
+        select(
+            Installation.id.label("installation_id"),
+            Installation.name.label("installation_name"),
+            Installation.description,
+            Installation.installation_date,
+            Customer.id.label("customer_id"),
+            Customer.name.label("customer_name"),
+            Customer.premium_customer,
+            Country.id.label("country_id"),
+            Country.name.label("country_name"),
+            Country.region,
+            Product.id.label("product_id"),
+            Product.reference.label("product_reference"),
+            Product.name.label("product_name"),
+            Product.price,
+            ProductCategory.id.label("category_id"),
+            ProductCategory.name.label("category_name"),
+        )
+        .join(Installation.customer)
+        .join(Customer.country)
+        .join(Installation.product)
+        .join(Product.product_category)
+        .order_by(Installation.id)
+    )
+    if after is not None:
+        query = query.where(Installation.id > after)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def retrieve_installation_facts(
+    db: Session, limit: int | None = None, after=None
+):
+    """
+    Retrieves the installation facts.
+
+    Args:
+        db (Session): The database session object.
+        limit (int, optional): The maximum number of rows to return.
+        after (optional): The id of the last installation already returned.
+
+    Returns:
+        List[Row]: The installation facts.
+    """
+    return db.execute(installation_facts_query(limit, after)).all()
+
+
+async def retrieve_installation_facts_async(
+    db: AsyncSession, limit: int | None = None, after=None
+):
+    """
+    Retrieves the installation facts with an async session.
+
+    See `retrieve_installation_facts` for the arguments.
+
+    Returns:
+        List[Row]: The installation facts.
+    """
+    return (await db.execute(installation_facts_query(limit, after))).all()
+
+
+def stream_installation_facts(
+    db: Session,
+    limit: int | None = None,
+    after=None,
+    batch_size: int = _STREAM_BATCH_SIZE,
+):
+    """
+    Iterates over the installation facts from a server-side cursor.
+
+    Args:
+        db (Session): The database session object.
+        limit (int, optional): The maximum number of rows to return.
+        after (optional): The id of the last installation already returned.
+        batch_size (int, optional): The number of rows fetched from the
+        cursor at a time.
+
+    Yields:
+        Row: The installation facts.
+    """
+    query = installation_facts_query(limit, after).execution_options(
+        yield_per=batch_size
+    )
+    yield from db.execute(query)
+
+
+async def stream_installation_facts_async(
+    db: AsyncSession,
+    limit: int | None = None,
+    after=None,
+    batch_size: int = _STREAM_BATCH_SIZE,
+):
+    """
+    Iterates over the installation facts from a server-side cursor, with an
+    async session.
+
+    See `stream_installation_facts` for the arguments.
+
+    Yields:
+        Row: The installation facts.
+    """
+    query = installation_facts_query(limit, after).execution_options(
+        yield_per=batch_size
+    )
+    async for row in await db.stream(query):
+        yield row
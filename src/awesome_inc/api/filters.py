@@ -0,0 +1,127 @@
+from sqlalchemy import ColumnElement
+from datetime import date, datetime
+from typing import Iterable
+import operator
+
+OPERATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+RESERVED_PARAMETERS = {
+    "limit",
+    "after",
+    "fields",
+    "since",
+    "format",
+    "primary",
+}
+
+
+class InvalidQuery(ValueError):
+    """Raised when a projection or a filter does not match the table."""
+
+
+def _column(model, name: str):
+    column = model.__table__.columns.get(name)
+    if column is None:
+        raise InvalidQuery(f"{name} is not a column of {model.__tablename__}.")
+    return column
+
+
+def coerce_value(column, value: str):
+    """
+    Converts a query parameter to the Python type of a column.
+
+    Args:
+        column (Column): The column the value is compared with.
+        value (str): The raw value. Values decoded from a cursor may be of
+        another type.
+
+    Returns:
+        The converted value.
+
+    Raises:
+        InvalidQuery: If the value cannot be converted.
+    """
+    python_type = column.type.python_type
+    try:
+        if python_type is date:
+            return date.fromisoformat(value)
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        return python_type(value)
+    except (TypeError, ValueError) as error:
+        raise InvalidQuery(
+            f"Invalid value for {column.name}: {value!r}."
+        ) from error
+
+
+def parse_fields(model, fields: str) -> list[str]:
+    """
+    Parses a comma-separated list of columns to project.
+
+    Args:
+        model (Model): The model representing the table.
+        fields (str): The comma-separated column names, e.g.
+        `"id,customer_id"`.
+
+    Returns:
+        list[str]: The column names, in the requested order and without
+        duplicates.
+
+    Raises:
+        InvalidQuery: If a name is not a column of the table.
+    """
+    names = list(
+        dict.fromkeys(f.strip() for f in fields.split(",") if f.strip())
+    )
+    if not names:
+        raise InvalidQuery("fields must name at least one column.")
+    for name in names:
+        _column(model, name)
+    return names
+
+
+def parse_filters(
+    model, parameters: Iterable[tuple[str, str]]
+) -> list[ColumnElement[bool]]:
+    """
+    Compiles query parameters into SQL conditions on the columns of a table.
+
+    A parameter is either `<column>=<value>` for an equality test, or
+    `<column>__<operator>=<value>` where the operator is one of `eq`, `ne`,
+    `gt`, `gte`, `lt`, `lte` or `in`. The values of `in` are separated by
+    commas. Values are converted to the Python type of the column. Reserved
+    parameters, such as `limit`, are ignored.
+
+    Args:
+        model (Model): The model representing the table.
+        parameters (Iterable[tuple[str, str]]): The query parameters.
+
+    Returns:
+        list[ColumnElement[bool]]: The conditions, to be combined with AND.
+
+    Raises:
+        InvalidQuery: If a parameter names an unknown column or operator, or
+        if a value cannot be converted to the type of its column.
+    """
+    conditions = []
+    for key, value in parameters:
+        if key in RESERVED_PARAMETERS:
+            continue
+        name, _, operation = key.partition("__")
+        column = _column(model, name)
+        if operation == "in":
+            values = [coerce_value(column, v) for v in value.split(",")]
+            conditions.append(column.in_(values))
+        elif operation in OPERATORS or not operation:
+            compare = OPERATORS[operation or "eq"]
+            conditions.append(compare(column, coerce_value(column, value)))
+        else:
+            raise InvalidQuery(f"Unknown operator: {operation}.")
+    return conditions
@@ -1,46 +1,360 @@
-from fastapi import FastAPI, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm
+from fastapi import (
+    APIRouter,
+    FastAPI,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 
-from .schemas import Country, Customer, Installation, Product, ProductCategory
-from .requests import retrieve_all_table_names, retrieve_table_data
-from .core.database import get_db
+from .schemas import (
+    CategoryRevenue,
+    InstallationFact,
+    MonthlyInstallations,
+    RegionRevenue,
+    projection,
+)
+from .requests import (
+    retrieve_all_table_names,
+    table_query,
+    retrieve_table_data,
+    retrieve_table_data_async,
+    stream_table_data,
+    stream_table_data_async,
+)
+from .core.database import (
+    dispose_async_engine,
+    dispose_engine,
+    get_async_db,
+    get_db,
+    init_async_engine,
+    init_engine,
+    pool_status,
+    run_query,
+    warm_up_async_engine,
+    warm_up_engine,
+)
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from .enums import ORMTables
-from typing import Annotated, Union
+from starlette.concurrency import run_in_threadpool
+from .analytics import rollups
+from .batch import batch_chunks, batch_chunks_async
+from .cache import response_cache
+from .coalescing import table_reads
+from .catalog import catalog
+from .compression import CompressionMiddleware
+from .columnar import (
+    ColumnarEncoder,
+    arrow_schema,
+    query_arrow_schema,
+    columnar_chunks,
+    columnar_chunks_async,
+)
+from .encoders import row_encoder
+from .facts import (
+    installation_facts_query,
+    retrieve_installation_facts,
+    retrieve_installation_facts_async,
+    stream_installation_facts,
+    stream_installation_facts_async,
+)
+from .enums import ORMTables, SchemaTables
+from .filters import (
+    InvalidQuery,
+    coerce_value,
+    parse_fields,
+    parse_filters,
+)
+from .versioning import (
+    entity_tag,
+    matches,
+    table_version,
+    table_version_async,
+)
+from .watermarks import (
+    delta_filters,
+    format_watermark,
+    high_water_mark,
+    high_water_mark_async,
+    watermark_column,
+)
+from .streaming import (
+    JSON_MEDIA_TYPE,
+    MEDIA_TYPES,
+    closing_session,
+    closing_session_async,
+    counting,
+    counting_async,
+    ndjson_lines,
+    ndjson_lines_async,
+    negotiate_format,
+)
+from .pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    primary_key,
+)
+from typing import Annotated, Any, AsyncIterator, Iterator, Literal
 from .core.config import (
-    _ACCESS_TOKEN_EXPIRE_MINUTES,
-    _SECRET_KEY,
-    _ALGORITHM,
-    _STORED_CREDENTIALS,
+    _MAX_PAGE_SIZE,
+    _ASYNC_DATABASE,
+    _STREAM_BATCH_SIZE,
+    _ETAG_TABLES,
+    _COMPRESSION_FLUSH_SIZE,
+    _COMPRESSION_MINIMUM_SIZE,
+    _GZIP_LEVEL,
+    _ZSTD_LEVEL,
+    _N_PLUS_ONE_THRESHOLD,
+    Settings,
     Token,
 )
 from .core.authentication import Authentication
+from .core.instrumentation import QueryTrackingMiddleware
+from .core.replicas import (
+    get_async_read_db,
+    get_read_db,
+    read_session,
+    replicas,
+)
+from .core.metrics import (
+    CONTENT_TYPE,
+    MetricsMiddleware,
+    bytes_served,
+    pool_connections,
+    reads_coalesced,
+    registry,
+    rows_read,
+)
+from .core.executor import BoundedExecutor, ExecutorSaturated
 
+from contextlib import asynccontextmanager
+from functools import cached_property, partial
 from datetime import timedelta
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+# The number of applications started in the process and not stopped yet.
+# They share the process-wide engines and replicas, which are only disposed
+# of once the last one stops.
+_running_apps = 0
+
+
+class AppState:
+    """
+    The components shared by all the requests of an application.
+
+    The components are created the first time they are used, so that
+    importing the application and creating it do not read the environment
+    or import the libraries they need.
+
+    The database engines, the read replicas, the schema catalog, the
+    response cache and the read coalescing are not part of the state: they
+    are process-wide and shared by every application of the process.
+
+    Attributes:
+        warming_up: Whether the application is being warmed up, in which
+        case the health check reports it as not ready yet.
+    """
+
+    def __init__(self, settings: Settings | None = None):
+        self._settings = settings
+        self.warming_up = False
+
+    @cached_property
+    def settings(self) -> Settings:
+        """The settings given to `create_app`, or read from the environment."""
+        if self._settings is None:
+            return Settings.from_env()
+        return self._settings
+
+    @cached_property
+    def auth(self) -> Authentication:
+        """
+        The instance of the `Authentication` class, shared by all requests so
+        that its password context and its cache of verified tokens are reused.
+        """
+        return Authentication(
+            stored_credentials=self.settings.stored_credentials,
+            secret_key=self.settings.secret_key,
+            algorithm=self.settings.algorithm,
+            token_cache_size=self.settings.token_cache_size,
+        )
+
+    @cached_property
+    def login_executor(self) -> BoundedExecutor:
+        """The executor verifying passwords, away from the threadpool."""
+        return BoundedExecutor(
+            max_workers=self.settings.login_workers,
+            max_queue=self.settings.login_queue_size,
+            name="login",
+        )
+
+
+def warm_up_statements() -> list[Select]:
+    """
+    Builds the first page query of each table served by the API, in the
+    shape used by the JSON responses, with a limit of 0.
+
+    Returns:
+        list[Select]: The queries.
+    """
+    return [
+        table_query(
+            ORMTables[table_name].value,
+            limit=0,
+            columns=list(SchemaTables[table_name].value.model_fields),
+        )
+        for table_name in catalog.table_names()
+    ]
 
-app = FastAPI()
+
+async def warm_up(state: AppState) -> None:
+    """
+    Prepares the application for its first requests: loads the libraries
+    used by the authentication, reconciles the schema catalog, opens the
+    connections of the pool and compiles the query of each table.
+
+    A failure is logged and the application is reported ready anyway, since
+    every step is otherwise done on first use.
+
+    Args:
+        state (AppState): The state of the application.
+    """
+    started = time.perf_counter()
+    try:
+        await run_in_threadpool(state.auth.prepare)
+        if catalog.ttl is not None:
+            await catalog.reconcile(asynchronous=_ASYNC_DATABASE)
+        if _ASYNC_DATABASE:
+            await warm_up_async_engine(
+                init_async_engine(), warm_up_statements()
+            )
+        else:
+            await run_in_threadpool(
+                warm_up_engine, init_engine(), warm_up_statements()
+            )
+    except Exception:
+        logger.exception("Warm-up failed.")
+    else:
+        logger.info("Warmed up in %.2fs.", time.perf_counter() - started)
+    finally:
+        state.warming_up = False
 
 
-def auth() -> Authentication:
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     """
-    Returns an instance of the `Authentication` class initialized with the
-    stored credentials, secret key, and algorithm.
+    Opens the process-wide database engine at startup and disposes of its
+    connection pool at shutdown. The async engine is opened instead when
+    `DATABASE__ASYNC` is set. Since the engines are shared by the
+    applications of the process, they are only disposed of when the last
+    running application stops.
+
+    Unless disabled in the settings, the application is warmed up in the
+    background once started, and reported as not ready until then. The
+    engines of the read replicas, if any, are opened as well and their
+    health is checked in the background while the application runs. The
+    schema catalog is reconciled in the background too, when
+    `CATALOG__TTL_SECONDS` is set.
+
+    Args:
+        app (FastAPI): The application being served.
+    """
+    global _running_apps
+    state: AppState = app.state.components
+    if _ASYNC_DATABASE:
+        init_async_engine()
+    else:
+        init_engine()
+    replicas.configure(asynchronous=_ASYNC_DATABASE)
+    tasks = []
+    if replicas.replicas:
+        tasks.append(asyncio.create_task(replicas.monitor()))
+    if catalog.ttl is not None:
+        tasks.append(
+            asyncio.create_task(catalog.monitor(asynchronous=_ASYNC_DATABASE))
+        )
+    if state.settings.warm_up:
+        state.warming_up = True
+        tasks.append(asyncio.create_task(warm_up(state)))
+    _running_apps += 1
+    try:
+        yield
+    finally:
+        _running_apps -= 1
+        for task in tasks:
+            task.cancel()
+        if _running_apps == 0:
+            await replicas.dispose()
+            await dispose_async_engine()
+            dispose_engine()
+
+
+router = APIRouter()
+
+session_dependency = get_async_db if _ASYNC_DATABASE else get_db
+read_session_dependency = get_async_read_db if _ASYNC_DATABASE else get_read_db
 
-    :return: An instance of the `Authentication` class.
+
+async def app_state(request: Request) -> AppState:
+    """
+    Returns the state of the application serving a request.
+
+    The dependencies reading the state are coroutines, so that FastAPI runs
+    them on the event loop rather than sending each one to the threadpool.
+
+    :return: The state of the application.
+    :rtype: AppState
+    """
+    return request.app.state.components
+
+
+async def auth(
+    state: Annotated[AppState, Depends(app_state)],
+) -> Authentication:
+    """
+    Returns the instance of the `Authentication` class of the application.
+
+    :return: The instance of the `Authentication` class.
     :rtype: Authentication
     """
-    return Authentication(
-        stored_credentials=_STORED_CREDENTIALS,
-        secret_key=_SECRET_KEY,
-        algorithm=_ALGORITHM,
-    )
+    return state.auth
+
+
+async def decode_token(
+    authentication: Annotated[Authentication, Depends(auth)],
+    token: Annotated[str, Depends(oauth2_scheme)],
+) -> bool:
+    """
+    Decodes the bearer token of a request with the `Authentication` of the
+    application.
+
+    Valid tokens are served from the token cache of the `Authentication`,
+    and decoding the others only checks an HMAC signature, so it is done
+    on the event loop.
 
+    Returns:
+        bool: True if the token is valid.
 
-decode_token = auth().decode_token
+    Raises:
+        HTTPException: If the token cannot be validated.
+    """
+    return authentication.decode_token(token)
 
 
-@app.get("/", tags=["Root"])
-def root():
+@router.get("/", tags=["Root"])
+async def root():
     """
     A function that handles the root endpoint of the API.
 
@@ -53,102 +367,820 @@ def root():
     }
 
 
-@app.post("/token")
-def login_for_access_token(
+@router.get("/health", tags=["Root"])
+async def health(
+    response: Response,
+    state: Annotated[AppState, Depends(app_state)],
+):
+    """
+    Reports the health of the API, of its database connection pool and of the
+    read replicas.
+
+    While the application is warming up, the status is `warming_up` and the
+    response has a 503 status, so that no traffic is routed to it yet.
+
+    Returns:
+        dict: A dictionary containing the status of the API, the state of
+        the connection pool and the health of each replica.
+    """
+    report = {"pool": pool_status(), "replicas": replicas.status()}
+    if state.warming_up:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "warming_up", **report}
+    return {"status": "ok", **report}
+
+
+@router.get("/metrics", tags=["Root"], include_in_schema=False)
+async def metrics():
+    """
+    Exposes the metrics of the API in the Prometheus text format.
+
+    The gauges of the database connection pools are read when the metrics
+    are scraped.
+
+    Returns:
+        Response: The metrics.
+    """
+    sync_pool = pool_status()
+    pools = {"async": sync_pool.pop("async", {}), "sync": sync_pool}
+    for pool_name, pool_stats in pools.items():
+        for connection_state, connections in pool_stats.items():
+            pool_connections.set(
+                connections, engine=pool_name, state=connection_state
+            )
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
+
+@router.post("/token")
+async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     auth: Annotated[Authentication, Depends(auth)],
+    state: Annotated[AppState, Depends(app_state)],
 ) -> Token:
     """
     Authenticates a user and generates an access token for them.
 
+    The password is verified with bcrypt on the dedicated `login_executor`,
+    so that logins do not compete with data requests for the request
+    threadpool.
+
     Args:
         form_data (Annotated[OAuth2PasswordRequestForm, Depends()]): The
         form data containing the username and password.
         auth (Annotated[Authentication, Depends(auth)]): The authentication
         class used to authenticate the user.
+        state (Annotated[AppState, Depends(app_state)]): The state of the
+        application.
 
     Returns:
         Token: A Token object containing the access token and token type.
 
     Raises:
-        HTTPException: If the username or password is incorrect.
+        HTTPException: If the username or password is incorrect, or with a
+        503 status if too many logins are already in progress.
 
     """
-    user = auth.authenticate_user(form_data.username, form_data.password)
+    try:
+        user = await state.login_executor.run(
+            auth.authenticate_user, form_data.username, form_data.password
+        )
+    except ExecutorSaturated:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress. Retry later.",
+            headers={"Retry-After": "1"},
+        )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=_ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token_expires = timedelta(
+        minutes=state.settings.access_token_expire_minutes
+    )
     access_token = auth.create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
     return Token(access_token=access_token, token_type="bearer")
 
 
-@app.get("/all-tables")
+@router.get("/all-tables")
 def retrieve_table_names(
     decoded_token: Annotated[bool, Depends(decode_token)],
 ) -> dict:
     """
-    Retrieves all table names from the database.
+    Retrieves all table names from the schema catalog.
 
-    This function is a GET endpoint that retrieves all table names from the
-    database. It expects a valid decoded token as a dependency.
+    This function is a GET endpoint that retrieves all table names served by
+    the API from memory. It expects a valid decoded token as a dependency.
 
     Parameters:
         decoded_token (Annotated[bool, Depends(decode_token)]): The decoded
         token obtained from the `decode_token` dependency.
 
     Returns:
-        dict: A dictionary containing the table names. The keys are the table
-        names and the values are empty lists.
+        dict: A dictionary containing the list of table names under the
+        `table_names` key.
     """
 
     return retrieve_all_table_names()
 
 
-@app.get(
-    "/{table_name}",
-    response_model=Union[
-        list[Country],
-        list[Customer],
-        list[Installation],
-        list[Product],
-        list[ProductCategory],
-    ],
-)
-def read_table_data(
-    table_name: str,
+@router.post("/all-tables/refresh")
+async def refresh_table_names(
+    decoded_token: Annotated[bool, Depends(decode_token)],
+) -> dict:
+    """
+    Reconciles the schema catalog with the tables that exist in the database.
+
+    The cached responses are dropped, since the tables they were read from
+    may have changed.
+
+    Parameters:
+        decoded_token (Annotated[bool, Depends(decode_token)]): The decoded
+        token obtained from the `decode_token` dependency.
+
+    Returns:
+        dict: A dictionary containing the list of table names served after
+        the refresh.
+    """
+
+    table_names = await catalog.reconcile(asynchronous=_ASYNC_DATABASE)
+    response_cache.invalidate()
+    return {"table_names": table_names}
+
+
+@router.get("/admin/cache")
+def retrieve_cache_stats(
+    decoded_token: Annotated[bool, Depends(decode_token)],
+) -> dict:
+    """
+    Reports the counters of the response cache.
+
+    Parameters:
+        decoded_token (Annotated[bool, Depends(decode_token)]): The decoded
+        token obtained from the `decode_token` dependency.
+
+    Returns:
+        dict: The hits, misses and evictions of the cache, and the number of
+        responses and bytes it currently holds.
+    """
+
+    return response_cache.stats()
+
+
+@router.delete("/admin/cache")
+def invalidate_cache(
     decoded_token: Annotated[bool, Depends(decode_token)],
-    db: Session = Depends(get_db),
+    table_name: str | None = None,
+) -> dict:
+    """
+    Drops cached responses, e.g. after the database has been loaded.
+
+    When no table is given, the analytics rollups are also rebuilt from
+    scratch on their next refresh, so that installations updated or deleted
+    since they were aggregated are taken into account.
+
+    Parameters:
+        decoded_token (Annotated[bool, Depends(decode_token)]): The decoded
+        token obtained from the `decode_token` dependency.
+        table_name (str, optional): The table whose responses are dropped.
+        Defaults to None, which drops the responses of every table.
+
+    Returns:
+        dict: The number of responses dropped under the `invalidated` key.
+    """
+
+    if table_name is None:
+        rollups.reset()
+    return {"invalidated": response_cache.invalidate(table_name)}
+
+
+@router.get("/facts/installations", response_model=list[InstallationFact])
+async def read_installation_facts(
+    request: Request,
+    decoded_token: Annotated[bool, Depends(decode_token)],
+    limit: Annotated[int | None, Query(ge=1, le=_MAX_PAGE_SIZE)] = None,
+    after: str | None = None,
+    format: Literal["json", "ndjson", "arrow", "parquet"] | None = None,
+    db: Session | AsyncSession = Depends(read_session_dependency),
 ):
     """
-    Retrieves data from a specified table in the database.
+    Retrieves one flat row per installation, with the customer, country,
+    product and product category of the installation.
 
-    This function is a GET endpoint that retrieves data from a specified table
-    in the database. It expects a valid decoded token as a dependency. The
-    table name is specified as a parameter.
+    The rows are built by Postgres with a single joined query, so that they
+    replace separate extractions of the five tables. They are paginated and
+    streamed like the table endpoints, in installation id order, and read
+    from a replica unless `primary=true` is given.
 
     Parameters:
-        table_name (str): The name of the table to retrieve data from.
+        request (Request): The incoming request.
         decoded_token (Annotated[bool, Depends(decode_token)]): The decoded
         token obtained from the `decode_token` dependency.
-        db (Session, optional): The database session. Defaults to the result
-        of the `get_db` dependency.
+        limit (int, optional): The maximum number of rows to return.
+        after (str, optional): The cursor returned with the previous page.
+        format (str, optional): The output format, which takes precedence
+        over the `Accept` header.
+        db (Session | AsyncSession, optional): The database session.
 
     Raises:
-        HTTPException: If the specified table does not exist in the database.
+        HTTPException: If the cursor is invalid.
 
     Returns:
-        Union[list[Country], list[Customer], list[Installation], list[Product],
-        list[ProductCategory]]: A list of data from the specified table.
+        list[InstallationFact]: The installation facts.
     """
 
-    if table_name not in retrieve_all_table_names()["table_names"]:
-        raise HTTPException(
-            status_code=404, detail=f"{table_name} table does not exist."
+    response_format = negotiate_format(
+        request.headers.get("accept", ""), format
+    )
+    position: dict = {}
+    if after is not None:
+        try:
+            position = decode_cursor(
+                after, ORMTables.installation.value.__table__.c.id
+            )
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+    headers = {}
+
+    if response_format != "json":
+        media_type = MEDIA_TYPES[response_format]
+        if response_format == "ndjson":
+            serialize = partial(ndjson_lines, InstallationFact)
+            serialize_async = partial(ndjson_lines_async, InstallationFact)
+        else:
+            encoder = ColumnarEncoder(
+                query_arrow_schema(installation_facts_query()), media_type
+            )
+            serialize = partial(
+                columnar_chunks, encoder, batch_size=_STREAM_BATCH_SIZE
+            )
+            serialize_async = partial(
+                columnar_chunks_async, encoder, batch_size=_STREAM_BATCH_SIZE
+            )
+        if isinstance(db, AsyncSession):
+            rows = stream_installation_facts_async(
+                db, limit, position.get("id")
+            )
+            body: Iterator | AsyncIterator = closing_session_async(
+                db, serialize_async(rows)
+            )
+        else:
+            rows = stream_installation_facts(db, limit, position.get("id"))
+            body = closing_session(db, serialize(rows))
+        if response_format == "parquet":
+            headers["Content-Disposition"] = (
+                'attachment; filename="installation_facts.parquet"'
+            )
+        return StreamingResponse(body, media_type=media_type, headers=headers)
+
+    rows = await run_query(
+        db,
+        retrieve_installation_facts,
+        retrieve_installation_facts_async,
+        limit + 1 if limit is not None else None,
+        position.get("id"),
+    )
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        cursor = encode_cursor({"id": rows[-1].installation_id})
+        next_url = request.url.include_query_params(after=cursor)
+        headers["X-Next-Cursor"] = cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return Response(
+        content=row_encoder(tuple(InstallationFact.model_fields)).encode(rows),
+        media_type=JSON_MEDIA_TYPE,
+        headers=headers,
+    )
+
+
+@router.get("/batch")
+async def read_batch(
+    decoded_token: Annotated[bool, Depends(decode_token)],
+    tables: str | None = None,
+    db: Session | AsyncSession = Depends(read_session_dependency),
+) -> StreamingResponse:
+    """
+    Retrieves several tables at once, from one connection and one
+    `REPEATABLE READ` transaction, so that the tables are consistent with
+    each other.
+
+    The response is a JSON object mapping each table name to the list of its
+    rows, in primary key order. It is streamed one table after the other,
+    from a replica unless `primary=true` is given.
+
+    Parameters:
+        decoded_token (Annotated[bool, Depends(decode_token)]): The decoded
+        token obtained from the `decode_token` dependency.
+        tables (str, optional): The comma-separated names of the tables.
+        Defaults to every table served by the API.
+        db (Session | AsyncSession, optional): The database session.
+
+    Raises:
+        HTTPException: If one of the tables does not exist.
+
+    Returns:
+        StreamingResponse: The JSON object.
+    """
+
+    if tables is None:
+        table_names = catalog.table_names()
+    else:
+        table_names = list(
+            dict.fromkeys(
+                name.strip() for name in tables.split(",") if name.strip()
+            )
+        )
+    for table_name in table_names:
+        if catalog.get(table_name) is None:
+            raise HTTPException(
+                status_code=404, detail=f"{table_name} table does not exist."
+            )
+    if isinstance(db, AsyncSession):
+        body: Iterator | AsyncIterator = closing_session_async(
+            db, batch_chunks_async(db, table_names, _STREAM_BATCH_SIZE)
+        )
+    else:
+        body = closing_session(
+            db, batch_chunks(db, table_names, _STREAM_BATCH_SIZE)
+        )
+    return StreamingResponse(body, media_type=JSON_MEDIA_TYPE)
+
+
+@router.get(
+    "/analytics/installations-per-month",
+    response_model=list[MonthlyInstallations],
+)
+async def read_monthly_installations(
+    decoded_token: Annotated[bool, Depends(decode_token)],
+    db: Session | AsyncSession = Depends(session_dependency),
+):
+    """
+    Reports the number of installations per month.
+
+    The rollups are first refreshed with the installations added since the
+    previous request, so the installations are not scanned again.
+
+    Parameters:
+        decoded_token (Annotated[bool, Depends(decode_token)]): The decoded
+        token obtained from the `decode_token` dependency.
+        db (Session | AsyncSession, optional): The database session.
+
+    Returns:
+        list[MonthlyInstallations]: The months in chronological order.
+    """
+
+    await run_query(db, rollups.refresh, rollups.refresh_async)
+    return rollups.monthly_installations()
+
+
+@router.get(
+    "/analytics/revenue-by-category", response_model=list[CategoryRevenue]
+)
+async def read_revenue_by_category(
+    decoded_token: Annotated[bool, Depends(decode_token)],
+    db: Session | AsyncSession = Depends(session_dependency),
+):
+    """
+    Reports the revenue of the installed products per product category.
+
+    Parameters:
+        decoded_token (Annotated[bool, Depends(decode_token)]): The decoded
+        token obtained from the `decode_token` dependency.
+        db (Session | AsyncSession, optional): The database session.
+
+    Returns:
+        list[CategoryRevenue]: The categories, from the highest revenue to
+        the lowest.
+    """
+
+    await run_query(db, rollups.refresh, rollups.refresh_async)
+    return rollups.revenue("category")
+
+
+@router.get("/analytics/revenue-by-region", response_model=list[RegionRevenue])
+async def read_revenue_by_region(
+    decoded_token: Annotated[bool, Depends(decode_token)],
+    db: Session | AsyncSession = Depends(session_dependency),
+):
+    """
+    Reports the revenue of the installed products per region of the
+    customer.
+
+    Parameters:
+        decoded_token (Annotated[bool, Depends(decode_token)]): The decoded
+        token obtained from the `decode_token` dependency.
+        db (Session | AsyncSession, optional): The database session.
+
+    Returns:
+        list[RegionRevenue]: The regions, from the highest revenue to the
+        lowest.
+    """
+
+    await run_query(db, rollups.refresh, rollups.refresh_async)
+    return rollups.revenue("region")
+
+
+def table_endpoint(table_name: str):
+    """
+    Builds the endpoint reading one table, bound to the model, the schema
+    and the row encoder of the table.
+
+    Args:
+        table_name (str): The name of the table, a member of `ORMTables`.
+
+    Returns:
+        Callable: The endpoint.
+    """
+    model = ORMTables[table_name].value
+    table_schema = SchemaTables[table_name].value
+    json_encoder = row_encoder(tuple(table_schema.model_fields))
+
+    async def read_table_data(
+        request: Request,
+        decoded_token: Annotated[bool, Depends(decode_token)],
+        limit: Annotated[int | None, Query(ge=1, le=_MAX_PAGE_SIZE)] = None,
+        after: str | None = None,
+        fields: str | None = None,
+        since: str | None = None,
+        format: Literal["json", "ndjson", "arrow", "parquet"] | None = None,
+        primary: bool = False,
+        db: Session | AsyncSession = Depends(read_session_dependency),
+    ):
+        """
+        Retrieves data from the {table} table in the database.
+
+        This function is a GET endpoint that retrieves data from the table in
+        the database. It expects a valid decoded token as a dependency.
+
+        Rows are returned in primary key order. When `limit` is given, at most
+        that many rows are returned and, if more rows remain, an opaque cursor
+        is returned in the `X-Next-Cursor` header (and as a `Link` header with
+        `rel="next"`) to be passed back as `after` to fetch the next page.
+
+        Rows can also be streamed from a server-side cursor, in which case no
+        cursor is returned: as newline-delimited JSON (`format=ndjson` or
+        `Accept: application/x-ndjson`), as an Arrow IPC stream
+        (`format=arrow` or `Accept: application/vnd.apache.arrow.stream`) or
+        as a Parquet file (`format=parquet` or
+        `Accept: application/vnd.apache.parquet`). Arrow and Parquet record
+        batches are typed from the columns of the ORM model.
+
+        `fields` restricts the response to a comma-separated list of columns.
+        Any other query parameter filters the rows on a column of the table,
+        either by equality (`customer_id=1000`) or with an operator suffix
+        among `__ne`, `__gt`, `__gte`, `__lt`, `__lte` and `__in`
+        (`installation_date__gte=2021-09-01`, `product_id__in=1000,1003`).
+        Projections and filters are compiled into the SQL query.
+
+        The columns are selected as plain rows rather than ORM instances, and
+        JSON responses are encoded from them directly, without validating them
+        against the schema of the table.
+
+        `since` turns the request into an incremental extraction: only the
+        rows whose watermark column (the primary key, or the column configured
+        with `WATERMARK__<TABLE>`, e.g.
+        `WATERMARK__INSTALLATION=installation_date`) moved past `since` are
+        returned, and the new watermark to pass as `since` on the next run is
+        returned in the `X-Watermark` header. An empty `since` starts from the
+        beginning of the table. Every page of an incremental extraction is
+        bounded by the watermark read for its first page.
+
+        Responses for the tables listed in `API__ETAG_TABLES` carry an `ETag`
+        derived from the row count and greatest primary key of the table. A
+        request whose `If-None-Match` header holds the current `ETag` gets a
+        `304 Not Modified` response without the table being read.
+
+        JSON responses are serialized once and kept in the in-process response
+        cache for `CACHE__TTL_SECONDS` (or `CACHE__TTL__<TABLE>`), keyed by the
+        table and the query parameters. Cached responses are served without
+        touching the database. Concurrent identical JSON requests that miss
+        the cache share a single query and serialization: the first one reads
+        the table with a session of its own, and the others wait for its
+        response, even if the first one is cancelled.
+
+        When read replicas are configured, the table is read from a healthy
+        replica, which may lag behind the primary by up to
+        `DATABASE__REPLICA_MAX_LAG_SECONDS`. `primary=true` reads from the
+        primary, without the response cache or sharing an identical read in
+        flight, for when the latest writes must be seen. Incremental
+        extractions are always read from the primary, so that none of their
+        pages comes from a replica that has not replayed the rows up to
+        their watermark.
+
+        Parameters:
+            request (Request): The incoming request.
+            decoded_token (Annotated[bool, Depends(decode_token)]): The decoded
+            token obtained from the `decode_token` dependency.
+            limit (int, optional): The maximum number of rows to return.
+            after (str, optional): The cursor returned with the previous page.
+            fields (str, optional): The comma-separated columns to return.
+            since (str, optional): The watermark returned by the previous
+            incremental extraction.
+            format (str, optional): The output format, which takes precedence
+            over the `Accept` header.
+            primary (bool, optional): Whether to read from the primary rather
+            than from a replica, without the response cache.
+            db (Session | AsyncSession, optional): The database session.
+            Defaults to the result of the `get_read_db` dependency, or of the
+            `get_async_read_db` dependency when `DATABASE__ASYNC` is set.
+
+        Raises:
+            HTTPException: If the table has been removed from the schema
+            catalog, if the cursor is invalid or if a projection or filter
+            does not match the columns of the table.
+
+        Returns:
+            list[{schema}]: A list of data from the table.
+        """
+
+        schema = table_schema
+
+        if catalog.get(table_name) is None:
+            raise HTTPException(
+                status_code=404, detail=f"{table_name} table does not exist."
+            )
+        response_format = negotiate_format(
+            request.headers.get("accept", ""), format
+        )
+        cache_key = tuple(sorted(request.query_params.multi_items()))
+        use_cache = response_format == "json" and not primary
+        if use_cache:
+            cached = response_cache.get(table_name, cache_key)
+            if cached is not None:
+                if "ETag" in cached.headers and matches(
+                    request.headers.get("if-none-match"),
+                    cached.headers["ETag"],
+                ):
+                    return Response(status_code=304, headers=cached.headers)
+                bytes_served.inc(len(cached.body), table=table_name)
+                return Response(
+                    content=cached.body,
+                    media_type=cached.media_type,
+                    headers=cached.headers,
+                )
+        headers = {}
+        if table_name in _ETAG_TABLES:
+            version = await run_query(
+                db, table_version, table_version_async, model
+            )
+            etag = entity_tag(
+                table_name,
+                version,
+                request.query_params.multi_items(),
+                response_format,
+            )
+            headers = {"ETag": etag, "Vary": "Accept"}
+            if matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=headers)
+        key = primary_key(model).key
+        position: dict = {}
+        if after is not None:
+            try:
+                position = decode_cursor(after, model.__table__.columns[key])
+            except InvalidCursor:
+                raise HTTPException(status_code=400, detail="Invalid cursor.")
+        columns = list(schema.model_fields)
+        try:
+            if fields is not None:
+                columns = parse_fields(model, fields)
+                schema = projection(schema, tuple(columns))
+                if key not in columns:
+                    columns.append(key)
+            filters = parse_filters(model, request.query_params.multi_items())
+            if since is not None:
+                column = watermark_column(table_name, model)
+                if "until" in position:
+                    until = coerce_value(column, position["until"])
+                else:
+                    until = await run_query(
+                        db, high_water_mark, high_water_mark_async, column
+                    )
+                since_value = coerce_value(column, since) if since else None
+                filters += delta_filters(column, since_value, until)
+                watermark = until if until is not None else since_value
+                if watermark is not None:
+                    headers["X-Watermark"] = format_watermark(watermark)
+        except InvalidQuery as error:
+            raise HTTPException(status_code=400, detail=str(error))
+        query: dict[str, Any] = {
+            "after": position.get("id"),
+            "columns": columns,
+            "filters": filters,
+        }
+
+        if response_format != "json":
+            media_type = MEDIA_TYPES[response_format]
+            if response_format == "ndjson":
+                serialize = partial(ndjson_lines, schema)
+                serialize_async = partial(ndjson_lines_async, schema)
+            else:
+                encoder = ColumnarEncoder(
+                    arrow_schema(model, list(schema.model_fields)), media_type
+                )
+                serialize = partial(
+                    columnar_chunks, encoder, batch_size=_STREAM_BATCH_SIZE
+                )
+                serialize_async = partial(
+                    columnar_chunks_async,
+                    encoder,
+                    batch_size=_STREAM_BATCH_SIZE,
+                )
+            if isinstance(db, AsyncSession):
+                rows = counting_async(
+                    stream_table_data_async(db, model, **query, limit=limit),
+                    rows_read,
+                    table=table_name,
+                )
+                body: Iterator | AsyncIterator = closing_session_async(
+                    db,
+                    counting_async(
+                        serialize_async(rows),
+                        bytes_served,
+                        len,
+                        table=table_name,
+                    ),
+                )
+            else:
+                rows = counting(
+                    stream_table_data(db, model, **query, limit=limit),
+                    rows_read,
+                    table=table_name,
+                )
+                body = closing_session(
+                    db,
+                    counting(
+                        serialize(rows), bytes_served, len, table=table_name
+                    ),
+                )
+            if response_format == "parquet":
+                headers["Content-Disposition"] = (
+                    f'attachment; filename="{table_name}.parquet"'
+                )
+            return StreamingResponse(
+                body, media_type=media_type, headers=headers
+            )
+
+        if limit is not None:
+            query["limit"] = limit + 1
+
+        async def read_json(
+            db: Session | AsyncSession,
+        ) -> tuple[bytes, dict[str, str]]:
+            rows = await run_query(
+                db,
+                retrieve_table_data,
+                retrieve_table_data_async,
+                model,
+                **query,
+            )
+            if limit is not None and len(rows) > limit:
+                rows = rows[:limit]
+                next_position = {"id": getattr(rows[-1], key)}
+                if "X-Watermark" in headers:
+                    next_position["until"] = headers["X-Watermark"]
+                cursor = encode_cursor(next_position)
+                next_url = request.url.include_query_params(after=cursor)
+                headers["X-Next-Cursor"] = cursor
+                headers["Link"] = f'<{next_url}>; rel="next"'
+            if schema is table_schema:
+                content = json_encoder.encode(rows)
+            else:
+                content = row_encoder(tuple(schema.model_fields)).encode(rows)
+            rows_read.inc(len(rows), table=table_name)
+            if use_cache:
+                response_cache.put(
+                    table_name, cache_key, content, JSON_MEDIA_TYPE, headers
+                )
+            return content, headers
+
+        async def read_json_shared() -> tuple[bytes, dict[str, str]]:
+            # The shared read outlives the request that started it if that
+            # request is cancelled, and the session of the request is closed
+            # then, so the read opens a session of its own.
+            shared_db = read_session(
+                request, asynchronous=isinstance(db, AsyncSession)
+            )
+            try:
+                return await read_json(shared_db)
+            finally:
+                if isinstance(shared_db, AsyncSession):
+                    await shared_db.close()
+                else:
+                    await run_in_threadpool(shared_db.close)
+
+        if primary:
+            content, response_headers = await read_json(db)
+        else:
+            (content, response_headers), shared = await table_reads.run(
+                (table_name, cache_key), read_json_shared
+            )
+            if shared:
+                reads_coalesced.inc(table=table_name)
+        bytes_served.inc(len(content), table=table_name)
+        return Response(
+            content=content,
+            media_type=JSON_MEDIA_TYPE,
+            headers=response_headers,
+        )
+
+    read_table_data.__doc__ = (
+        (read_table_data.__doc__ or "")
+        .replace("{table}", table_name)
+        .replace("{schema}", table_schema.__name__)
+    )
+    return read_table_data
+
+
+def add_table_routes(router: APIRouter) -> None:
+    """
+    Adds the endpoint of each table to a router, documented with the schema
+    of the table.
+
+    Args:
+        router (APIRouter): The router.
+    """
+    for table in ORMTables:
+        schema = SchemaTables[table.name].value
+        router.add_api_route(
+            f"/{table.name}",
+            table_endpoint(table.name),
+            methods=["GET"],
+            response_model=list[schema],  # type: ignore[valid-type]
+            name=f"read_{table.name}",
+            summary=f"Read {table.name.replace('_', ' ').title()} Data",
         )
-    return retrieve_table_data(db, ORMTables[table_name].value)
+
+
+add_table_routes(router)
+
+
+@router.get("/{table_name}", include_in_schema=False)
+async def read_unknown_table(
+    table_name: str,
+    decoded_token: Annotated[bool, Depends(decode_token)],
+):
+    """
+    Answers requests for tables that are not served by the API.
+
+    Parameters:
+        table_name (str): The name of the requested table.
+        decoded_token (Annotated[bool, Depends(decode_token)]): The decoded
+        token obtained from the `decode_token` dependency.
+
+    Raises:
+        HTTPException: Always, since the table does not exist.
+    """
+    raise HTTPException(
+        status_code=404, detail=f"{table_name} table does not exist."
+    )
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """
+    Creates the application.
+
+    Creating the application does not connect to the database. Only the
+    credentials and the secret key are deferred: when no settings are given,
+    they are read from the environment when first needed. The database
+    connection is read and the engine opened at startup, and the other
+    variables (e.g. `DATABASE__ASYNC`, the cache, compression and replica
+    settings) are read when the package is imported.
+
+    Only the settings, the authentication and the login executor belong to
+    the application. The database engines, the read replicas, the schema
+    catalog, the response cache and the read coalescing are process-wide,
+    and the database access (sync or async) is chosen from
+    `DATABASE__ASYNC` when this module is imported. Applications created
+    in the same process therefore share them, e.g. an application created
+    for tests reads through the same engine and cache as `app`. Serve a
+    single application per process.
+
+    Args:
+        settings (Settings, optional): The settings of the application.
+        Defaults to the settings read from the environment.
+
+    Returns:
+        FastAPI: The application.
+    """
+    app = FastAPI(lifespan=lifespan)
+    app.state.components = AppState(settings)
+    app.include_router(router)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=_COMPRESSION_MINIMUM_SIZE,
+        flush_size=_COMPRESSION_FLUSH_SIZE,
+        gzip_level=_GZIP_LEVEL,
+        zstd_level=_ZSTD_LEVEL,
+    )
+    app.add_middleware(
+        QueryTrackingMiddleware,
+        repeated_statement_threshold=_N_PLUS_ONE_THRESHOLD,
+    )
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+app = create_app()
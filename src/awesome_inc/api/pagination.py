@@ -0,0 +1,70 @@
+from sqlalchemy import ColumnElement, inspect
+from sqlalchemy.orm import InstrumentedAttribute
+from .filters import InvalidQuery, coerce_value
+import base64
+import binascii
+import json
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def primary_key(model) -> InstrumentedAttribute:
+    """
+    Returns the primary key column used as the keyset of a model.
+
+    Args:
+        model (Model): The model representing the table.
+
+    Returns:
+        InstrumentedAttribute: The primary key attribute of the model.
+    """
+    column = inspect(model).primary_key[0]
+    return getattr(model, column.key)
+
+
+def encode_cursor(position: dict) -> str:
+    """
+    Encodes a keyset position into an opaque, URL-safe cursor.
+
+    Args:
+        position (dict): The keyset position, e.g. `{"id": 1000}`.
+
+    Returns:
+        str: The opaque cursor.
+    """
+    payload = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, key: ColumnElement | None = None) -> dict:
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The opaque cursor.
+        key (ColumnElement, optional): The keyset column. When given, the
+        position is converted to the Python type of the column, so that a
+        tampered cursor cannot reach the query.
+
+    Returns:
+        dict: The keyset position.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed, or if its position does
+        not match the type of the keyset column.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(payload)
+    except (binascii.Error, ValueError) as error:
+        raise InvalidCursor(cursor) from error
+    if not isinstance(position, dict) or position.get("id") is None:
+        raise InvalidCursor(cursor)
+    if key is not None:
+        try:
+            position["id"] = coerce_value(key, position["id"])
+        except InvalidQuery as error:
+            raise InvalidCursor(cursor) from error
+    return position
@@ -1,32 +1,187 @@
+from sqlalchemy import ColumnElement, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import MetaData
-from .core.database import new_engine
+from typing import Sequence
+from .catalog import catalog
+from .core.config import _STREAM_BATCH_SIZE
+from .pagination import primary_key
 
 
 def retrieve_all_table_names():
     """
-    Retrieves all table names from the database.
+    Retrieves all table names from the schema catalog.
 
     Returns:
-        dict: A dictionary containing the table names as keys and an empty list
-        as values.
+        dict: A dictionary containing the list of table names under the
+        `table_names` key.
     """
 
-    metadata = MetaData()
-    metadata.reflect(bind=new_engine())
-    return {"table_names": list(metadata.tables)}
+    return {"table_names": catalog.table_names()}
 
 
-def retrieve_table_data(db: Session, model):
+def table_query(
+    model,
+    limit: int | None = None,
+    after=None,
+    columns: Sequence[str] | None = None,
+    filters: Sequence[ColumnElement[bool]] = (),
+) -> Select:
     """
-    Retrieves all data from the specified table in the database.
+    Builds the query reading a table in primary key order.
+
+    Args:
+        model (Model): The model representing the table to read.
+        limit (int, optional): The maximum number of rows to return. Defaults
+        to None, which returns every row.
+        after (optional): Only rows whose primary key is greater than this
+        value are returned. Defaults to None.
+        columns (Sequence[str], optional): The columns to select. Defaults to
+        None, which selects the ORM model itself.
+        filters (Sequence[ColumnElement[bool]], optional): Additional
+        conditions the rows must satisfy.
+
+    Returns:
+        Select: The query.
+    """
+    key = primary_key(model)
+    if columns is None:
+        query = select(model)
+    else:
+        query = select(*(getattr(model, column) for column in columns))
+    query = query.where(*filters).order_by(key)
+    if after is not None:
+        query = query.where(key > after)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def retrieve_table_data(
+    db: Session,
+    model,
+    limit: int | None = None,
+    after=None,
+    columns: Sequence[str] | None = None,
+    filters: Sequence[ColumnElement[bool]] = (),
+):
+    """
+    Retrieves data from the specified table in the database, ordered by
+    primary key.
+
+    Pages are read with a keyset condition on the primary key rather than an
+    offset, so every page costs the same regardless of its position.
 
     Args:
         db (Session): The database session object.
         model (Model): The model representing the table to retrieve data
         from.
+        limit (int, optional): The maximum number of rows to return. Defaults
+        to None, which returns every row.
+        after (optional): Only rows whose primary key is greater than this
+        value are returned. Defaults to None.
+        columns (Sequence[str], optional): The columns to select. Defaults to
+        None, which returns ORM instances.
+        filters (Sequence[ColumnElement[bool]], optional): Additional
+        conditions the rows must satisfy.
 
     Returns:
-        List[Model]: A list of all the rows in the specified table.
+        List[Model] | List[Row]: A list of the rows in the specified table.
+    """
+    query = table_query(model, limit, after, columns, filters)
+    if columns is None:
+        return db.scalars(query).all()
+    return db.execute(query).all()
+
+
+async def retrieve_table_data_async(
+    db: AsyncSession,
+    model,
+    limit: int | None = None,
+    after=None,
+    columns: Sequence[str] | None = None,
+    filters: Sequence[ColumnElement[bool]] = (),
+):
+    """
+    Retrieves data from the specified table in the database, ordered by
+    primary key, with an async session.
+
+    See `retrieve_table_data` for the arguments.
+
+    Returns:
+        List[Model] | List[Row]: A list of the rows in the specified table.
+    """
+    query = table_query(model, limit, after, columns, filters)
+    if columns is None:
+        return (await db.scalars(query)).all()
+    return (await db.execute(query)).all()
+
+
+def stream_table_data(
+    db: Session,
+    model,
+    limit: int | None = None,
+    after=None,
+    columns: Sequence[str] | None = None,
+    filters: Sequence[ColumnElement[bool]] = (),
+    batch_size: int = _STREAM_BATCH_SIZE,
+):
+    """
+    Iterates over data from the specified table in the database, ordered by
+    primary key, without loading the whole result in memory.
+
+    Rows are read from a server-side cursor `batch_size` rows at a time.
+
+    Args:
+        db (Session): The database session object.
+        model (Model): The model representing the table to retrieve data
+        from.
+        limit (int, optional): The maximum number of rows to return. Defaults
+        to None, which returns every row.
+        after (optional): Only rows whose primary key is greater than this
+        value are returned. Defaults to None.
+        columns (Sequence[str], optional): The columns to select. Defaults to
+        None, which yields ORM instances.
+        filters (Sequence[ColumnElement[bool]], optional): Additional
+        conditions the rows must satisfy.
+        batch_size (int, optional): The number of rows fetched from the
+        cursor at a time.
+
+    Yields:
+        Model | Row: The rows in the specified table.
+    """
+    query = table_query(
+        model, limit, after, columns, filters
+    ).execution_options(yield_per=batch_size)
+    if columns is None:
+        yield from db.scalars(query)
+    else:
+        yield from db.execute(query)
+
+
+async def stream_table_data_async(
+    db: AsyncSession,
+    model,
+    limit: int | None = None,
+    after=None,
+    columns: Sequence[str] | None = None,
+    filters: Sequence[ColumnElement[bool]] = (),
+    batch_size: int = _STREAM_BATCH_SIZE,
+):
+    """
+    Iterates over data from the specified table in the database, ordered by
+    primary key, with an async session and a server-side cursor.
+
+    See `stream_table_data` for the arguments.
+
+    Yields:
+        Model | Row: The rows in the specified table.
     """
-    return db.query(model).all()
+    query = table_query(
+        model, limit, after, columns, filters
+    ).execution_options(yield_per=batch_size)
+    if columns is None:
+        async for row in await db.stream_scalars(query):
+            yield row
+    else:
+        async for row in await db.stream(query):
+            yield row
@@ -1,10 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, create_model
+from functools import lru_cache
 from datetime import date
+from decimal import Decimal
 
 
 class BaseRequest(BaseModel):
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class Country(BaseRequest):
@@ -41,3 +42,61 @@ class Product(BaseRequest):
 class ProductCategory(BaseRequest):
     id: int
     name: str
+
+
+@lru_cache
+def projection(
+    schema: type[BaseRequest], fields: tuple[str, ...]
+) -> type[BaseRequest]:
+    """
+    Returns a schema restricted to some of the fields of another schema.
+
+    Args:
+        schema (type[BaseRequest]): The schema of the full table.
+        fields (tuple[str, ...]): The names of the fields to keep.
+
+    Returns:
+        type[BaseRequest]: The projected schema.
+    """
+    return create_model(  # type: ignore[call-overload]
+        f"{schema.__name__}Projection",
+        __base__=BaseRequest,
+        **{
+            name: (schema.model_fields[name].annotation, ...)
+            for name in fields
+        },
+    )
+
+
+class InstallationFact(BaseRequest):
+    installation_id: int
+    installation_name: str
+    description: str
+    installation_date: date
+    customer_id: int
+    customer_name: str
+    premium_customer: str
+    country_id: int
+    country_name: str
+    region: str
+    product_id: int
+    product_reference: str
+    product_name: str
+    price: str
+    category_id: int
+    category_name: str
+
+
+class MonthlyInstallations(BaseModel):
+    month: str
+    installations: int
+
+
+class CategoryRevenue(BaseModel):
+    category: str
+    revenue: Decimal
+
+
+class RegionRevenue(BaseModel):
+    region: str
+    revenue: Decimal
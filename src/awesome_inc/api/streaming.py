@@ -0,0 +1,160 @@
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import AsyncIterable, Callable, Iterable
+from .core.metrics import Counter
+from .columnar import ARROW_MEDIA_TYPE, PARQUET_MEDIA_TYPE
+
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+MEDIA_TYPES = {
+    "json": JSON_MEDIA_TYPE,
+    "ndjson": NDJSON_MEDIA_TYPE,
+    "arrow": ARROW_MEDIA_TYPE,
+    "parquet": PARQUET_MEDIA_TYPE,
+}
+
+
+def negotiate_format(accept: str, requested: str | None = None) -> str:
+    """
+    Chooses the output format of a table response.
+
+    Args:
+        accept (str): The `Accept` header of the request.
+        requested (str, optional): The format requested explicitly with the
+        `format` query parameter, which takes precedence.
+
+    Returns:
+        str: One of the keys of `MEDIA_TYPES`. Defaults to `json`.
+    """
+    if requested is not None:
+        return requested
+    for name, media_type in MEDIA_TYPES.items():
+        if name != "json" and media_type in accept:
+            return name
+    return "json"
+
+
+def ndjson_lines(schema: type[BaseModel], rows: Iterable):
+    """
+    Serializes rows as newline-delimited JSON, one row at a time.
+
+    Args:
+        schema (type[BaseModel]): The schema used to validate each row.
+        rows (Iterable): The rows, as returned by `stream_table_data`.
+
+    Yields:
+        str: One JSON document per row, terminated by a newline.
+    """
+    for row in rows:
+        yield (
+            schema.model_validate(row, from_attributes=True).model_dump_json()
+            + "\n"
+        )
+
+
+async def ndjson_lines_async(schema: type[BaseModel], rows: AsyncIterable):
+    """
+    Serializes rows read with an async session as newline-delimited JSON,
+    one row at a time.
+
+    See `ndjson_lines` for the arguments.
+
+    Yields:
+        str: One JSON document per row, terminated by a newline.
+    """
+    async for row in rows:
+        yield (
+            schema.model_validate(row, from_attributes=True).model_dump_json()
+            + "\n"
+        )
+
+
+def closing_session(db: Session, chunks: Iterable):
+    """
+    Passes a streamed body through and closes the session it is read from
+    once it has been sent, since the response outlives the `get_db`
+    dependency.
+
+    Args:
+        db (Session): The database session the body is read from.
+        chunks (Iterable): The chunks of the body.
+
+    Yields:
+        The chunks of the body.
+    """
+    try:
+        yield from chunks
+    finally:
+        db.close()
+
+
+async def closing_session_async(db: AsyncSession, chunks: AsyncIterable):
+    """
+    Passes a streamed body through and closes the async session it is read
+    from once it has been sent.
+
+    See `closing_session` for the arguments.
+
+    Yields:
+        The chunks of the body.
+    """
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        await db.close()
+
+
+def counting(
+    items: Iterable,
+    counter: Counter,
+    weigh: Callable[..., int] | None = None,
+    **labels,
+):
+    """
+    Passes items through and adds their number, or their total weight, to a
+    counter once they have all been consumed.
+
+    Args:
+        items (Iterable): The items, e.g. rows or chunks of a body.
+        counter (Counter): The counter to increment.
+        weigh (Callable, optional): The weight of an item, e.g. `len` for
+        chunks of bytes. Defaults to None, which counts the items.
+        **labels: The values of the labels of the counter.
+
+    Yields:
+        The items.
+    """
+    total = 0
+    try:
+        for item in items:
+            total += weigh(item) if weigh is not None else 1
+            yield item
+    finally:
+        counter.inc(total, **labels)
+
+
+async def counting_async(
+    items: AsyncIterable,
+    counter: Counter,
+    weigh: Callable[..., int] | None = None,
+    **labels,
+):
+    """
+    Passes async items through and adds their number, or their total
+    weight, to a counter once they have all been consumed.
+
+    See `counting` for the arguments.
+
+    Yields:
+        The items.
+    """
+    total = 0
+    try:
+        async for item in items:
+            total += weigh(item) if weigh is not None else 1
+            yield item
+    finally:
+        counter.inc(total, **labels)
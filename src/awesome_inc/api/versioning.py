@@ -0,0 +1,104 @@
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Iterable
+from .pagination import primary_key
+import hashlib
+
+
+def table_version_query(model) -> Select:
+    """
+    Builds the query reading the version of a table.
+
+    The version is made of the number of rows and the greatest primary key,
+    which changes whenever rows are added or deleted. In-place updates are
+    not detected, so versions are only used for tables that are not updated
+    in place.
+
+    Args:
+        model (Model): The model representing the table.
+
+    Returns:
+        Select: The query.
+    """
+    return select(func.count(), func.max(primary_key(model)))
+
+
+def table_version(db: Session, model) -> str:
+    """
+    Reads the version of a table.
+
+    Args:
+        db (Session): The database session object.
+        model (Model): The model representing the table.
+
+    Returns:
+        str: The version of the table.
+    """
+    count, max_id = db.execute(table_version_query(model)).one()
+    return f"{count}-{max_id}"
+
+
+async def table_version_async(db: AsyncSession, model) -> str:
+    """
+    Reads the version of a table with an async session.
+
+    See `table_version` for the arguments.
+
+    Returns:
+        str: The version of the table.
+    """
+    count, max_id = (await db.execute(table_version_query(model))).one()
+    return f"{count}-{max_id}"
+
+
+def entity_tag(
+    table_name: str,
+    version: str,
+    parameters: Iterable[tuple[str, str]],
+    response_format: str,
+) -> str:
+    """
+    Builds the entity tag of a table response.
+
+    The tag depends on the version of the table and on everything else that
+    shapes the response: the query parameters and the output format.
+
+    Args:
+        table_name (str): The name of the table.
+        version (str): The version of the table.
+        parameters (Iterable[tuple[str, str]]): The query parameters.
+        response_format (str): The output format.
+
+    Returns:
+        str: A weak entity tag, quoted for the `ETag` header.
+    """
+    digest = hashlib.sha256()
+    for part in (table_name, version, response_format):
+        digest.update(part.encode() + b"\0")
+    for key, value in sorted(parameters):
+        digest.update(f"{key}={value}".encode() + b"\0")
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+def matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Checks an `If-None-Match` header against an entity tag, using the weak
+    comparison of RFC 9110.
+
+    Args:
+        if_none_match (str, optional): The `If-None-Match` header.
+        etag (str): The current entity tag.
+
+    Returns:
+        bool: True if the client already holds the current representation.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque
+        for tag in if_none_match.split(",")
+    )
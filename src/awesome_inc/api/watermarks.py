@@ -0,0 +1,91 @@
+from sqlalchemy import Column, ColumnElement, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .core.config import _WATERMARK_COLUMNS
+from .pagination import primary_key
+
+
+def watermark_column(table_name: str, model) -> Column:
+    """
+    Returns the column tracking the progress of incremental extractions of a
+    table.
+
+    The column is configured per table with `WATERMARK__<TABLE>` environment
+    variables and defaults to the primary key.
+
+    Args:
+        table_name (str): The name of the table.
+        model (Model): The model representing the table.
+
+    Returns:
+        Column: The watermark column.
+    """
+    name = _WATERMARK_COLUMNS.get(table_name, primary_key(model).key)
+    return model.__table__.columns[name]
+
+
+def high_water_mark(db: Session, column: Column):
+    """
+    Reads the current high-water mark of a table.
+
+    Args:
+        db (Session): The database session object.
+        column (Column): The watermark column.
+
+    Returns:
+        The greatest value of the watermark column, or None if the table is
+        empty.
+    """
+    return db.scalar(select(func.max(column)))
+
+
+async def high_water_mark_async(db: AsyncSession, column: Column):
+    """
+    Reads the current high-water mark of a table with an async session.
+
+    See `high_water_mark` for the arguments.
+
+    Returns:
+        The greatest value of the watermark column, or None if the table is
+        empty.
+    """
+    return await db.scalar(select(func.max(column)))
+
+
+def delta_filters(column: Column, since, until) -> list[ColumnElement[bool]]:
+    """
+    Builds the conditions selecting the rows added between two watermarks.
+
+    The lower bound is exclusive when the watermark column is unique. It is
+    inclusive otherwise, since more rows may share the last watermark value:
+    those rows are then delivered again and must be upserted downstream.
+
+    Args:
+        column (Column): The watermark column.
+        since: The watermark returned by the previous extraction, or None for
+        a first extraction.
+        until: The current high-water mark, or None if the table is empty.
+
+    Returns:
+        list[ColumnElement[bool]]: The conditions, to be combined with AND.
+    """
+    conditions = []
+    if since is not None:
+        unique = column.primary_key or column.unique
+        conditions.append(column > since if unique else column >= since)
+    if until is not None:
+        conditions.append(column <= until)
+    return conditions
+
+
+def format_watermark(value) -> str:
+    """
+    Formats a watermark for the `X-Watermark` header and cursors.
+
+    Args:
+        value: The watermark value.
+
+    Returns:
+        str: The ISO representation of dates, the string form of other values.
+    """
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
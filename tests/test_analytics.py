@@ -0,0 +1,65 @@
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+from awesome_inc.api.analytics import InstallationRollups
+
+ROWS = [
+    (1000, date(2021, 10, 22), 1005, "789", "IT & Network Stuff", "Europe"),
+    (1001, date(2021, 10, 5), 1003, "90", "Beauty Accessories", "Europe"),
+    (1002, date(2021, 9, 1), 1000, "12345", "Dangerous Items", "Europe"),
+    (1003, date(2021, 9, 6), 1000, "12345", "Dangerous Items", "Asia"),
+]
+
+
+def test_rollups_aggregate_installations():
+    rollups = InstallationRollups()
+
+    assert rollups.add(ROWS) == 4
+    assert rollups.monthly_installations() == [
+        {"month": "2021-09", "installations": 2},
+        {"month": "2021-10", "installations": 2},
+    ]
+    assert rollups.revenue("category")[0] == {
+        "category": "Dangerous Items",
+        "revenue": Decimal(24690),
+    }
+    assert rollups.revenue("region") == [
+        {"region": "Europe", "revenue": Decimal(13224)},
+        {"region": "Asia", "revenue": Decimal(12345)},
+    ]
+
+
+def test_rollups_refresh_incrementally():
+    rollups = InstallationRollups()
+    mock_db = MagicMock(spec=Session)
+    mock_db.execute.return_value.all.return_value = ROWS[:2]
+    rollups.refresh(mock_db)
+    mock_db.execute.return_value.all.return_value = ROWS[1:]
+
+    assert rollups.refresh(mock_db) == 2
+    assert rollups.last_installation_id == 1003
+    query = mock_db.execute.call_args.args[0]
+    assert "WHERE installation.id > :id_2" in str(query)
+    assert (
+        sum(m["installations"] for m in rollups.monthly_installations()) == 4
+    )
+
+
+def test_rollups_parse_prices_once(mocker):
+    rollups = InstallationRollups()
+    mock_decimal = mocker.patch(
+        "awesome_inc.api.analytics.Decimal", wraps=Decimal
+    )
+
+    rollups.add(ROWS[2:])
+    assert mock_decimal.call_args_list == [mocker.call("12345")]
+
+
+def test_rollups_reset():
+    rollups = InstallationRollups()
+    rollups.add(ROWS)
+    rollups.reset()
+
+    assert rollups.last_installation_id is None
+    assert rollups.monthly_installations() == []
@@ -1,6 +1,6 @@
 import pytest
-from datetime import timedelta
-from awesome_inc.api.core.authentication import Authentication
+from datetime import datetime, timedelta, timezone
+from awesome_inc.api.core.authentication import Authentication, TokenCache
 from awesome_inc.api.core.config import Credentials
 from fastapi import HTTPException, status
 import jwt
@@ -111,3 +111,62 @@ def test_decode_invalid_token(auth):
         invalid_token = "invalidtoken"
         auth.decode_token(invalid_token)
     assert excinfo.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_decode_token_uses_token_cache(auth, mocker):
+    token = auth.create_access_token({"sub": "testuser@awesomeinc.com"})
+    assert auth.decode_token(token)
+    assert len(auth.token_cache) == 1
+
+    mock_decode = mocker.patch("jwt.decode")
+    assert auth.decode_token(token)
+    mock_decode.assert_not_called()
+
+
+def test_decode_token_counts_token_cache_lookups(auth, mocker):
+    mock_lookups = mocker.patch(
+        "awesome_inc.api.core.authentication.token_cache_lookups"
+    )
+    token = auth.create_access_token({"sub": "testuser@awesomeinc.com"})
+    auth.decode_token(token)
+    auth.decode_token(token)
+
+    assert mock_lookups.inc.call_args_list == [
+        mocker.call(result="miss"),
+        mocker.call(result="hit"),
+    ]
+
+
+def test_decode_token_does_not_cache_invalid_tokens(auth):
+    token = auth.create_access_token({"sub": "wronguser"})
+    with pytest.raises(HTTPException):
+        auth.decode_token(token)
+    assert len(auth.token_cache) == 0
+
+
+def test_token_cache_evicts_expired_tokens(mocker):
+    mock_time = mocker.patch("awesome_inc.api.core.authentication.time.time")
+    mock_time.return_value = 1000.0
+    cache = TokenCache()
+    cache.add("token", expires_at=1060.0)
+
+    assert cache.get("token")
+    mock_time.return_value = 1060.0
+    assert not cache.get("token")
+    assert len(cache) == 0
+
+
+def test_token_cache_is_bounded():
+    cache = TokenCache(maxsize=2)
+    expires_at = (
+        datetime.now(timezone.utc) + timedelta(minutes=5)
+    ).timestamp()
+    cache.add("first", expires_at)
+    cache.add("second", expires_at)
+    assert cache.get("first")
+    cache.add("third", expires_at)
+
+    assert len(cache) == 2
+    assert cache.get("first")
+    assert not cache.get("second")
+    assert cache.get("third")
@@ -0,0 +1,56 @@
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+import asyncio
+import json
+from awesome_inc.api.batch import batch_chunks, batch_chunks_async
+
+
+def test_batch_chunks():
+    mock_db = MagicMock(spec=Session)
+    mock_db.execute.return_value.partitions.side_effect = [
+        iter([[(1000, "Belgium", "Europe")], [(1001, "Spain", "Europe")]]),
+        iter([]),
+    ]
+
+    body = b"".join(
+        batch_chunks(mock_db, ["country", "product_category"], batch_size=1)
+    )
+
+    assert json.loads(body) == {
+        "country": [
+            {"id": 1000, "name": "Belgium", "region": "Europe"},
+            {"id": 1001, "name": "Spain", "region": "Europe"},
+        ],
+        "product_category": [],
+    }
+    mock_db.connection.assert_called_once_with(
+        execution_options={"isolation_level": "REPEATABLE READ"}
+    )
+    query = mock_db.execute.call_args.args[0]
+    assert query.get_execution_options()["yield_per"] == 1
+
+
+def test_batch_chunks_without_tables():
+    assert b"".join(batch_chunks(MagicMock(spec=Session), [])) == b"{}"
+
+
+def test_batch_chunks_async():
+    async def partitions():
+        yield [(1000, "Medical Device")]
+
+    mock_db = MagicMock(spec=AsyncSession)
+    mock_db.stream = AsyncMock()
+    mock_db.stream.return_value.partitions = partitions
+
+    async def collect():
+        return [
+            c async for c in batch_chunks_async(mock_db, ["product_category"])
+        ]
+
+    body = b"".join(asyncio.run(collect()))
+
+    assert json.loads(body) == {
+        "product_category": [{"id": 1000, "name": "Medical Device"}]
+    }
+    mock_db.connection.assert_awaited_once()
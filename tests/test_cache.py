@@ -0,0 +1,59 @@
+from awesome_inc.api.cache import ResponseCache
+
+
+def test_cache_hit_and_miss():
+    cache = ResponseCache(max_bytes=100, default_ttl=60)
+
+    assert cache.get("country", "a") is None
+    cache.put("country", "a", b"[]", "application/json", {"ETag": "x"})
+    cached = cache.get("country", "a")
+
+    assert cached.body == b"[]"
+    assert cached.headers == {"ETag": "x"}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_bytes=10, default_ttl=60)
+    cache.put("country", "a", b"aaaa", "application/json", {})
+    cache.put("country", "b", b"bbbb", "application/json", {})
+    cache.get("country", "a")
+    cache.put("country", "c", b"cccc", "application/json", {})
+
+    assert cache.get("country", "b") is None
+    assert cache.get("country", "a") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 8
+
+
+def test_cache_skips_oversized_and_disabled_tables():
+    cache = ResponseCache(max_bytes=4, default_ttl=60, table_ttls={"x": 0})
+    cache.put("country", "a", b"too large", "application/json", {})
+    cache.put("x", "a", b"[]", "application/json", {})
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_expires_entries(mocker):
+    mock_time = mocker.patch("awesome_inc.api.cache.time.monotonic")
+    mock_time.return_value = 0.0
+    cache = ResponseCache(max_bytes=100, default_ttl=60, table_ttls={"x": 5})
+    cache.put("x", "a", b"[]", "application/json", {})
+    cache.put("country", "a", b"[]", "application/json", {})
+
+    mock_time.return_value = 10.0
+    assert cache.get("x", "a") is None
+    assert cache.get("country", "a") is not None
+
+
+def test_cache_invalidate_table():
+    cache = ResponseCache(max_bytes=100, default_ttl=60)
+    cache.put("country", "a", b"[]", "application/json", {})
+    cache.put("country", "b", b"[]", "application/json", {})
+    cache.put("product", "a", b"[]", "application/json", {})
+
+    assert cache.invalidate("country") == 2
+    assert cache.stats()["entries"] == 1
+    assert cache.invalidate() == 1
+    assert cache.stats()["bytes"] == 0
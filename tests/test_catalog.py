@@ -0,0 +1,82 @@
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.exc import OperationalError
+from awesome_inc.api.catalog import SchemaCatalog
+from awesome_inc.api.models import Country, Customer
+import asyncio
+import pytest
+
+
+def _mock_inspector(mocker, table_names):
+    mock_inspect = mocker.patch("awesome_inc.api.catalog.inspect")
+    mock_inspect.return_value.get_table_names.return_value = table_names
+    return mock_inspect
+
+
+def test_catalog_resolves_orm_tables(mocker):
+    mock_inspect = _mock_inspector(mocker, [])
+    catalog = SchemaCatalog()
+
+    assert catalog.get("country") is Country
+    assert catalog.get("InvalidTable") is None
+    assert len(catalog.table_names()) == 5
+    mock_inspect.assert_not_called()
+
+
+def test_catalog_refresh_reconciles_with_database(mocker):
+    _mock_inspector(mocker, ["country", "customer", "unrelated"])
+    catalog = SchemaCatalog()
+
+    assert catalog.refresh(MagicMock()) == ["country", "customer"]
+    assert catalog.get("customer") is Customer
+    assert catalog.get("installation") is None
+
+
+def test_catalog_lookups_do_not_reconcile(mocker):
+    mock_inspect = _mock_inspector(mocker, ["country"])
+    catalog = SchemaCatalog(ttl=60)
+
+    assert catalog.get("customer") is Customer
+    assert len(catalog.table_names()) == 5
+    mock_inspect.assert_not_called()
+
+
+def test_catalog_reconcile_async():
+    mock_connection = MagicMock()
+    mock_connection.run_sync = AsyncMock(return_value=["country"])
+    mock_engine = MagicMock()
+    mock_engine.connect.return_value.__aenter__.return_value = mock_connection
+    catalog = SchemaCatalog()
+
+    assert asyncio.run(catalog.refresh_async(mock_engine)) == ["country"]
+    assert catalog.get("customer") is None
+
+
+def test_catalog_monitor_reconciles_when_ttl_expires(mocker):
+    mock_inspect = _mock_inspector(mocker, ["country"])
+    mocker.patch("awesome_inc.api.catalog.get_engine")
+    mock_sleep = mocker.patch(
+        "awesome_inc.api.catalog.asyncio.sleep",
+        side_effect=[None, asyncio.CancelledError()],
+    )
+    catalog = SchemaCatalog(ttl=60)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(catalog.monitor())
+    assert catalog.table_names() == ["country"]
+    assert mock_inspect.call_count == 1
+    mock_sleep.assert_called_with(60)
+
+
+def test_catalog_keeps_tables_when_refresh_fails(mocker):
+    mock_inspect = mocker.patch("awesome_inc.api.catalog.inspect")
+    mock_inspect.side_effect = OperationalError("select", {}, Exception())
+    mocker.patch("awesome_inc.api.catalog.get_engine")
+    mocker.patch(
+        "awesome_inc.api.catalog.asyncio.sleep",
+        side_effect=[None, asyncio.CancelledError()],
+    )
+    catalog = SchemaCatalog(ttl=60)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(catalog.monitor())
+    assert len(catalog.table_names()) == 5
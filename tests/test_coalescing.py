@@ -0,0 +1,87 @@
+from awesome_inc.api.coalescing import SingleFlight
+import asyncio
+import pytest
+
+
+def test_concurrent_calls_share_one_call():
+    async def main():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def read():
+            calls.append(1)
+            await release.wait()
+            return b"[]"
+
+        callers = [
+            asyncio.create_task(flights.run("country", read)) for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*callers)
+        later = await flights.run("country", read)
+        return calls, results, later, flights
+
+    calls, results, later, flights = asyncio.run(main())
+
+    assert len(calls) == 2
+    assert results == [(b"[]", False)] + [(b"[]", True)] * 4
+    assert later == (b"[]", False)
+    assert (flights.calls, flights.shared) == (2, 4)
+
+
+def test_different_keys_are_not_shared():
+    async def main():
+        flights = SingleFlight()
+
+        async def read(value):
+            await asyncio.sleep(0)
+            return value
+
+        return await asyncio.gather(
+            flights.run("a", lambda: read("a")),
+            flights.run("b", lambda: read("b")),
+        )
+
+    assert asyncio.run(main()) == [("a", False), ("b", False)]
+
+
+def test_exception_is_raised_to_every_caller():
+    async def main():
+        flights = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise ValueError("unreachable")
+
+        return await asyncio.gather(
+            flights.run("country", fail),
+            flights.run("country", fail),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+
+    assert [type(result) for result in results] == [ValueError] * 2
+
+
+def test_cancelled_caller_does_not_cancel_the_call():
+    async def main():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def read():
+            await release.wait()
+            return b"[]"
+
+        first = asyncio.create_task(flights.run("country", read))
+        second = asyncio.create_task(flights.run("country", read))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == (b"[]", True)
@@ -0,0 +1,82 @@
+from datetime import date
+from types import SimpleNamespace
+import io
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import types
+from awesome_inc.api.columnar import (
+    ARROW_MEDIA_TYPE,
+    PARQUET_MEDIA_TYPE,
+    ColumnarEncoder,
+    arrow_schema,
+    arrow_type,
+    columnar_chunks,
+    query_arrow_schema,
+)
+from awesome_inc.api.facts import installation_facts_query
+from awesome_inc.api.models import Installation
+
+ROWS = [
+    SimpleNamespace(id=1000, installation_date=date(2021, 10, 22)),
+    SimpleNamespace(id=1001, installation_date=date(2021, 10, 5)),
+    SimpleNamespace(id=1002, installation_date=date(2021, 9, 1)),
+]
+
+
+def test_arrow_type():
+    assert arrow_type(types.Integer()) == pa.int32()
+    assert arrow_type(types.BigInteger()) == pa.int64()
+    assert arrow_type(types.Date()) == pa.date32()
+    assert arrow_type(types.Numeric(10, 2)) == pa.decimal128(10, 2)
+    assert arrow_type(types.String()) == pa.string()
+
+
+def test_arrow_schema():
+    schema = arrow_schema(Installation, ["id", "installation_date"])
+    assert schema.names == ["id", "installation_date"]
+    assert schema.types == [pa.int32(), pa.date32()]
+
+
+def test_query_arrow_schema():
+    schema = query_arrow_schema(installation_facts_query())
+
+    assert schema.field("installation_id").type == pa.int32()
+    assert schema.field("installation_date").type == pa.date32()
+    assert schema.field("category_name").type == pa.string()
+
+
+def test_arrow_stream():
+    schema = arrow_schema(Installation, ["id", "installation_date"])
+    encoder = ColumnarEncoder(schema, ARROW_MEDIA_TYPE)
+
+    chunks = list(columnar_chunks(encoder, ROWS, batch_size=2))
+
+    assert len(chunks) == 3
+    table = pa.ipc.open_stream(b"".join(chunks)).read_all()
+    assert table.num_rows == 3
+    assert [batch.num_rows for batch in table.to_batches()] == [2, 1]
+    assert table.column("id").to_pylist() == [1000, 1001, 1002]
+
+
+def test_parquet_file():
+    schema = arrow_schema(Installation, ["id", "installation_date"])
+    encoder = ColumnarEncoder(schema, PARQUET_MEDIA_TYPE)
+
+    body = b"".join(columnar_chunks(encoder, ROWS, batch_size=2))
+
+    table = pq.read_table(io.BytesIO(body))
+    assert table.schema == schema
+    assert table.column("installation_date").to_pylist()[2] == date(2021, 9, 1)
+
+
+def test_parquet_row_groups():
+    schema = arrow_schema(Installation, ["id", "installation_date"])
+    encoder = ColumnarEncoder(schema, PARQUET_MEDIA_TYPE, row_group_size=2)
+
+    body = b"".join(columnar_chunks(encoder, ROWS, batch_size=1))
+
+    metadata = pq.ParquetFile(io.BytesIO(body)).metadata
+    assert [
+        metadata.row_group(index).num_rows
+        for index in range(metadata.num_row_groups)
+    ] == [2, 1]
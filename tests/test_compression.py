@@ -0,0 +1,95 @@
+import asyncio
+import gzip
+import zstandard
+from awesome_inc.api.compression import (
+    CompressionMiddleware,
+    negotiate_encoding,
+)
+
+
+def _app(chunks, content_type="application/json"):
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", content_type.encode())],
+            }
+        )
+        for i, chunk in enumerate(chunks):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": i < len(chunks) - 1,
+                }
+            )
+
+    return app
+
+
+def _call(app, accept_encoding, **options):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    middleware = CompressionMiddleware(app, **options)
+    asyncio.run(middleware(scope, None, send))
+    headers = dict(messages[0]["headers"])
+    return headers, [m["body"] for m in messages[1:]]
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate, br, zstd") == "zstd"
+    assert negotiate_encoding("gzip, zstd;q=0.5") == "gzip"
+    assert negotiate_encoding("zstd;q=0, *") == "gzip"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+
+
+def test_compresses_streamed_body_incrementally():
+    chunks = [b'{"id":1000}\n' * 100, b'{"id":1001}\n' * 100]
+    headers, bodies = _call(_app(chunks), "gzip", flush_size=1000)
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    assert len(bodies) == 2
+    assert gzip.decompress(bodies[0] + bodies[1]) == b"".join(chunks)
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    _, bodies = _call(_app(chunks), "zstd", flush_size=1000)
+    assert decompressor.decompress(bodies[0]) == chunks[0]
+
+
+def test_flushes_small_chunks_together():
+    chunks = [b'{"id":%d}\n' % i for i in range(1000, 1100)]
+    headers, bodies = _call(_app(chunks), "gzip", flush_size=240)
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert 2 < len(bodies) < 10
+    assert gzip.decompress(b"".join(bodies)) == b"".join(chunks)
+
+
+def test_compresses_whole_body_with_zstd():
+    body = b"[" + b'{"id":1000},' * 200 + b"]"
+    headers, bodies = _call(_app([body]), "zstd", zstd_level=10)
+
+    assert headers[b"content-encoding"] == b"zstd"
+    assert int(headers[b"content-length"]) == len(bodies[0]) < len(body)
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    assert decompressor.decompress(bodies[0]) == body
+
+
+def test_skips_small_and_precompressed_bodies():
+    headers, bodies = _call(_app([b"[]"]), "gzip", minimum_size=10)
+    assert b"content-encoding" not in headers
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert bodies == [b"[]"]
+
+    parquet = _app([b"PAR1" * 500], "application/vnd.apache.parquet")
+    headers, bodies = _call(parquet, "gzip")
+    assert b"content-encoding" not in headers
@@ -1,7 +1,136 @@
-from awesome_inc.api.core.database import get_db
+from awesome_inc.api.core.database import (
+    Database,
+    dispose_async_engine,
+    dispose_engine,
+    get_async_db,
+    get_db,
+    get_engine,
+    new_async_engine,
+    new_engine,
+    pool_status,
+    run_query,
+    warm_up_engine,
+)
+from sqlalchemy import create_engine, select, literal
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from unittest.mock import AsyncMock, MagicMock
+import asyncio
+import threading
+
+
+def _database(**pool_settings):
+    return Database(
+        hostname="localhost",
+        username="user",
+        password="password",
+        dbname="awesomeinc",
+        port=5432,
+        **pool_settings,
+    )
 
 
 def test_get_db():
     db = next(get_db())
     assert isinstance(db, Session)
+
+
+def test_get_db_shares_engine():
+    first = next(get_db())
+    second = next(get_db())
+    assert first.get_bind() is second.get_bind() is get_engine()
+
+
+def test_new_engine_pool_settings():
+    engine = new_engine(
+        _database(pool_size=3, max_overflow=2, pool_recycle=60)
+    )
+    assert engine.pool.size() == 3
+    assert engine.pool._max_overflow == 2
+    assert engine.pool._recycle == 60
+    assert engine.pool._pre_ping is True
+    assert engine.echo is False
+
+
+def test_database_from_env_pool_settings(monkeypatch):
+    monkeypatch.setenv("DATABASE__POOL_SIZE", "7")
+    monkeypatch.setenv("DATABASE__POOL_PRE_PING", "false")
+    dispose_engine()
+    engine = get_engine()
+    assert engine.pool.size() == 7
+    assert engine.pool._pre_ping is False
+    dispose_engine()
+
+
+def test_pool_status():
+    dispose_engine()
+    assert pool_status() == {}
+    get_engine()
+    assert pool_status() == {
+        "size": 5,
+        "checked_in": 0,
+        "checked_out": 0,
+        "overflow": -5,
+    }
+
+
+def test_new_async_engine_pool_settings():
+    engine = new_async_engine(_database(pool_size=3, max_overflow=2))
+    assert engine.url.drivername == "postgresql+asyncpg"
+    assert engine.pool.size() == 3
+    assert engine.pool._max_overflow == 2
+
+
+def test_get_async_db():
+    async def scenario():
+        sessions = get_async_db()
+        db = await sessions.__anext__()
+        assert isinstance(db, AsyncSession)
+        assert "async" in pool_status()
+        await sessions.aclose()
+        await dispose_async_engine()
+
+    asyncio.run(scenario())
+    assert "async" not in pool_status()
+
+
+def test_run_query_runs_sync_sessions_in_threadpool():
+    main_thread = threading.get_ident()
+
+    def sync_function(db, value, extra):
+        assert threading.get_ident() != main_thread
+        return (db, value, extra)
+
+    async_function = AsyncMock()
+    db = MagicMock(spec=Session)
+
+    result = asyncio.run(
+        run_query(db, sync_function, async_function, 1, extra=2)
+    )
+
+    assert result == (db, 1, 2)
+    async_function.assert_not_called()
+
+
+def test_run_query_awaits_async_sessions():
+    async_function = AsyncMock(return_value="rows")
+    db = MagicMock(spec=AsyncSession)
+
+    result = asyncio.run(run_query(db, MagicMock(), async_function, 1))
+
+    assert result == "rows"
+    async_function.assert_awaited_once_with(db, 1)
+
+
+def test_warm_up_engine_opens_pool_and_compiles_statements():
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=3)
+    statement = select(literal(1)).limit(0)
+
+    warm_up_engine(engine, [statement])
+
+    assert engine.pool.checkedin() == 3
+    assert len(engine._compiled_cache) == 1
+    with engine.connect() as connection:
+        connection.execute(statement)
+    assert len(engine._compiled_cache) == 1
@@ -0,0 +1,25 @@
+from collections import namedtuple
+from datetime import date
+from awesome_inc.api.encoders import RowEncoder, row_encoder
+
+
+def test_row_encoder():
+    encoder = RowEncoder(["id", "installation_date"])
+    rows = [(1000, date(2021, 10, 22)), (1001, date(2021, 10, 5))]
+
+    assert encoder.encode(rows) == (
+        b'[{"id":1000,"installation_date":"2021-10-22"},'
+        b'{"id":1001,"installation_date":"2021-10-05"}]'
+    )
+
+
+def test_row_encoder_drops_trailing_columns():
+    Row = namedtuple("Row", ["region", "id"])
+    encoder = RowEncoder(["region"])
+
+    assert encoder.encode([Row("Europe", 1000)]) == b'[{"region":"Europe"}]'
+
+
+def test_row_encoder_is_cached():
+    assert row_encoder(("id", "name")) is row_encoder(("id", "name"))
+    assert row_encoder(("id",)).encode([]) == b"[]"
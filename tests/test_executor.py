@@ -0,0 +1,29 @@
+import asyncio
+import threading
+import pytest
+from awesome_inc.api.core.executor import BoundedExecutor, ExecutorSaturated
+
+
+def test_run_uses_worker_thread():
+    executor = BoundedExecutor(max_workers=1, max_queue=0, name="test")
+
+    result = asyncio.run(executor.run(threading.current_thread))
+
+    assert result.name.startswith("test")
+
+
+def test_run_rejects_work_when_saturated():
+    executor = BoundedExecutor(max_workers=1, max_queue=1, name="test")
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(release.wait)
+        release.set()
+        assert await running and await queued
+        assert await executor.run(release.wait)
+
+    asyncio.run(scenario())
@@ -0,0 +1,110 @@
+from unittest.mock import MagicMock
+from collections import namedtuple
+from datetime import date
+import hashlib
+import json
+import pyarrow.parquet as pq
+import pytest
+from awesome_inc.api.export import (
+    export_database,
+    export_table,
+    import_snapshot,
+)
+from awesome_inc.api.models import Country, Installation
+
+SNAPSHOT = "00000003-0000001B-1"
+
+ROWS = {
+    "country": [(1000, "Belgium", "Europe"), (1001, "Spain", "Europe")],
+    "installation": [
+        namedtuple("Row", [c.name for c in Installation.__table__.columns])(
+            1000, "Inst-98037", "Last minute", 1005, 1004, date(2021, 10, 22)
+        )
+    ],
+}
+
+
+def _mock_engine():
+    connection = MagicMock()
+
+    def execute(statement):
+        result = MagicMock()
+        sql = str(statement)
+        if "pg_export_snapshot" in sql:
+            result.scalar_one.return_value = SNAPSHOT
+        else:
+            table = sql.split("FROM ")[-1].split()[0] if "FROM" in sql else ""
+            rows = ROWS.get(table, [])
+            result.partitions.return_value = iter([rows] if rows else [])
+        return result
+
+    connection.execute.side_effect = execute
+    engine = MagicMock()
+    connect = engine.connect.return_value.execution_options.return_value
+    connect.__enter__.return_value = connection
+    return engine, connection
+
+
+def test_import_snapshot():
+    connection = MagicMock()
+    import_snapshot(connection, SNAPSHOT)
+
+    statement = connection.execute.call_args.args[0]
+    assert str(statement) == f"SET TRANSACTION SNAPSHOT '{SNAPSHOT}'"
+    with pytest.raises(ValueError):
+        import_snapshot(connection, "1'; DROP TABLE country; --")
+
+
+def test_export_table_csv(tmp_path):
+    engine, connection = _mock_engine()
+
+    result = export_table(engine, SNAPSHOT, Country, tmp_path, "csv")
+
+    content = (tmp_path / "country.csv").read_bytes()
+    assert content.decode().splitlines() == [
+        "id,name,region",
+        "1000,Belgium,Europe",
+        "1001,Spain,Europe",
+    ]
+    assert result == {
+        "file": "country.csv",
+        "rows": 2,
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+    engine.connect.return_value.execution_options.assert_called_with(
+        isolation_level="REPEATABLE READ"
+    )
+    assert "SET TRANSACTION SNAPSHOT" in str(
+        connection.execute.call_args_list[0].args[0]
+    )
+
+
+def test_export_table_parquet(tmp_path):
+    engine, _ = _mock_engine()
+
+    result = export_table(engine, SNAPSHOT, Installation, tmp_path)
+
+    table = pq.read_table(tmp_path / "installation.parquet")
+    assert table.num_rows == result["rows"] == 1
+    assert table.column("installation_date").to_pylist() == [
+        date(2021, 10, 22)
+    ]
+
+
+def test_export_database(tmp_path):
+    engine, _ = _mock_engine()
+
+    manifest = export_database(engine, tmp_path, "csv", workers=2)
+
+    assert manifest["snapshot"] == SNAPSHOT
+    assert set(manifest["tables"]) == {
+        "country",
+        "customer",
+        "installation",
+        "product",
+        "product_category",
+    }
+    assert manifest["tables"]["country"]["rows"] == 2
+    assert manifest["tables"]["customer"]["rows"] == 0
+    written = json.loads((tmp_path / "manifest.json").read_text())
+    assert written == manifest
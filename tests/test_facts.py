@@ -0,0 +1,46 @@
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+from awesome_inc.api.facts import (
+    installation_facts_query,
+    retrieve_installation_facts,
+    stream_installation_facts,
+)
+from awesome_inc.api.schemas import InstallationFact
+
+
+def test_installation_facts_query():
+    query = installation_facts_query(limit=10, after=1000)
+    sql = str(query)
+
+    assert [column.key for column in query.selected_columns] == list(
+        InstallationFact.model_fields
+    )
+    assert sql.count("JOIN") == 4
+    assert "JOIN customer ON customer.id = installation.customer_id" in sql
+    assert "JOIN country ON country.id = customer.country_id" in sql
+    assert "JOIN product ON product.id = installation.product_id" in sql
+    assert (
+        "JOIN product_category ON product_category.id = product.category_id"
+        in sql
+    )
+    assert "WHERE installation.id > :id_1" in sql
+    assert "ORDER BY installation.id" in sql
+    assert "LIMIT :param_1" in sql
+
+
+def test_retrieve_installation_facts():
+    mock_db = MagicMock(spec=Session)
+    mock_db.execute.return_value.all.return_value = ["row"]
+
+    assert retrieve_installation_facts(mock_db, limit=5) == ["row"]
+    query = mock_db.execute.call_args.args[0]
+    assert query._limit == 5
+
+
+def test_stream_installation_facts():
+    mock_db = MagicMock(spec=Session)
+    mock_db.execute.return_value = iter(["row"])
+
+    assert list(stream_installation_facts(mock_db, batch_size=50)) == ["row"]
+    query = mock_db.execute.call_args.args[0]
+    assert query.get_execution_options()["yield_per"] == 50
@@ -0,0 +1,53 @@
+from datetime import date
+import pytest
+from awesome_inc.api.filters import InvalidQuery, parse_fields, parse_filters
+from awesome_inc.api.models import Installation
+
+
+def test_parse_fields():
+    assert parse_fields(Installation, "id,customer_id,id") == [
+        "id",
+        "customer_id",
+    ]
+    assert parse_fields(Installation, "id, ") == ["id"]
+
+
+@pytest.mark.parametrize("fields", ["", " , ", "id,price"])
+def test_parse_invalid_fields(fields):
+    with pytest.raises(InvalidQuery):
+        parse_fields(Installation, fields)
+
+
+def test_parse_filters():
+    conditions = parse_filters(
+        Installation,
+        [
+            ("limit", "10"),
+            ("customer_id", "1000"),
+            ("installation_date__lt", "2021-10-01"),
+            ("product_id__in", "1000,1003"),
+        ],
+    )
+
+    assert [str(condition) for condition in conditions] == [
+        "installation.customer_id = :customer_id_1",
+        "installation.installation_date < :installation_date_1",
+        "installation.product_id IN (__[POSTCOMPILE_product_id_1])",
+    ]
+    assert conditions[0].right.value == 1000
+    assert conditions[1].right.value == date(2021, 10, 1)
+    assert conditions[2].right.value == [1000, 1003]
+
+
+@pytest.mark.parametrize(
+    "parameter",
+    [
+        ("unknown", "1"),
+        ("customer_id__like", "1"),
+        ("customer_id", "abc"),
+        ("installation_date__gte", "yesterday"),
+    ],
+)
+def test_parse_invalid_filters(parameter):
+    with pytest.raises(InvalidQuery):
+        parse_filters(Installation, [parameter])
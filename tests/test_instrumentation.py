@@ -0,0 +1,69 @@
+from sqlalchemy import create_engine, text
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from fastapi.testclient import TestClient
+from awesome_inc.api.core.instrumentation import (
+    QueryTrackingMiddleware,
+    RequestQueries,
+    current_queries,
+    instrument_engine,
+    parameters_shape,
+    tables,
+)
+import logging
+
+
+def test_tables():
+    assert tables(
+        'SELECT * FROM "customer" JOIN country ON 1 = 1 JOIN country ON 2 = 2'
+    ) == ["customer", "country"]
+    assert tables("SELECT 1") == []
+
+
+def test_parameters_shape():
+    assert parameters_shape({"id_1": 3, "name": "x"}) == (
+        "{id_1: int, name: str}"
+    )
+    assert parameters_shape([{"id": 1}, {"id": 2}]) == "2 x {id: int}"
+    assert parameters_shape((1, "x")) == "(int, str)"
+    assert parameters_shape(None) == "{}"
+
+
+def test_instrument_engine_counts_and_logs_slow_queries(caplog):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, slow_query_seconds=0.0)
+    queries = RequestQueries({"route": None})
+    token = current_queries.set(queries)
+    try:
+        with caplog.at_level(logging.WARNING), engine.connect() as connection:
+            for value in (1, 2, 3):
+                connection.execute(text("SELECT :value"), {"value": value})
+    finally:
+        current_queries.reset(token)
+
+    assert queries.count == 3
+    assert queries.statements.most_common(1)[0][1] == 3
+    assert "Slow query" in caplog.text
+    assert "parameters (int)" in caplog.text
+    assert "route unmatched" in caplog.text
+
+
+def test_middleware_flags_repeated_statements(caplog):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, slow_query_seconds=60.0)
+
+    def lazy_loads(request):
+        with engine.connect() as connection:
+            for value in range(5):
+                connection.execute(text("SELECT :value"), {"value": value})
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/lazy", lazy_loads)])
+    app.add_middleware(QueryTrackingMiddleware, repeated_statement_threshold=5)
+    with caplog.at_level(logging.WARNING):
+        response = TestClient(app).get("/lazy")
+
+    assert response.status_code == 200
+    assert "Possible N+1 queries: route /lazy executed 5" in caplog.text
+    assert "Slow query" not in caplog.text
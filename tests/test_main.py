@@ -1,16 +1,55 @@
 from fastapi.testclient import TestClient
-from awesome_inc.api.main import app, get_db, decode_token, auth
+from awesome_inc.api.main import (
+    AppState,
+    app_state,
+    auth,
+    create_app,
+    decode_token,
+    get_db,
+    get_read_db,
+)
 from awesome_inc.api.core.config import (
     Credentials,
+    Settings,
 )
 from unittest.mock import MagicMock
 from datetime import timedelta
+import asyncio
+import httpx
+import io
+import os
+import subprocess
+import sys
+import threading
+import time
+import pytest
+import pyarrow as pa
+import pyarrow.parquet as pq
+from collections import namedtuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from awesome_inc.api.cache import response_cache
+from awesome_inc.api.core.executor import ExecutorSaturated
+from awesome_inc.api.pagination import decode_cursor, encode_cursor
+
+SETTINGS = Settings(
+    stored_credentials=Credentials(
+        username="valid_user", hashed_password="hashed_password"
+    ),
+    secret_key="secret",
+    warm_up=False,
+)
 
+IMPORT_TIME_BUDGET_SECONDS = 2.0
 
+app = create_app(SETTINGS)
 client = TestClient(app)
 
 
+def row(**values):
+    return namedtuple("Row", values)(**values)
+
+
 # Mock the Authentication class
 class MockAuth:
     def authenticate_user(self, username: str, password: str):
@@ -44,6 +83,24 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    response_cache.invalidate()
+    yield
+    response_cache.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def table_version(mocker):
+    mocker.patch(
+        "awesome_inc.api.main.table_version_async", return_value="9-1008"
+    )
+    return mocker.patch(
+        "awesome_inc.api.main.table_version", return_value="9-1008"
+    )
 
 
 def test_root():
@@ -91,34 +148,783 @@ def test_retrieve_all_tables(mocker):
 
 
 def test_read_table_data_valid(mocker):
-    mock_retrieve_all_table_names = mocker.patch(
-        "awesome_inc.api.main.retrieve_all_table_names"
+    mock_retrieve_table_data = mocker.patch(
+        "awesome_inc.api.main.retrieve_table_data"
     )
-    mock_retrieve_all_table_names.return_value = {
-        "table_names": ["country", "customer"]
+    mock_retrieve_table_data.return_value = [
+        row(id=1, name="Country1", region="Region1")
+    ]
+
+    response = client.get(
+        "/country", headers={"Authorization": "Bearer valid_token"}
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 1, "name": "Country1", "region": "Region1"}
+    ]
+    kwargs = mock_retrieve_table_data.call_args.kwargs
+    assert kwargs["columns"] == ["id", "name", "region"]
+
+
+def test_read_table_data_invalid():
+
+    response = client.get(
+        "/InvalidTable", headers={"Authorization": "Bearer valid_token"}
+    )
+    assert response.status_code == 404
+    assert response.json() == {"detail": "InvalidTable table does not exist."}
+
+
+def test_dependencies_run_on_the_event_loop():
+    for dependency in (app_state, auth, decode_token):
+        assert asyncio.iscoroutinefunction(dependency)
+
+
+def test_health():
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+
+
+def test_refresh_table_names(mocker):
+    mock_refresh = mocker.patch("awesome_inc.api.main.catalog.refresh")
+    mock_refresh.return_value = ["country"]
+
+    response = client.post(
+        "/all-tables/refresh", headers={"Authorization": "Bearer valid_token"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"table_names": ["country"]}
+
+
+def test_read_table_data_page(mocker):
+    mock_retrieve_table_data = mocker.patch(
+        "awesome_inc.api.main.retrieve_table_data"
+    )
+    mock_retrieve_table_data.return_value = [
+        row(id=1000, name="Category1"),
+        row(id=1001, name="Category2"),
+        row(id=1002, name="Category3"),
+    ]
+
+    response = client.get(
+        "/product_category?limit=2",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.status_code == 200
+    assert [row["id"] for row in response.json()] == [1000, 1001]
+    assert mock_retrieve_table_data.call_args.kwargs["limit"] == 3
+    assert mock_retrieve_table_data.call_args.kwargs["after"] is None
+    cursor = response.headers["X-Next-Cursor"]
+    assert decode_cursor(cursor) == {"id": 1001}
+    assert f"after={cursor}" in response.headers["Link"]
+
+    client.get(
+        f"/product_category?limit=2&after={cursor}",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert mock_retrieve_table_data.call_args.kwargs["after"] == 1001
+
+
+def test_read_table_data_last_page(mocker):
+    mock_retrieve_table_data = mocker.patch(
+        "awesome_inc.api.main.retrieve_table_data"
+    )
+    mock_retrieve_table_data.return_value = [
+        row(id=1, name="Country1", region="Region1")
+    ]
+
+    response = client.get(
+        "/country?limit=2", headers={"Authorization": "Bearer valid_token"}
+    )
+    assert response.status_code == 200
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_read_table_data_invalid_cursor():
+    response = client.get(
+        "/country?after=not-a-cursor",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor."}
+
+
+@pytest.mark.parametrize("key", ["abc", [1000], None])
+def test_read_table_data_tampered_cursor(mocker, key):
+    mock_retrieve_table_data = mocker.patch(
+        "awesome_inc.api.main.retrieve_table_data"
+    )
+
+    response = client.get(
+        f"/country?limit=1&after={encode_cursor({'id': key})}",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor."}
+    mock_retrieve_table_data.assert_not_called()
+
+
+def test_read_table_data_ndjson(mocker):
+    mock_stream_table_data = mocker.patch(
+        "awesome_inc.api.main.stream_table_data"
+    )
+    mock_stream_table_data.return_value = iter(
+        [
+            row(id=1000, name="Belgium", region="Europe"),
+            row(id=1001, name="Spain", region="Europe"),
+        ]
+    )
+
+    response = client.get(
+        "/country",
+        headers={
+            "Authorization": "Bearer valid_token",
+            "Accept": "application/x-ndjson",
+        },
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.text.splitlines() == [
+        '{"id":1000,"name":"Belgium","region":"Europe"}',
+        '{"id":1001,"name":"Spain","region":"Europe"}',
+    ]
+
+
+def test_read_table_data_projection_and_filters(mocker):
+    mock_retrieve_table_data = mocker.patch(
+        "awesome_inc.api.main.retrieve_table_data"
+    )
+    mock_retrieve_table_data.return_value = [
+        row(installation_date="2021-09-01", id=1002),
+    ]
+
+    response = client.get(
+        "/installation?fields=installation_date"
+        "&installation_date__gte=2021-09-01&customer_id__in=1000,1001",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.status_code == 200
+    assert response.json() == [{"installation_date": "2021-09-01"}]
+    kwargs = mock_retrieve_table_data.call_args.kwargs
+    assert kwargs["columns"] == ["installation_date", "id"]
+    assert [str(f) for f in kwargs["filters"]] == [
+        "installation.installation_date >= :installation_date_1",
+        "installation.customer_id IN (__[POSTCOMPILE_customer_id_1])",
+    ]
+
+
+def test_read_table_data_invalid_filter():
+    response = client.get(
+        "/country?population__gt=10",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.status_code == 400
+    assert response.json() == {
+        "detail": "population is not a column of country."
     }
+
+
+def test_read_table_data_incremental(mocker):
+    mock_high_water_mark = mocker.patch("awesome_inc.api.main.high_water_mark")
+    mock_high_water_mark.return_value = 1002
     mock_retrieve_table_data = mocker.patch(
         "awesome_inc.api.main.retrieve_table_data"
     )
-    mock_retrieve_table_data.return_value = [{"id": 1, "name": "Country1"}]
+    mock_retrieve_table_data.return_value = [
+        row(id=1001, name="Category1"),
+        row(id=1002, name="Category2"),
+    ]
 
     response = client.get(
-        "/country", headers={"Authorization": "Bearer valid_token"}
+        "/product_category?since=1000&limit=1",
+        headers={"Authorization": "Bearer valid_token"},
     )
     assert response.status_code == 200
-    assert response.json() == [{"id": 1, "name": "Country1"}]
+    assert response.headers["X-Watermark"] == "1002"
+    filters = mock_retrieve_table_data.call_args.kwargs["filters"]
+    assert [str(f) for f in filters] == [
+        "product_category.id > :id_1",
+        "product_category.id <= :id_1",
+    ]
+    cursor = response.headers["X-Next-Cursor"]
+    assert decode_cursor(cursor) == {"id": 1001, "until": "1002"}
 
+    mock_high_water_mark.reset_mock()
+    response = client.get(
+        f"/product_category?since=1000&limit=1&after={cursor}",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.headers["X-Watermark"] == "1002"
+    mock_high_water_mark.assert_not_called()
 
-def test_read_table_data_invalid(mocker):
-    mock_retrieve_all_table_names = mocker.patch(
-        "awesome_inc.api.main.retrieve_all_table_names"
+
+def test_read_table_data_incremental_tampered_cursor(mocker):
+    mock_retrieve_table_data = mocker.patch(
+        "awesome_inc.api.main.retrieve_table_data"
     )
-    mock_retrieve_all_table_names.return_value = {
-        "table_names": ["country", "customer"]
+    cursor = encode_cursor({"id": 1001, "until": [1002]})
+
+    response = client.get(
+        f"/product_category?since=1000&limit=1&after={cursor}",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.status_code == 400
+    mock_retrieve_table_data.assert_not_called()
+
+
+def test_read_table_data_incremental_empty_table(mocker):
+    mocker.patch("awesome_inc.api.main.high_water_mark", return_value=None)
+    mocker.patch("awesome_inc.api.main.retrieve_table_data", return_value=[])
+
+    response = client.get(
+        "/country?since=", headers={"Authorization": "Bearer valid_token"}
+    )
+    assert response.status_code == 200
+    assert "X-Watermark" not in response.headers
+
+
+def test_read_table_data_async_session(mocker):
+    mock_retrieve_table_data_async = mocker.patch(
+        "awesome_inc.api.main.retrieve_table_data_async"
+    )
+    mock_retrieve_table_data_async.return_value = [
+        row(id=1000, name="Belgium", region="Europe")
+    ]
+    mock_retrieve_table_data = mocker.patch(
+        "awesome_inc.api.main.retrieve_table_data"
+    )
+
+    async def override_get_async_db():
+        yield MagicMock(spec=AsyncSession)
+
+    app.dependency_overrides[get_read_db] = override_get_async_db
+    try:
+        response = client.get(
+            "/country", headers={"Authorization": "Bearer valid_token"}
+        )
+    finally:
+        app.dependency_overrides[get_read_db] = override_get_db
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 1000, "name": "Belgium", "region": "Europe"}
+    ]
+    mock_retrieve_table_data.assert_not_called()
+
+
+def test_read_table_data_ndjson_async_session(mocker):
+    async def rows(*args, **kwargs):
+        yield row(id=1000, name="Belgium", region="Europe")
+
+    mocker.patch("awesome_inc.api.main.stream_table_data_async", rows)
+    db = MagicMock(spec=AsyncSession)
+
+    async def override_get_async_db():
+        yield db
+
+    app.dependency_overrides[get_read_db] = override_get_async_db
+    try:
+        response = client.get(
+            "/country",
+            headers={
+                "Authorization": "Bearer valid_token",
+                "Accept": "application/x-ndjson",
+            },
+        )
+    finally:
+        app.dependency_overrides[get_read_db] = override_get_db
+    assert response.text == '{"id":1000,"name":"Belgium","region":"Europe"}\n'
+    db.close.assert_awaited()
+
+
+def test_read_table_data_parquet(mocker):
+    mock_stream_table_data = mocker.patch(
+        "awesome_inc.api.main.stream_table_data"
+    )
+    mock_stream_table_data.return_value = iter([row(id=1000, region="Europe")])
+
+    response = client.get(
+        "/country?format=parquet&fields=region",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    assert "country.parquet" in response.headers["content-disposition"]
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.to_pylist() == [{"region": "Europe"}]
+
+
+def test_read_table_data_arrow(mocker):
+    mock_stream_table_data = mocker.patch(
+        "awesome_inc.api.main.stream_table_data"
+    )
+    mock_stream_table_data.return_value = iter(
+        [row(id=1000, name="Belgium", region="Europe")]
+    )
+
+    response = client.get(
+        "/country",
+        headers={
+            "Authorization": "Bearer valid_token",
+            "Accept": "application/vnd.apache.arrow.stream",
+        },
+    )
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.to_pylist() == [
+        {"id": 1000, "name": "Belgium", "region": "Europe"}
+    ]
+
+
+def test_auth_is_shared():
+    state = AppState(SETTINGS)
+    assert state.auth is state.auth
+    assert state.auth.stored_credentials == SETTINGS.stored_credentials
+
+
+def test_login_rejected_when_saturated(mocker):
+    mocker.patch.object(
+        app.state.components.login_executor,
+        "run",
+        side_effect=ExecutorSaturated("authenticate_user"),
+    )
+
+    response = client.post(
+        "/token", data={"username": "valid_user", "password": "valid_password"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_create_app_does_not_read_environment(monkeypatch):
+    monkeypatch.delenv("SECRET__KEY", raising=False)
+
+    state = create_app().state.components
+    monkeypatch.setenv("ADF__USERNAME", "user")
+    monkeypatch.setenv("HASHED__PASSWORD", "hashed")
+    monkeypatch.setenv("SECRET__KEY", "created-after")
+    settings = state.settings
+
+    assert settings.secret_key == "created-after"
+    assert create_app(SETTINGS).state.components.settings == SETTINGS
+
+
+def test_concurrent_identical_reads_share_one_query(mocker):
+    def retrieve(*args, **kwargs):
+        time.sleep(0.2)
+        return [row(id=1000, name="Belgium", region="Europe")]
+
+    mock_retrieve_table_data = mocker.patch(
+        "awesome_inc.api.main.retrieve_table_data", side_effect=retrieve
+    )
+
+    async def burst():
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as http:
+            return await asyncio.gather(
+                *(
+                    http.get(
+                        "/country?limit=10",
+                        headers={"Authorization": "Bearer valid_token"},
+                    )
+                    for _ in range(4)
+                )
+            )
+
+    responses = asyncio.run(burst())
+
+    assert mock_retrieve_table_data.call_count == 1
+    assert {response.content for response in responses} == {
+        b'[{"id":1000,"name":"Belgium","region":"Europe"}]'
     }
 
+
+def test_shared_read_survives_cancelled_leader(mocker):
+    leader_db = MagicMock(spec=Session)
+    sessions = []
+
+    def retrieve(db, *args, **kwargs):
+        sessions.append(db)
+        time.sleep(0.2)
+        return [row(id=1000, name="Belgium", region="Europe")]
+
+    mocker.patch(
+        "awesome_inc.api.main.retrieve_table_data", side_effect=retrieve
+    )
+
+    def override_get_leader_db():
+        yield leader_db
+        leader_db.close()
+
+    async def burst():
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as http:
+            headers = {"Authorization": "Bearer valid_token"}
+            leader = asyncio.create_task(
+                http.get("/country?limit=3", headers=headers)
+            )
+            await asyncio.sleep(0.05)
+            follower = asyncio.create_task(
+                http.get("/country?limit=3", headers=headers)
+            )
+            await asyncio.sleep(0.05)
+            leader.cancel()
+            return await follower
+
+    app.dependency_overrides[get_read_db] = override_get_leader_db
+    try:
+        response = asyncio.run(burst())
+    finally:
+        app.dependency_overrides[get_read_db] = override_get_db
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 1000, "name": "Belgium", "region": "Europe"}
+    ]
+    assert len(sessions) == 1
+    assert sessions[0] is not leader_db
+    assert isinstance(sessions[0], Session)
+
+
+def test_read_table_data_from_primary_bypasses_cache(mocker):
+    mock_retrieve_table_data = mocker.patch(
+        "awesome_inc.api.main.retrieve_table_data",
+        return_value=[row(id=1000, name="Belgium", region="Europe")],
+    )
+    for _ in range(2):
+        response = client.get(
+            "/country?primary=true",
+            headers={"Authorization": "Bearer valid_token"},
+        )
+        assert response.status_code == 200
+    assert mock_retrieve_table_data.call_count == 2
+    assert mock_retrieve_table_data.call_args.kwargs["filters"] == []
+
+
+def test_health_while_warming_up():
+    app.state.components.warming_up = True
+    try:
+        response = client.get("/health")
+    finally:
+        app.state.components.warming_up = False
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+
+
+def test_lifespan_warms_up(mocker):
+    released = threading.Event()
+    warm_up_engine = mocker.patch(
+        "awesome_inc.api.main.warm_up_engine",
+        side_effect=lambda *args: released.wait(5),
+    )
+    mocker.patch("awesome_inc.api.main.init_engine")
+    mocker.patch("awesome_inc.api.main.dispose_engine")
+    settings = SETTINGS.model_copy(update={"warm_up": True})
+
+    with TestClient(create_app(settings)) as warming_client:
+        assert warming_client.get("/health").status_code == 503
+        released.set()
+        for _ in range(100):
+            response = warming_client.get("/health")
+            if response.status_code == 200:
+                break
+            time.sleep(0.01)
+    assert response.json()["status"] == "ok"
+    statements = warm_up_engine.call_args.args[1]
+    assert len(statements) == 5
+    assert "LIMIT" in str(statements[0])
+
+
+def test_lifespan_keeps_engine_of_running_app(mocker):
+    mocker.patch("awesome_inc.api.main.init_engine")
+    dispose_engine = mocker.patch("awesome_inc.api.main.dispose_engine")
+
+    with TestClient(create_app(SETTINGS)):
+        with TestClient(create_app(SETTINGS)):
+            pass
+        dispose_engine.assert_not_called()
+    dispose_engine.assert_called_once()
+
+
+def test_import_time_budget():
+    code = (
+        "import sys, awesome_inc.api.main;"
+        "print(*(name for name in ('jwt', 'passlib', 'pyarrow', 'psycopg2')"
+        " if name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env={
+            "PATH": os.environ["PATH"],
+            "PYTHONPATH": os.pathsep.join(sys.path),
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == ""
+    line = [
+        line
+        for line in result.stderr.splitlines()
+        if line.endswith("| awesome_inc.api.main")
+    ][-1]
+    seconds = int(line.split("|")[1]) / 1e6
+    assert seconds < IMPORT_TIME_BUDGET_SECONDS
+
+
+def test_read_table_data_etag(mocker, table_version):
+    mocker.patch("awesome_inc.api.main.retrieve_table_data", return_value=[])
     response = client.get(
-        "/InvalidTable", headers={"Authorization": "Bearer valid_token"}
+        "/country", headers={"Authorization": "Bearer valid_token"}
+    )
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = client.get(
+        "/country",
+        headers={"Authorization": "Bearer valid_token", "If-None-Match": etag},
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    table_version.return_value = "10-1009"
+    response_cache.invalidate("country")
+    response = client.get(
+        "/country",
+        headers={"Authorization": "Bearer valid_token", "If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_read_table_data_etag_depends_on_query(mocker):
+    mocker.patch("awesome_inc.api.main.retrieve_table_data", return_value=[])
+    first = client.get(
+        "/country?limit=1", headers={"Authorization": "Bearer valid_token"}
+    )
+    second = client.get(
+        "/country?limit=2", headers={"Authorization": "Bearer valid_token"}
+    )
+    assert first.headers["ETag"] != second.headers["ETag"]
+
+
+def test_read_table_data_without_etag(mocker, table_version):
+    mocker.patch("awesome_inc.api.main.retrieve_table_data", return_value=[])
+
+    response = client.get(
+        "/installation", headers={"Authorization": "Bearer valid_token"}
+    )
+    assert "ETag" not in response.headers
+    table_version.assert_not_called()
+
+
+def test_read_table_data_cached(mocker, table_version):
+    mock_retrieve_table_data = mocker.patch(
+        "awesome_inc.api.main.retrieve_table_data"
+    )
+    mock_retrieve_table_data.return_value = [row(id=1000, name="Category1")]
+
+    first = client.get(
+        "/product_category?limit=5",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    second = client.get(
+        "/product_category?limit=5",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert mock_retrieve_table_data.call_count == 1
+    assert table_version.call_count == 1
+
+    client.get(
+        "/product_category?limit=6",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert mock_retrieve_table_data.call_count == 2
+
+
+def test_cache_stats_and_invalidation(mocker):
+    mocker.patch("awesome_inc.api.main.retrieve_table_data", return_value=[])
+    client.get(
+        "/installation", headers={"Authorization": "Bearer valid_token"}
+    )
+
+    response = client.get(
+        "/admin/cache", headers={"Authorization": "Bearer valid_token"}
+    )
+    assert response.status_code == 200
+    assert response.json()["entries"] == 1
+
+    response = client.delete(
+        "/admin/cache?table_name=installation",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.json() == {"invalidated": 1}
+
+
+def test_table_routes_have_concrete_response_models():
+    openapi = client.get("/openapi.json").json()
+
+    assert "/{table_name}" not in openapi["paths"]
+    response = openapi["paths"]["/country"]["get"]["responses"]["200"]
+    schema = response["content"]["application/json"]["schema"]
+    assert schema["items"] == {"$ref": "#/components/schemas/Country"}
+    description = openapi["paths"]["/country"]["get"]["description"]
+    assert "list[Country]:" in description
+    assert "Customer" not in description
+
+
+def test_read_table_data_compressed(mocker):
+    mocker.patch(
+        "awesome_inc.api.main.retrieve_table_data",
+        return_value=[
+            row(id=i, name=f"Category{i}") for i in range(1000, 1100)
+        ],
+    )
+
+    response = client.get(
+        "/product_category",
+        headers={
+            "Authorization": "Bearer valid_token",
+            "Accept-Encoding": "gzip",
+        },
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 100
+
+
+def _fact(installation_id):
+    return row(
+        installation_id=installation_id,
+        installation_name="Installation",
+        description="Description",
+        installation_date="2021-09-01",
+        customer_id=1000,
+        customer_name="Customer",
+        premium_customer="Yes",
+        country_id=1000,
+        country_name="Belgium",
+        region="Europe",
+        product_id=1000,
+        product_reference="REF",
+        product_name="Product",
+        price="10",
+        category_id=1000,
+        category_name="Category",
+    )
+
+
+def test_read_installation_facts(mocker):
+    mock_retrieve = mocker.patch(
+        "awesome_inc.api.main.retrieve_installation_facts",
+        return_value=[_fact(1000), _fact(1001)],
+    )
+
+    response = client.get(
+        "/facts/installations?limit=1",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert response.json()[0]["country_name"] == "Belgium"
+    assert mock_retrieve.call_args.args[1:] == (2, None)
+    assert decode_cursor(response.headers["X-Next-Cursor"]) == {"id": 1000}
+
+
+@pytest.mark.parametrize("key", ["abc", [1000], None])
+def test_read_installation_facts_tampered_cursor(mocker, key):
+    mock_retrieve = mocker.patch(
+        "awesome_inc.api.main.retrieve_installation_facts"
+    )
+
+    response = client.get(
+        f"/facts/installations?after={encode_cursor({'id': key})}",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.status_code == 400
+    mock_retrieve.assert_not_called()
+
+
+def test_read_installation_facts_ndjson(mocker):
+    mocker.patch(
+        "awesome_inc.api.main.stream_installation_facts",
+        return_value=iter([_fact(1000)]),
+    )
+
+    response = client.get(
+        "/facts/installations?format=ndjson",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.status_code == 200
+    assert '"installation_id":1000' in response.text
+
+
+def test_read_revenue_by_region(mocker):
+    mock_refresh = mocker.patch("awesome_inc.api.main.rollups.refresh")
+    mocker.patch(
+        "awesome_inc.api.main.rollups.revenue",
+        return_value=[{"region": "Europe", "revenue": 13224}],
+    )
+
+    response = client.get(
+        "/analytics/revenue-by-region",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.status_code == 200
+    assert response.json() == [{"region": "Europe", "revenue": "13224"}]
+    mock_refresh.assert_called_once()
+
+
+def test_read_batch(mocker):
+    mock_batch_chunks = mocker.patch(
+        "awesome_inc.api.main.batch_chunks", return_value=iter([b"{}"])
+    )
+
+    response = client.get(
+        "/batch?tables=country,customer,country",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.status_code == 200
+    assert mock_batch_chunks.call_args.args[1] == ["country", "customer"]
+
+    response = client.get(
+        "/batch?tables=country, ",
+        headers={"Authorization": "Bearer valid_token"},
+    )
+    assert response.status_code == 200
+    assert mock_batch_chunks.call_args.args[1] == ["country"]
+
+    response = client.get(
+        "/batch?tables=country,invoice",
+        headers={"Authorization": "Bearer valid_token"},
     )
     assert response.status_code == 404
-    assert response.json() == {"detail": "InvalidTable table does not exist."}
+
+
+def test_metrics(mocker):
+    mocker.patch(
+        "awesome_inc.api.main.retrieve_table_data",
+        return_value=[row(id=1000, name="Category1")],
+    )
+    client.get(
+        "/product_category", headers={"Authorization": "Bearer valid_token"}
+    )
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    lines = response.text.splitlines()
+    assert (
+        'http_requests_total{route="/product_category",method="GET",'
+        'status="200"}' in response.text
+    )
+    assert any(
+        line.startswith('table_rows_read_total{table="product_category"}')
+        for line in lines
+    )
+    assert "http_requests_in_flight 1.0" in lines
@@ -0,0 +1,41 @@
+from awesome_inc.api.core.metrics import Registry
+
+
+def test_counter_and_gauge():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    in_flight = registry.gauge("in_flight", "In flight.")
+    requests.inc(route="/country")
+    requests.inc(2, route="/country")
+    requests.inc(route='/a"b')
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/country"} 3.0',
+        'requests_total{route="/a\\"b"} 1.0',
+        "# HELP in_flight In flight.",
+        "# TYPE in_flight gauge",
+        "in_flight 1.0",
+    ]
+
+
+def test_histogram():
+    registry = Registry()
+    duration = registry.histogram(
+        "duration_seconds", "Duration.", ("route",), buckets=(0.1, 1.0)
+    )
+    duration.observe(0.05, route="/country")
+    duration.observe(0.1, route="/country")
+    duration.observe(3.0, route="/country")
+
+    assert registry.render().splitlines()[2:] == [
+        'duration_seconds_bucket{route="/country",le="0.1"} 2.0',
+        'duration_seconds_bucket{route="/country",le="1.0"} 2.0',
+        'duration_seconds_bucket{route="/country",le="+Inf"} 3.0',
+        'duration_seconds_sum{route="/country"} 3.15',
+        'duration_seconds_count{route="/country"} 3.0',
+    ]
@@ -0,0 +1,36 @@
+import pytest
+from awesome_inc.api.models import Installation
+from awesome_inc.api.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    primary_key,
+)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({"id": 1035})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == {"id": 1035}
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", "WzFd"])
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_decode_cursor_converts_key():
+    cursor = encode_cursor({"id": "1035"})
+    assert decode_cursor(cursor, Installation.__table__.c.id) == {"id": 1035}
+
+
+@pytest.mark.parametrize("key", ["abc", [1035], None])
+def test_decode_cursor_with_invalid_key(key):
+    cursor = encode_cursor({"id": key})
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, Installation.__table__.c.id)
+
+
+def test_primary_key():
+    assert primary_key(Installation) is Installation.id
@@ -0,0 +1,126 @@
+from awesome_inc.api.core.database import get_engine
+from awesome_inc.api.core.replicas import (
+    Replica,
+    ReplicaSet,
+    get_read_db,
+    replicas,
+    replicas_from_env,
+)
+from sqlalchemy import create_engine
+from unittest.mock import MagicMock
+from sqlalchemy.pool import QueuePool
+import asyncio
+import pytest
+
+
+def _replica(name: str) -> Replica:
+    replica = Replica(name, create_engine("sqlite://", poolclass=QueuePool))
+    replica.healthy = True
+    return replica
+
+
+def test_replicas_from_env(monkeypatch):
+    monkeypatch.setenv("DATABASE__REPLICAS", "replica-1, replica-2:5433")
+    monkeypatch.setenv("DATABASE__PORT", "5432")
+
+    databases = replicas_from_env()
+
+    assert [(d.hostname, d.port) for d in databases] == [
+        ("replica-1", 5432),
+        ("replica-2", 5433),
+    ]
+
+
+def test_replicas_from_env_without_replicas(monkeypatch):
+    monkeypatch.delenv("DATABASE__REPLICAS", raising=False)
+    assert replicas_from_env() == []
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        ReplicaSet(strategy="random")
+
+
+def test_choose_round_robin():
+    replica_set = ReplicaSet()
+    first, second, down = _replica("a"), _replica("b"), _replica("c")
+    down.healthy = False
+    replica_set.replicas = [first, second, down]
+
+    assert [replica_set.choose() for _ in range(4)] == [
+        first,
+        second,
+        first,
+        second,
+    ]
+
+
+def test_choose_least_connections():
+    replica_set = ReplicaSet(strategy="least_connections")
+    busy, idle = _replica("busy"), _replica("idle")
+    replica_set.replicas = [busy, idle]
+
+    with busy.engine.connect():
+        assert replica_set.choose() is idle
+
+
+def test_choose_falls_back_to_primary():
+    replica_set = ReplicaSet()
+    assert replica_set.choose() is None
+    replica_set.replicas = [_replica("a")]
+    replica_set.replicas[0].healthy = False
+    assert replica_set.choose() is None
+
+
+def test_check_takes_lagging_and_failing_replicas_out(mocker):
+    replica_set = ReplicaSet(max_lag_seconds=10)
+    current, lagging, failing = _replica("a"), _replica("b"), _replica("c")
+    replica_set.replicas = [current, lagging, failing]
+    lags = {current.engine: 0.5, lagging.engine: 60.0}
+
+    def lag(engine):
+        if engine not in lags:
+            raise ConnectionError
+        return True, lags[engine]
+
+    mocker.patch.object(ReplicaSet, "_lag", side_effect=lag)
+
+    asyncio.run(replica_set.check())
+
+    assert [r.healthy for r in replica_set.replicas] == [True, False, False]
+    assert [r.lag for r in replica_set.replicas] == [0.5, 60.0, None]
+    assert replica_set.status()[0] == {
+        "name": "a",
+        "healthy": True,
+        "lag": 0.5,
+        "connections": 0,
+    }
+
+
+@pytest.mark.parametrize("allow_primary", [False, True])
+def test_check_servers_not_in_recovery(mocker, allow_primary):
+    replica_set = ReplicaSet(allow_primary=allow_primary)
+    replica_set.replicas = [_replica("a")]
+    mocker.patch.object(ReplicaSet, "_lag", return_value=(False, 0.0))
+
+    asyncio.run(replica_set.check())
+
+    assert replica_set.replicas[0].healthy is allow_primary
+
+
+def test_get_read_db(mocker):
+    replica = _replica("a")
+    mocker.patch.object(replicas, "replicas", [replica])
+
+    request = MagicMock(query_params={"limit": "10"})
+    db = next(get_read_db(request))
+    assert db.get_bind() is replica.engine
+    db = next(get_read_db(request, primary=True))
+    assert db.get_bind() is get_engine()
+
+
+def test_get_read_db_incremental_extraction(mocker):
+    mocker.patch.object(replicas, "replicas", [_replica("a")])
+
+    db = next(get_read_db(MagicMock(query_params={"since": "1000"})))
+    assert db.get_bind() is get_engine()
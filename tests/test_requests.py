@@ -1,40 +1,98 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 from sqlalchemy.orm import Session
 from awesome_inc.api.requests import (
     retrieve_all_table_names,
     retrieve_table_data,
+    retrieve_table_data_async,
+    stream_table_data,
 )
-from sqlalchemy.engine import Engine
 from awesome_inc.api.models import Country
 
 
 def test_retrieve_all_table_names(mocker):
-    mock_engine = mocker.patch("awesome_inc.api.requests.new_engine")
-    mock_engine.return_value = MagicMock(spec=Engine)
-
-    mock_metadata = MagicMock()
-    mock_metadata.tables = {"table1": None, "table2": None}
-
-    mock_metadata_class = mocker.patch("awesome_inc.api.requests.MetaData")
-    mock_metadata_class.return_value = mock_metadata
+    mock_engine = mocker.patch("awesome_inc.api.catalog.get_engine")
 
     result = retrieve_all_table_names()
 
-    assert result == {"table_names": ["table1", "table2"]}
-
+    assert result == {
+        "table_names": [
+            "country",
+            "customer",
+            "installation",
+            "product",
+            "product_category",
+        ]
+    }
+    mock_engine.assert_not_called()
 
-def test_retrieve_table_data(mocker):
-    mock_db = mocker.patch("awesome_inc.api.core.database.get_db")
-    mock_db.return_value = MagicMock(spec=Session)
 
+def test_retrieve_table_data():
+    mock_db = MagicMock(spec=Session)
     mock_model = Country(
         id=1,
         name="Country1",
         region="Region1",
     )
-    mock_query = mock_db.query.return_value
-    mock_query.all.return_value = [mock_model]
+    mock_db.scalars.return_value.all.return_value = [mock_model]
 
     result = retrieve_table_data(mock_db, Country)
 
     assert result == [mock_model]
+    query = mock_db.scalars.call_args.args[0]
+    assert "ORDER BY country.id" in str(query)
+    assert "WHERE" not in str(query)
+    assert "LIMIT" not in str(query)
+
+
+def test_retrieve_table_data_page():
+    mock_db = MagicMock(spec=Session)
+
+    retrieve_table_data(mock_db, Country, limit=10, after=1000)
+
+    query = mock_db.scalars.call_args.args[0]
+    assert "WHERE country.id > :id_1" in str(query)
+    assert "LIMIT :param_1" in str(query)
+    assert query.compile().params == {"id_1": 1000, "param_1": 10}
+
+
+def test_stream_table_data():
+    mock_db = MagicMock(spec=Session)
+    mock_model = Country(id=1, name="Country1", region="Region1")
+    mock_db.scalars.return_value = iter([mock_model])
+
+    result = stream_table_data(mock_db, Country, batch_size=500)
+
+    assert list(result) == [mock_model]
+    query = mock_db.scalars.call_args.args[0]
+    assert query.get_execution_options()["yield_per"] == 500
+
+
+def test_retrieve_table_data_columns_and_filters():
+    mock_db = MagicMock(spec=Session)
+
+    retrieve_table_data(
+        mock_db,
+        Country,
+        columns=["id", "region"],
+        filters=[Country.region == "Europe"],
+    )
+
+    query = str(mock_db.execute.call_args.args[0])
+    assert query.startswith("SELECT country.id, country.region \nFROM")
+    assert "WHERE country.region = :region_1" in query
+
+
+def test_retrieve_table_data_async():
+    mock_db = MagicMock(spec=AsyncSession)
+    mock_model = Country(id=1, name="Country1", region="Region1")
+    mock_db.scalars = AsyncMock()
+    mock_db.scalars.return_value = MagicMock()
+    mock_db.scalars.return_value.all.return_value = [mock_model]
+
+    result = asyncio.run(retrieve_table_data_async(mock_db, Country, limit=5))
+
+    assert result == [mock_model]
+    query = mock_db.scalars.call_args.args[0]
+    assert "LIMIT" in str(query)
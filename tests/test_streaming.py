@@ -0,0 +1,11 @@
+from awesome_inc.api.streaming import negotiate_format
+
+
+def test_negotiate_format():
+    assert negotiate_format("*/*") == "json"
+    assert negotiate_format("application/json") == "json"
+    assert negotiate_format("application/x-ndjson") == "ndjson"
+    assert (
+        negotiate_format("application/vnd.apache.arrow.stream, */*") == "arrow"
+    )
+    assert negotiate_format("application/x-ndjson", "parquet") == "parquet"
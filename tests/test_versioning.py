@@ -0,0 +1,34 @@
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+from awesome_inc.api.models import Country
+from awesome_inc.api.versioning import entity_tag, matches, table_version
+
+
+def test_table_version():
+    mock_db = MagicMock(spec=Session)
+    mock_db.execute.return_value.one.return_value = (9, 1008)
+
+    assert table_version(mock_db, Country) == "9-1008"
+    query = str(mock_db.execute.call_args.args[0])
+    assert query.startswith("SELECT count(*) AS count_1, max(country.id)")
+
+
+def test_entity_tag():
+    etag = entity_tag("country", "9-1008", [("b", "2"), ("a", "1")], "json")
+
+    assert etag == entity_tag(
+        "country", "9-1008", [("a", "1"), ("b", "2")], "json"
+    )
+    assert etag != entity_tag("country", "9-1008", [("a", "1")], "json")
+    assert etag != entity_tag("country", "10-1009", [], "json")
+    assert etag != entity_tag("country", "9-1008", [], "ndjson")
+
+
+def test_matches():
+    etag = 'W/"abc"'
+    assert matches('W/"abc"', etag)
+    assert matches('"abc"', etag)
+    assert matches('W/"xyz", W/"abc"', etag)
+    assert matches("*", etag)
+    assert not matches('W/"xyz"', etag)
+    assert not matches(None, etag)
@@ -0,0 +1,60 @@
+from datetime import date
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+from awesome_inc.api import watermarks
+from awesome_inc.api.models import Country, Installation
+from awesome_inc.api.watermarks import (
+    delta_filters,
+    format_watermark,
+    high_water_mark,
+    watermark_column,
+)
+
+
+def test_watermark_column():
+    assert watermark_column("country", Country).name == "id"
+    assert watermark_column("installation", Installation).name == "id"
+
+
+def test_watermark_column_configured(monkeypatch):
+    monkeypatch.setitem(
+        watermarks._WATERMARK_COLUMNS, "installation", "installation_date"
+    )
+    assert (
+        watermark_column("installation", Installation).name
+        == "installation_date"
+    )
+
+
+def test_high_water_mark():
+    mock_db = MagicMock(spec=Session)
+    mock_db.scalar.return_value = 1008
+
+    assert high_water_mark(mock_db, Country.__table__.c.id) == 1008
+    query = str(mock_db.scalar.call_args.args[0])
+    assert query == "SELECT max(country.id) AS max_1 \nFROM country"
+
+
+def test_delta_filters_unique_column():
+    conditions = delta_filters(Country.__table__.c.id, 1004, 1008)
+    assert [str(condition) for condition in conditions] == [
+        "country.id > :id_1",
+        "country.id <= :id_1",
+    ]
+
+
+def test_delta_filters_non_unique_column():
+    column = Installation.__table__.c.installation_date
+    conditions = delta_filters(column, date(2021, 10, 1), None)
+    assert [str(condition) for condition in conditions] == [
+        "installation.installation_date >= :installation_date_1",
+    ]
+
+
+def test_delta_filters_first_extraction():
+    assert delta_filters(Country.__table__.c.id, None, None) == []
+
+
+def test_format_watermark():
+    assert format_watermark(date(2021, 10, 24)) == "2021-10-24"
+    assert format_watermark(1035) == "1035"